@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: rewriting image references in a chunk's text.
+
+Compares the former one-str.replace-per-image approach with the single-pass
+rewrite_image_refs for chunks of growing size and image count.
+
+Usage:
+    python benchmarks/image_refs.py
+"""
+import timeit
+from typing import Dict, Tuple
+
+from docs_to_md.core.result_handler import rewrite_image_refs
+
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8 + "\n\n"
+
+
+def make_chunk(images: int, paragraphs_per_image: int = 4) -> Tuple[str, Dict[str, str]]:
+    parts = []
+    image_map = {}
+    for i in range(images):
+        name = f"_page_{i // 3 + 1}_Figure_{i % 3}.jpeg"
+        image_map[name] = f"images_abc12345/page_{i // 3 + 1}_figure_{i % 3}.jpeg"
+        parts.append(PARAGRAPH * paragraphs_per_image)
+        parts.append(f"![]({name})\n\n")
+    return "".join(parts), image_map
+
+
+def replace_per_image(content: str, image_map: Dict[str, str]) -> str:
+    for original_name, new_ref in image_map.items():
+        content = content.replace(f"]({original_name})", f"]({new_ref})")
+    return content
+
+
+def main() -> None:
+    print(f"{'images':>7} {'chunk KB':>9} {'per-image ms':>13} {'single-pass ms':>15} {'speedup':>8}")
+    for images in (10, 100, 500, 2000):
+        content, image_map = make_chunk(images)
+        assert replace_per_image(content, image_map) == rewrite_image_refs(content, image_map)
+        runs = max(1, 2000 // images)
+        old = timeit.timeit(lambda: replace_per_image(content, image_map), number=runs) / runs
+        new = timeit.timeit(lambda: rewrite_image_refs(content, image_map), number=runs) / runs
+        print(
+            f"{images:>7} {len(content) // 1024:>9} {old * 1000:>13.2f} {new * 1000:>15.2f} {old / new:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from docs_to_md.convert import ConversionResult, aconvert_many, convert_many
+
+__all__ = ["ConversionResult", "aconvert_many", "convert_many"]
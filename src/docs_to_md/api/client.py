@@ -1,3 +1,4 @@
+import gzip
 import json
 import logging
 from pathlib import Path
@@ -14,13 +15,25 @@ from docs_to_md.api.models import (
     SubmitResponse,
     SUPPORTED_MIME_TYPES,
 )
+from docs_to_md.api.stream import (
+    RAW_COMPRESS_LEVEL,
+    STREAM_BLOCK_SIZE,
+    StatusSink,
+    parse_status_stream,
+    record_blocks,
+)
 from docs_to_md.utils.exceptions import APIError
 from docs_to_md.utils.file_utils import FileIO
+from docs_to_md.utils.memory import MIB, MemoryBudget
 
 # Client-side constants
 MAX_REQUESTS_PER_MINUTE = 150
 REQUEST_TIMEOUT_SECONDS = 30
 MAX_RETRIES = 3
+# Memory charged while a status response is held: the body, its decoded text and the model
+IN_MEMORY_RESPONSE_FACTOR = 3
+UNKNOWN_RESPONSE_SIZE = 64 * MIB  # Assumed when the server sends no Content-Length
+STREAMED_RESPONSE_CHARGE = 4 * STREAM_BLOCK_SIZE  # Read buffer plus one decoded block
 
 logger = logging.getLogger(__name__)
 
@@ -29,19 +42,19 @@ class MarkerClient:
     BASE_MARKER_API_ENDPOINT = "https://www.datalab.to/api/v1/marker"
 
     # See datalab_marker_api_docs.md#authentication for API key details
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, budget: Optional[MemoryBudget] = None):
         if not api_key or not api_key.strip():
             raise APIError("API key is required")
 
+        # Status checks that would exceed the budget are postponed
+        self.budget = budget
+
         self.headers = {"X-Api-Key": api_key.strip()}
+        # One session per client keeps connections to the API alive across
+        # submissions and status checks.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
 
-    @sleep_and_retry
-    @limits(calls=MAX_REQUESTS_PER_MINUTE, period=60)
-    @backoff.on_exception(
-        backoff.expo,
-        (requests.exceptions.RequestException, json.JSONDecodeError),
-        max_tries=MAX_RETRIES,
-    )
     def submit_file(
         self,
         file_path: Path,
@@ -60,8 +73,46 @@ class MarkerClient:
         try:
             if not file_path.exists():
                 raise APIError(f"File not found: {file_path}")
-
             file_data = FileIO.read_file(file_path)
+        except Exception as e:
+            logger.error(f"Error submitting file {file_path}: {e}")
+            return None
+
+        return self.submit_data(
+            file_path.name,
+            file_data,
+            output_format=output_format,
+            langs=langs,
+            use_llm=use_llm,
+            strip_existing_ocr=strip_existing_ocr,
+            disable_image_extraction=disable_image_extraction,
+            force_ocr=force_ocr,
+            paginate=paginate,
+            max_pages=max_pages,
+        )
+
+    @sleep_and_retry
+    @limits(calls=MAX_REQUESTS_PER_MINUTE, period=60)
+    @backoff.on_exception(
+        backoff.expo,
+        (requests.exceptions.RequestException, json.JSONDecodeError),
+        max_tries=MAX_RETRIES,
+    )
+    def submit_data(
+        self,
+        filename: str,
+        file_data: bytes,
+        output_format: str = "markdown",
+        langs: str = "English",
+        use_llm: bool = False,
+        strip_existing_ocr: bool = False,
+        disable_image_extraction: bool = False,
+        force_ocr: bool = False,
+        paginate: bool = False,
+        max_pages: Optional[int] = None,
+    ) -> Optional[str]:
+        """Submit an in-memory document for conversion; see submit_file."""
+        try:
             kind = filetype.guess(file_data)
 
             # Supported types listed in datalab_marker_api_docs.md#supported-file-types
@@ -71,7 +122,7 @@ class MarkerClient:
                 )
 
             form_data = {
-                "file": (file_path.name, file_data, kind.mime),
+                "file": (filename, file_data, kind.mime),
                 "langs": (None, langs),
                 "output_format": (None, output_format),
             }
@@ -92,10 +143,9 @@ class MarkerClient:
             if max_pages is not None:
                 form_data["max_pages"] = (None, str(max_pages))
 
-            response = requests.post(
+            response = self.session.post(
                 self.BASE_MARKER_API_ENDPOINT,
                 files=form_data,
-                headers=self.headers,
                 timeout=REQUEST_TIMEOUT_SECONDS,
             )
             response.raise_for_status()  # Default handling for HTTP errors,
@@ -108,12 +158,12 @@ class MarkerClient:
                 return None
 
             logger.info(
-                f"Successfully submitted file {file_path.name}. Request ID: {submit_response.request_id}"
+                f"Successfully submitted file {filename}. Request ID: {submit_response.request_id}"
             )
             return submit_response.request_id
 
         except Exception as e:
-            logger.error(f"Error submitting file {file_path}: {e}")
+            logger.error(f"Error submitting file {filename}: {e}")
             return None
 
     def _handle_status_error(
@@ -142,11 +192,22 @@ class MarkerClient:
         (requests.exceptions.RequestException, json.JSONDecodeError),
         max_tries=MAX_RETRIES,
     )
-    def check_status(self, request_id: str) -> Optional[MarkerStatus]:
+    def check_status(
+        self, request_id: str, sink: Optional[StatusSink] = None, admit: bool = False
+    ) -> Optional[MarkerStatus]:
         """
         Check the status of a conversion request.
         See datalab_marker_api_docs.md#marker for polling details.
 
+        Args:
+            request_id: Request to check.
+            sink: If given, the response is parsed as it downloads: the converted
+                text and images are written to the sink's files instead of being
+                loaded into the returned status.
+            admit: Fetch a finished result even if the memory budget is exhausted
+                (it is charged over the limit), for a result the caller cannot
+                make progress without.
+
         Returns:
             MarkerStatus object with current status, or None if the check fails.
         """
@@ -154,16 +215,30 @@ class MarkerClient:
             logger.error("Empty Marker request ID provided, skipping status check")
             return None
 
+        if sink is not None:
+            return self._check_status_streaming(request_id, sink, admit)
+
+        charge = 0
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.BASE_MARKER_API_ENDPOINT}/{request_id}",
-                headers=self.headers,
                 timeout=REQUEST_TIMEOUT_SECONDS,
+                stream=self.budget is not None,  # Size is checked before the body is read
             )
 
             if response.status_code != 200:
                 return self._handle_status_error(response.status_code, request_id)
 
+            if self.budget is not None:
+                size = int(response.headers.get("Content-Length") or UNKNOWN_RESPONSE_SIZE)
+                charge = size * IN_MEMORY_RESPONSE_FACTOR
+                if admit:
+                    self.budget.charge(charge)
+                elif not self.budget.try_acquire(charge):
+                    response.close()
+                    charge = 0
+                    return self._deferred_status(request_id)
+
             data = response.json()
             # Handle potential empty response from API
             if not data:
@@ -184,10 +259,62 @@ class MarkerClient:
         except Exception as e:  # Catch-all for validation or other unexpected errors
             logger.error(f"Unexpected error checking status for {request_id}: {e}")
             return None
+        finally:
+            # The caller keeps the status, but parsing transients are gone
+            if charge:
+                self.budget.release(charge)
+
+    def _deferred_status(self, request_id: str) -> MarkerStatus:
+        """Reported instead of fetching a result while the memory budget is exhausted."""
+        logger.info(
+            f"Memory budget in use ({self.budget.in_use // MIB}/{self.budget.limit // MIB} MiB); "
+            f"fetching the result of {request_id} later."
+        )
+        return MarkerStatus(status=StatusEnum.PROCESSING, error="Deferred: memory budget exhausted")
+
+    def _check_status_streaming(
+        self, request_id: str, sink: StatusSink, admit: bool = False
+    ) -> Optional[MarkerStatus]:
+        if self.budget is not None:
+            if admit:
+                self.budget.charge(STREAMED_RESPONSE_CHARGE)
+            elif not self.budget.try_acquire(STREAMED_RESPONSE_CHARGE):
+                return self._deferred_status(request_id)
+        try:
+            with self.session.get(
+                f"{self.BASE_MARKER_API_ENDPOINT}/{request_id}",
+                timeout=REQUEST_TIMEOUT_SECONDS,
+                stream=True,
+            ) as response:
+                if response.status_code != 200:
+                    return self._handle_status_error(response.status_code, request_id)
+                blocks = response.iter_content(STREAM_BLOCK_SIZE)
+                if sink.raw_path is None:
+                    return parse_status_stream(blocks, sink)
+                with gzip.open(sink.raw_path, "wb", compresslevel=RAW_COMPRESS_LEVEL) as raw:
+                    status = parse_status_stream(record_blocks(blocks, raw.write), sink)
+                    for block in blocks:  # Whatever follows the closing brace
+                        raw.write(block)
+                return status
+
+        except ValueError as e:
+            logger.error(f"Invalid JSON response for request {request_id}: {e}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error checking status for {request_id}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error checking status for {request_id}: {e}")
+        finally:
+            if self.budget is not None:
+                self.budget.release(STREAMED_RESPONSE_CHARGE)
+        sink.discard()
+        return None
+
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self.session.close()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # No specific cleanup needed for this client
-        pass
+        self.close()
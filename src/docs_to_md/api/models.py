@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Any, Dict, Optional, Set
 from dataclasses import dataclass
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class StatusEnum(str, Enum):
@@ -14,12 +14,14 @@ class StatusEnum(str, Enum):
 
 class MarkerStatus(BaseModel):
     """Model for API status response."""
+    model_config = ConfigDict(populate_by_name=True)
+
     status: StatusEnum  # Indicates the status of the request (`complete`, or `processing`).
     output_format: Optional[str] = None  # The requested output format, `json`, `html`, or `markdown`.
     success: Optional[bool] = None  # Indicates if the request completed successfully. `True` or `False`.
     error: Optional[str] = None  # If there was an error, this contains the error message.
     markdown: Optional[str] = None  # The output from the file if `output_format` is `markdown`.
-    json_data: Optional[Dict[str, Any]] = None  # The output from the file if `output_format` is `json`.
+    json_data: Optional[Dict[str, Any]] = Field(None, alias="json")  # The output from the file if `output_format` is `json`.
     images: Optional[Dict[str, str]] = None  # Dictionary of image filenames (keys) and base64 encoded images (values).
     meta: Optional[Dict[str, Any]] = None  # Metadata about the markdown conversion.
     page_count: Optional[int] = None  # Number of pages that were converted.
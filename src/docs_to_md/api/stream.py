@@ -0,0 +1,374 @@
+"""
+Incremental parsing of status responses.
+
+A completed status response carries the whole converted text and every image
+(base64) in one JSON document. parse_status_stream reads it block by block:
+the text is written to a file as it arrives, each image is decoded straight
+into its own file (or handed off whole to be decoded elsewhere), and only the
+small remaining fields are built into a MarkerStatus.
+"""
+import json
+import logging
+import re
+from concurrent.futures import Future, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from docs_to_md.api.models import MarkerStatus
+from docs_to_md.utils.file_utils import Base64FileWriter, safe_delete
+
+logger = logging.getLogger(__name__)
+
+STREAM_BLOCK_SIZE = 256 * 1024
+CONTENT_KEYS = ("markdown", "json", "html")  # Large text fields, written to the content file
+RAW_COMPRESS_LEVEL = 6  # Recorded responses are mostly base64 images; higher levels gain little
+
+_WHITESPACE = b" \t\r\n"
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+_ESCAPES = {
+    ord('"'): b'"', ord("\\"): b"\\", ord("/"): b"/", ord("b"): b"\b",
+    ord("f"): b"\f", ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t",
+}
+
+Write = Callable[[bytes], object]
+
+
+class StatusSink:
+    """
+    Receives the large parts of a status response.
+
+    Args:
+        content_path: File for the converted text (markdown/html, or the raw JSON tree).
+        image_path: Maps an image name from the response to the file it is decoded into.
+        raw_path: Optional file the response body is also recorded into, gzip-compressed.
+        decode_image: Optional; receives each image's name, file and base64 data and
+            returns the pending write, e.g. on a thread pool. The parser then holds
+            one encoded image at a time instead of decoding it inline; failed writes
+            are the callback's to report.
+    """
+
+    def __init__(
+        self,
+        content_path: Path,
+        image_path: Callable[[str], Path],
+        raw_path: Optional[Path] = None,
+        decode_image: Optional[Callable[[str, Path, bytes], Future]] = None,
+    ):
+        self.content_path = content_path
+        self.image_path = image_path
+        self.raw_path = raw_path
+        self.decode_image = decode_image
+        self.content_key: Optional[str] = None  # Which content field was written, if any
+        self.images: Dict[str, Path] = {}  # Image name -> decoded file (or one being decoded)
+        self.image_errors: Dict[str, str] = {}  # Image name -> why it could not be written
+        self.image_writes: List[Future] = []  # Pending writes returned by decode_image
+
+    def discard(self) -> None:
+        """Deletes everything written so far, e.g. after the response broke off."""
+        wait(self.image_writes)
+        self.image_writes = []
+        if self.content_key:
+            safe_delete(self.content_path)
+        for path in self.images.values():
+            safe_delete(path)
+        if self.raw_path:
+            safe_delete(self.raw_path)
+        self.content_key = None
+        self.images = {}
+        self.image_errors = {}
+
+
+def record_blocks(blocks: Iterable[bytes], write: Write) -> Iterator[bytes]:
+    """Passes blocks through, writing each to write as well."""
+    for block in blocks:
+        write(block)
+        yield block
+
+
+class _Reader:
+    """Byte-level cursor over a stream of blocks."""
+
+    def __init__(self, blocks: Iterable[bytes]):
+        self._blocks: Iterator[bytes] = iter(blocks)
+        self.buf = b""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        for block in self._blocks:
+            if block:
+                self.buf = self.buf[self.pos:] + block
+                self.pos = 0
+                return True
+        return False
+
+    def _ensure(self, n: int) -> None:
+        while len(self.buf) - self.pos < n:
+            if not self._fill():
+                raise ValueError("Response ended unexpectedly")
+
+    def peek(self) -> int:
+        """Returns the next non-whitespace byte without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Response ended unexpectedly")
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char[0]:
+            raise ValueError(f"Expected {char!r} at byte {self.pos} of block, got {bytes([self.buf[self.pos]])!r}")
+        self.pos += 1
+
+    def read_string(self, write: Write) -> None:
+        """Decodes a JSON string, passing its UTF-8 bytes to write piece by piece."""
+        self.expect(b'"')
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                raise ValueError("Response ended inside a string")
+            match = _STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                write(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                continue
+            i = match.start()
+            if i > self.pos:
+                write(self.buf[self.pos:i])
+            self.pos = i
+            if self.buf[i] == ord('"'):
+                self.pos += 1
+                return
+            self._ensure(2)
+            escape = self.buf[self.pos + 1]
+            if escape != ord("u"):
+                if escape not in _ESCAPES:
+                    raise ValueError(f"Invalid escape \\{chr(escape)}")
+                write(_ESCAPES[escape])
+                self.pos += 2
+                continue
+            self._ensure(6)
+            code = int(self.buf[self.pos + 2:self.pos + 6], 16)
+            self.pos += 6
+            if 0xD800 <= code < 0xDC00:
+                # High surrogate; combine with the low surrogate that should follow
+                self._ensure(6)
+                if self.buf[self.pos:self.pos + 2] == b"\\u":
+                    low = int(self.buf[self.pos + 2:self.pos + 6], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        self.pos += 6
+            write(chr(code).encode("utf-8", "surrogatepass"))
+
+    def _copy_raw_string(self, write: Write) -> None:
+        """Copies a JSON string, quotes and escapes included, without decoding it."""
+        self.expect(b'"')
+        write(b'"')
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                raise ValueError("Response ended inside a string")
+            match = _STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                write(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                continue
+            i = match.start()
+            if self.buf[i] == ord('"'):
+                write(self.buf[self.pos:i + 1])
+                self.pos = i + 1
+                return
+            write(self.buf[self.pos:i])
+            self.pos = i
+            self._ensure(2)
+            write(self.buf[self.pos:self.pos + 2])
+            self.pos += 2
+
+    def copy_value(self, write: Write) -> None:
+        """Copies any JSON value verbatim."""
+        first = self.peek()
+        if first == ord('"'):
+            self._copy_raw_string(write)
+            return
+        if first in b"{[":
+            depth = 0
+            while True:
+                if self.pos >= len(self.buf) and not self._fill():
+                    raise ValueError("Response ended inside a value")
+                match = _STRUCTURE.search(self.buf, self.pos)
+                if match is None:
+                    write(self.buf[self.pos:])
+                    self.pos = len(self.buf)
+                    continue
+                i = match.start()
+                write(self.buf[self.pos:i])
+                self.pos = i
+                char = self.buf[i]
+                if char == ord('"'):
+                    self._copy_raw_string(write)
+                    continue
+                write(self.buf[i:i + 1])
+                self.pos = i + 1
+                depth += 1 if char in b"{[" else -1
+                if depth == 0:
+                    return
+        # Number, true, false or null
+        while True:
+            match = _SCALAR_END.search(self.buf, self.pos)
+            if match is not None:
+                write(self.buf[self.pos:match.start()])
+                self.pos = match.start()
+                return
+            write(self.buf[self.pos:])
+            self.pos = len(self.buf)
+            if not self._fill():
+                return
+
+    def read_small(self) -> object:
+        """Parses a value expected to be small."""
+        parts: List[bytes] = []
+        self.copy_value(parts.append)
+        return json.loads(b"".join(parts))
+
+    def read_key(self) -> str:
+        parts: List[bytes] = []
+        self.read_string(parts.append)
+        self.expect(b":")
+        return b"".join(parts).decode("utf-8")
+
+    def next_member(self) -> bool:
+        """Consumes the separator after an object member; False at the closing brace."""
+        char = self.peek()
+        self.pos += 1
+        if char == ord(","):
+            return True
+        if char == ord("}"):
+            return False
+        raise ValueError(f"Expected ',' or '}}', got {bytes([char])!r}")
+
+
+def _decode_image(reader: _Reader, sink: StatusSink, name: str, path: Path, writer: Base64FileWriter) -> None:
+    """Decodes an image string into writer as it is read."""
+    errors: List[str] = []
+
+    def write(data: bytes) -> None:
+        if errors:
+            return  # Skip the rest of a broken image
+        try:
+            writer.write(data)
+        except (ValueError, OSError) as e:
+            errors.append(str(e))
+
+    reader.read_string(write)
+    if not errors:
+        try:
+            writer.close()
+            sink.images[name] = path
+        except (ValueError, OSError) as e:
+            errors.append(str(e))
+    if errors:
+        writer.abort()
+        sink.image_errors[name] = errors[0]
+
+
+def _read_images(reader: _Reader, sink: StatusSink) -> None:
+    reader.expect(b"{")
+    if reader.peek() == ord("}"):
+        reader.pos += 1
+        return
+    while True:
+        name = reader.read_key()
+        if reader.peek() != ord('"'):
+            reader.read_small()
+            sink.image_errors[name] = "Image data is not a string"
+        else:
+            try:
+                path = sink.image_path(name)
+                writer = None if sink.decode_image else Base64FileWriter(path)
+            except OSError as e:
+                reader.read_string(lambda _: None)
+                sink.image_errors[name] = str(e)
+            else:
+                if writer is None:
+                    parts: List[bytes] = []
+                    reader.read_string(parts.append)
+                    sink.image_writes.append(sink.decode_image(name, path, b"".join(parts)))
+                    sink.images[name] = path
+                else:
+                    _decode_image(reader, sink, name, path, writer)
+        if not reader.next_member():
+            return
+
+
+def parse_status_stream(blocks: Iterable[bytes], sink: StatusSink) -> MarkerStatus:
+    """
+    Parses a status response from an iterable of byte blocks.
+
+    The content field and images are written to sink; the returned status holds
+    the other fields only (markdown, json_data and images are None).
+
+    Raises:
+        ValueError: If the response is not a complete JSON object.
+    """
+    reader = _Reader(blocks)
+    fields: Dict[str, object] = {}
+    reader.expect(b"{")
+    if reader.peek() == ord("}"):
+        reader.pos += 1
+        return MarkerStatus.model_validate(fields)
+
+    while True:
+        key = reader.read_key()
+        value_start = reader.peek()
+        if key in CONTENT_KEYS and value_start != ord("n"):
+            if sink.content_key is None:
+                sink.content_key = key
+                with open(sink.content_path, "wb") as content_file:
+                    if key == "json":
+                        reader.copy_value(content_file.write)
+                    else:
+                        reader.read_string(content_file.write)
+            else:
+                logger.warning(f"Ignoring second content field '{key}' in status response")
+                reader.copy_value(lambda _: None)
+        elif key == "images" and value_start == ord("{"):
+            _read_images(reader, sink)
+        else:
+            fields[key] = reader.read_small()
+        if not reader.next_member():
+            break
+    return MarkerStatus.model_validate(fields)
+
+
+def iter_json_array(blocks: Iterable[bytes], key: str) -> Iterator[object]:
+    """
+    Yields the items of the array under key in a top-level JSON object,
+    parsing one item at a time; other members are skipped.
+
+    Raises:
+        ValueError: If the document is not a complete JSON object.
+    """
+    reader = _Reader(blocks)
+    reader.expect(b"{")
+    if reader.peek() == ord("}"):
+        return
+    while True:
+        member = reader.read_key()
+        if member == key and reader.peek() == ord("["):
+            reader.pos += 1
+            if reader.peek() == ord("]"):
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.read_small()
+                    char = reader.peek()
+                    reader.pos += 1
+                    if char == ord("]"):
+                        break
+                    if char != ord(","):
+                        raise ValueError(f"Expected ',' or ']', got {bytes([char])!r}")
+        else:
+            reader.copy_value(lambda _: None)
+        if not reader.next_member():
+            return
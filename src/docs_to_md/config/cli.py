@@ -1,14 +1,19 @@
 import argparse
 from pathlib import Path    
 import os
-from typing import Optional
+import sys
+from typing import List, Optional
 import importlib.metadata
 
-from docs_to_md.config.settings import Config
+from docs_to_md.config.settings import ORDER_POLICIES, Config
+from docs_to_md.core.bundle import BUNDLE_FORMATS
 from docs_to_md.utils.exceptions import ConfigurationError, FileError
+from docs_to_md.utils.image_dedup import IMAGE_DEDUP_MODES
 
+COMMANDS = ("watch", "serve", "worker", "batch")
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     # Get package version dynamically
     try:
         __version__ = importlib.metadata.version('pdf-to-markdown-cli')
@@ -27,52 +32,133 @@ def parse_args() -> argparse.Namespace:
         version=f'pdf-to-markdown-cli version: {__version__}'
     )
     
-    parser.add_argument("input", help="Input file or directory path")
+    parser.add_argument("input", nargs="?", help="Input file or directory path, or - to read a document from stdin and write the result to stdout (prefix with 'watch' to keep converting new files in a directory, or 'batch' to convert the documents listed in a JSONL manifest; 'serve' takes no input)")
     
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    parser.add_argument("--render", metavar="FORMATS", help="Convert to JSON once and also write these formats rendered locally from it (comma-separated: markdown, html)", default=None)
     
     parser.add_argument("-l", "--langs", default="English", help="Comma-separated OCR languages")
     parser.add_argument("--llm", action="store_true", help="Use LLM for enhanced processing")
     parser.add_argument("--strip", action="store_true", help="Redo OCR processing")
     parser.add_argument("--noimg", action="store_true", help="Disable image extraction")
+    parser.add_argument("--dedupe-images", choices=IMAGE_DEDUP_MODES, default="output", help="Store repeated images once by hardlinking identical files: off, within each output, or across all outputs of the run")
+    parser.add_argument("--bundle", choices=BUNDLE_FORMATS, default=None, help="Write each finished output with its images and sidecars into a zip or tar archive named after it instead of loose files (images are stored uncompressed)")
+    parser.add_argument("--bundle-file", help="With --bundle: write every output of the run into this one archive instead", default=None)
     parser.add_argument("--force", action="store_true", help="Force OCR on all pages")
     parser.add_argument("--pages", action="store_true", help="Add page delimiters")
+    parser.add_argument("--page-index", action="store_true", help="Write <output>.index.json mapping each page and figure to its byte offset in the output")
     parser.add_argument("-mp", "--max-pages", type=int, help="Maximum number of pages to process from the start of the file")
     
     parser.add_argument("--max", action="store_true", help="Enable all OCR enhancements (LLM, strip OCR, force OCR)")
     parser.add_argument("--no-chunk", action="store_true", help="Disable PDF chunking (sets chunk size to 1 million)")
     parser.add_argument("-cs", "--chunk-size", type=int, help="Set PDF chunk size in pages", default=25)
+    parser.add_argument("--stable-chunks", action="store_true", help="Place chunk boundaries by page content so, with --cache, edits only re-convert nearby chunks (chunk size becomes the maximum)")
+    parser.add_argument("--order", choices=ORDER_POLICIES, default="input", help="Submission order: discovery order, fewest pages first (best median latency), most pages first (shortest total time), or oldest file first")
     parser.add_argument("-o", "--output-dir", help="Absolute path to the output directory (default: same directory as input file)", default=None)
+    parser.add_argument("--images-dir", help="With input -: directory to write extracted images to (default: no images)", default=None)
+    parser.add_argument("--images-tar", help="With input -: tar file or FIFO to stream extracted images into", default=None)
+    parser.add_argument("--sync", action="store_true", help="Incremental mode: only convert new or changed files, keep output names stable and delete outputs of removed files")
+    parser.add_argument("--cache", action="store_true", help="Store results by content hash and reuse them for unchanged files and chunks (hashes every input)")
+    parser.add_argument("--cache-size", type=int, help="Size limit of the stored results cache in MB (with --cache)", default=2048)
+    parser.add_argument("--archive-responses", action="store_true", help="Keep every completed API response, gzip-compressed, so outputs can be rebuilt later with --replay")
+    parser.add_argument("--replay", action="store_true", help="Rebuild outputs from archived API responses (same files and conversion options) without calling the API")
+    parser.add_argument("--memory-budget", type=int, metavar="MB", help="Limit on memory used for downloaded results, images waiting to be written and JSON chunks being merged; fetching more results waits until memory is freed (default: unlimited)", default=None)
+
+    parser.add_argument("--settle", type=float, help="Watch mode: seconds a new file must stay unchanged before it is converted", default=2.0)
+    parser.add_argument("--poll-interval", type=float, help="Watch mode: directory scan interval in seconds where inotify is unavailable", default=2.0)
+
+    parser.add_argument("--host", help="Serve mode: address to listen on", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Serve mode: port to listen on", default=8765)
+    parser.add_argument("--batch-size", type=int, help="Serve, worker and batch mode: jobs converted together per round", default=8)
+    parser.add_argument("--tenant-weight", action="append", default=[], metavar="TENANT=WEIGHT", help="Serve mode: relative share of API capacity for a tenant (repeatable; others get 1)")
+
+    parser.add_argument("--queue", help="Worker mode: path of the SQLite job queue shared by all workers", default=None)
+    parser.add_argument("--lease", type=float, help="Worker mode: seconds without a heartbeat after which a worker's files are reclaimed; work is leased by whole files", default=600)
+
+    parser.add_argument("--results", help="Batch mode: JSONL result log (default: <manifest>.results.jsonl)", default=None)
+    parser.add_argument("--offset", type=int, help="Batch mode: byte offset of the manifest line to start at, as logged in the results", default=None)
+    parser.add_argument("--resume", action="store_true", help="Batch mode: continue an interrupted run from its last checkpoint")
 
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose (DEBUG level) logging")
     
-    return parser.parse_args()
+    if argv is None:
+        argv = sys.argv[1:]
+    # A leading command word selects the mode; plain "pdf-to-md <input>" converts once
+    command = "convert"
+    if argv and argv[0] in COMMANDS:
+        command, argv = argv[0], argv[1:]
+
+    args = parser.parse_args(argv)
+    if command != "serve" and not args.input:
+        parser.error("the following arguments are required: input")
+    args.command = command
+    return args
 
 
 def create_config_from_args() -> Config:
     args = parse_args()
     
     try:
-        api_key = get_env_var("MARKER_PDF_KEY")
+        # Replay never calls the API
+        api_key = get_env_var("MARKER_PDF_KEY", required=not args.replay) or ""
     except Exception as e:
         raise ConfigurationError(f"API key not found: {e}. Set the MARKER_PDF_KEY environment variable.")
         
+    tenant_weights = {}
+    for spec in args.tenant_weight:
+        tenant, sep, weight = spec.partition("=")
+        try:
+            tenant_weights[tenant.strip()] = float(weight)
+        except ValueError:
+            raise ConfigurationError(f"Invalid --tenant-weight {spec!r}; expected TENANT=WEIGHT")
+        if not sep or not tenant.strip():
+            raise ConfigurationError(f"Invalid --tenant-weight {spec!r}; expected TENANT=WEIGHT")
+
+    render_formats = [fmt.strip() for fmt in args.render.split(",") if fmt.strip()] if args.render else []
+
     # If --no-chunk is specified, override chunk size to effectively disable chunking
     chunk_size = 1_000_000 if args.no_chunk else args.chunk_size
     
     config = Config(
         api_key=api_key,
-        input_path=args.input,
+        input_path=args.input or "",
+        command=args.command,
         output_dir=Path(args.output_dir) if args.output_dir else None,
-        output_format="json" if args.json else "markdown",
+        pipe_images_dir=Path(args.images_dir) if args.images_dir else None,
+        pipe_images_tar=Path(args.images_tar) if args.images_tar else None,
+        output_format="json" if args.json or render_formats else "markdown",
+        render_formats=render_formats,
         langs=args.langs,
         use_llm=args.llm or args.max,
         strip_existing_ocr=args.strip or args.max,
         disable_image_extraction=args.noimg,
+        image_dedup=args.dedupe_images,
+        bundle=args.bundle,
+        bundle_path=Path(args.bundle_file).resolve() if args.bundle_file else None,
         force_ocr=args.force or args.max,
         paginate=args.pages,
+        page_index=args.page_index,
         chunk_size=chunk_size,
-        max_pages=args.max_pages
+        stable_chunks=args.stable_chunks,
+        order=args.order,
+        max_pages=args.max_pages,
+        sync=args.sync,
+        use_result_store=args.cache,
+        result_store_max_bytes=args.cache_size * 1024 * 1024,
+        archive_responses=args.archive_responses,
+        replay=args.replay,
+        memory_budget_mb=args.memory_budget,
+        watch_settle_seconds=args.settle,
+        watch_poll_interval=args.poll_interval,
+        serve_host=args.host,
+        serve_port=args.port,
+        batch_size=args.batch_size,
+        tenant_weights=tenant_weights,
+        queue_path=Path(args.queue).resolve() if args.queue else None,
+        lease_seconds=args.lease,
+        batch_results=Path(args.results).resolve() if args.results else None,
+        batch_offset=args.offset,
+        batch_resume=args.resume,
     )
     
     config.validate()
@@ -1,13 +1,32 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import logging
 
-from docs_to_md.api.models import SUPPORTED_FORMAT_EXTENSIONS
+from docs_to_md.api.models import ApiParams, SUPPORTED_FORMAT_EXTENSIONS
+from docs_to_md.core.bundle import BUNDLE_FORMATS
 from docs_to_md.utils.exceptions import ConfigurationError
+from docs_to_md.utils.image_dedup import IMAGE_DEDUP_MODES
 
 logger = logging.getLogger(__name__)
 SETTINGS_DIR_NAME = ".docs_to_md"
+ORDER_POLICIES = ("input", "smallest", "largest", "deadline") # Submission orders for a batch of files
+RENDER_FORMATS = ("markdown", "html") # Formats that can be rendered locally from JSON output
+# Options that may be set per document (job server, batch manifests); the rest is per run
+JOB_OPTIONS = {f.name for f in fields(ApiParams)} | {"chunk_size", "output_dir"}
+
+
+def _coerce_option(name: str, value: Any) -> Any:
+    """Converts string option values (e.g. from a query string) to the type of the Config field."""
+    if not isinstance(value, str):
+        return value
+    if name in ("chunk_size", "max_pages"):
+        return int(value)
+    if name == "output_dir":
+        return Path(value)
+    if name in ("output_format", "langs"):
+        return value
+    return value.lower() in ("1", "true", "yes", "on")
 
 
 @dataclass
@@ -16,13 +35,32 @@ class Config:
     api_key: str
     
     input_path: str
+    command: str = "convert" # convert (run once), watch (convert files as they appear), serve (job server), worker (shared queue) or batch (JSONL manifest)
     output_dir: Optional[Path] = None
+    pipe_images_dir: Optional[Path] = None # With input "-": directory for extracted images
+    pipe_images_tar: Optional[Path] = None # With input "-": tar archive for extracted images (may be a FIFO)
     cache_dir: Path = Path.home() / SETTINGS_DIR_NAME / "cache" # Root directory for cache files
     root_tmp_dir: Path = Path.home() / SETTINGS_DIR_NAME / "tmp" # Root directory for temporary files
+    result_store_dir: Path = Path.home() / SETTINGS_DIR_NAME / "results" # Root directory for stored conversion results
+    use_result_store: bool = False # Reuse stored results for identical inputs and options; hashes every input
+    result_store_max_bytes: int = 2 * 1024 ** 3 # Size limit of the result store (LRU eviction)
+    response_archive_dir: Path = Path.home() / SETTINGS_DIR_NAME / "responses" # Root directory for archived API responses
+    archive_responses: bool = False # Keep every completed API response, compressed, for replay
+    replay: bool = False # Rebuild outputs from archived responses instead of calling the API
+    memory_budget_mb: Optional[int] = None # Limit for responses, queued images and merged JSON chunks held in memory (None: unlimited)
+    manifest_dir: Path = Path.home() / SETTINGS_DIR_NAME / "manifests" # Sync manifests, one per input/output pair
+    sync: bool = False # Only convert new or changed files and remove outputs of deleted ones
     
     output_format: str = "markdown"
+    render_formats: List[str] = field(default_factory=list) # Also written next to the JSON output, rendered locally
+    page_index: bool = False # Write <output>.index.json mapping pages and figures to byte offsets
+    image_dedup: str = "output" # Store repeated images once: off, per output, or across the whole run
+    bundle: Optional[str] = None # Archive each finished output with its images: zip or tar (None: loose files)
+    bundle_path: Optional[Path] = None # With bundle: one archive for the whole run instead of one per output
     langs: str = "English"
     chunk_size: int = 25
+    stable_chunks: bool = False # Place chunk boundaries by page content (chunk_size is the maximum)
+    order: str = "input" # Submission order: input, smallest, largest or deadline
     
     use_llm: bool = False
     strip_existing_ocr: bool = False
@@ -30,25 +68,116 @@ class Config:
     force_ocr: bool = False
     paginate: bool = False
     max_pages: Optional[int] = None
+
+    watch_settle_seconds: float = 2.0 # A file is converted once unchanged for this long
+    watch_poll_interval: float = 2.0 # Scan interval where inotify is unavailable
+    serve_host: str = "127.0.0.1" # Job server bind address
+    serve_port: int = 8765 # Job server port
+    batch_size: int = 8 # Jobs the server, a queue worker or a manifest batch takes at a time
+    tenant_weights: Dict[str, float] = field(default_factory=dict) # Relative share of API capacity per tenant
+    queue_path: Optional[Path] = None # Shared SQLite job queue used in worker mode
+    lease_seconds: float = 600.0 # A worker's claim on a job expires this long after its last heartbeat
+    batch_results: Optional[Path] = None # Batch mode: JSONL result log (default: <manifest>.results.jsonl)
+    batch_offset: Optional[int] = None # Batch mode: byte offset of the manifest line to start at
+    batch_resume: bool = False # Batch mode: continue from the last checkpoint
             
     def validate(self) -> None:
-        if not self.api_key:
+        if not self.api_key and not self.replay:
             raise ConfigurationError("API key is required")
                     
-        if not self.input_path:
+        if self.command == "serve":
+            # Inputs arrive with each job and are validated then
+            if not 0 <= self.serve_port <= 65535:
+                raise ConfigurationError(f"Invalid server port: {self.serve_port}")
+            if any(weight <= 0 for weight in self.tenant_weights.values()):
+                raise ConfigurationError("Tenant weights must be positive")
+        elif not self.input_path:
             raise ConfigurationError("Input path is required")
-            
-        if not Path(self.input_path).exists():
+        elif self.input_path == "-":
+            if self.command != "convert":
+                raise ConfigurationError(f"Reading from stdin is not supported in {self.command} mode")
+            if self.pipe_images_dir and self.pipe_images_tar:
+                raise ConfigurationError("Choose either an images directory or an images tar, not both")
+        elif not Path(self.input_path).exists():
             raise ConfigurationError(f"Input path does not exist: {self.input_path}")
         
+        if self.batch_size < 1:
+            raise ConfigurationError("Batch size must be at least 1")
+
+        if self.command == "worker":
+            if not self.queue_path:
+                raise ConfigurationError("Worker mode needs a queue (--queue)")
+            if self.lease_seconds <= 0:
+                raise ConfigurationError("Lease time must be positive")
+
+        if self.command == "batch":
+            if not Path(self.input_path).is_file():
+                raise ConfigurationError(f"Batch mode needs a manifest file: {self.input_path}")
+            if self.batch_offset is not None and (self.batch_offset < 0 or self.batch_resume):
+                raise ConfigurationError("Batch offset must not be negative or combined with resume")
+
+        if self.command == "watch" and not Path(self.input_path).is_dir():
+            raise ConfigurationError(f"Watch mode needs a directory: {self.input_path}")
+
+        if self.watch_settle_seconds < 0 or self.watch_poll_interval <= 0:
+            raise ConfigurationError("Watch settle time must not be negative and poll interval must be positive")
+
+        if self.order not in ORDER_POLICIES:
+            raise ConfigurationError(f"Unsupported order policy: {self.order}")
+
+        if self.image_dedup not in IMAGE_DEDUP_MODES:
+            raise ConfigurationError(f"Unsupported image deduplication mode: {self.image_dedup}")
+
+        if self.bundle is not None:
+            if self.bundle not in BUNDLE_FORMATS:
+                raise ConfigurationError(f"Unsupported bundle format: {self.bundle}")
+            if self.command == "serve" or self.sync or self.input_path == "-":
+                raise ConfigurationError("Bundles are not supported with serve mode, --sync or stdin input")
+        elif self.bundle_path is not None:
+            raise ConfigurationError("A bundle file needs a bundle format (--bundle)")
+
+        if self.replay and (self.command != "convert" or self.input_path == "-"):
+            raise ConfigurationError("Replay needs files or a directory to convert, not stdin or a server mode")
+
         if self.chunk_size < 1:
             raise ConfigurationError("Chunk size must be at least 1")
             
+        if self.result_store_max_bytes < 1:
+            raise ConfigurationError("Result store size must be positive")
+
+        if self.memory_budget_mb is not None and self.memory_budget_mb < 1:
+            raise ConfigurationError("Memory budget must be at least 1 MB")
+
         if self.max_pages is not None and self.max_pages < 1:
             raise ConfigurationError("Max pages must be at least 1")
             
         if not self.output_format or self.output_format not in SUPPORTED_FORMAT_EXTENSIONS:
             raise ConfigurationError(f"Unsupported output format: {self.output_format}")
+
+        if self.render_formats:
+            unsupported = set(self.render_formats) - set(RENDER_FORMATS)
+            if unsupported:
+                raise ConfigurationError(f"Cannot render format(s): {', '.join(sorted(unsupported))}")
+            if self.output_format != "json":
+                raise ConfigurationError("Rendering other formats needs JSON output")
             
         if self.output_dir is not None and not self.output_dir.is_absolute():
-            raise ConfigurationError(f"Output directory must be an absolute path: {self.output_dir}")
\ No newline at end of file
+            raise ConfigurationError(f"Output directory must be an absolute path: {self.output_dir}")
+
+    def with_job_options(self, input_path: str, options: Dict[str, Any]) -> "Config":
+        """
+        Returns a validated copy of this config for converting one document.
+
+        Raises:
+            ConfigurationError: If an option is unknown or invalid.
+        """
+        unknown = set(options) - JOB_OPTIONS
+        if unknown:
+            raise ConfigurationError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+        try:
+            overrides = {name: _coerce_option(name, value) for name, value in options.items()}
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid option value: {e}") from e
+        config = replace(self, input_path=input_path, command="convert", **overrides)
+        config.validate()
+        return config
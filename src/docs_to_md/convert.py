@@ -0,0 +1,200 @@
+"""
+Library interface for converting documents from Python code.
+
+Example:
+    from docs_to_md import convert_many
+
+    for result in convert_many(["a.pdf", "reports/"], {"use_llm": True}):
+        if result.success:
+            index(result.content)
+"""
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from docs_to_md.api.models import SUPPORTED_INPUT_EXTENSIONS, SUPPORTED_MIME_TYPES
+from docs_to_md.config.settings import Config
+from docs_to_md.core.processor import JobResult, MarkerProcessor
+from docs_to_md.utils.exceptions import ConfigurationError, FileError
+from docs_to_md.utils.file_utils import FileDiscovery
+from docs_to_md.utils.pdf_splitter import count_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, os.PathLike]
+ProgressCallback = Callable[[int, int, "ConversionResult"], None]
+
+
+@dataclass
+class ConversionResult:
+    """Result of converting one document."""
+    input_file: Path
+    success: bool
+    output_file: Optional[Path] = None
+    images: List[Path] = field(default_factory=list)  # Extracted images, sorted by name
+    content: Optional[str] = None  # Converted document text, if read_content was set
+    page_count: Optional[int] = None
+    error: Optional[str] = None
+    submitted_at: Optional[float] = None  # Epoch seconds
+    finished_at: Optional[float] = None
+    from_store: bool = False  # Reused from an earlier identical conversion
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds from submission to result, if known."""
+        if self.submitted_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+
+def _build_config(options: Optional[Dict[str, Any]], api_key: Optional[str]) -> Config:
+    options = dict(options or {})
+    api_key = api_key or options.pop("api_key", None) or os.getenv("MARKER_PDF_KEY")
+    if not api_key:
+        raise ConfigurationError("API key is required; pass api_key or set MARKER_PDF_KEY")
+    if "output_dir" in options and options["output_dir"] is not None:
+        options["output_dir"] = Path(options["output_dir"])
+    try:
+        config = Config(api_key=api_key, input_path="", **options)
+    except TypeError as e:
+        raise ConfigurationError(f"Invalid option: {e}") from e
+    return config
+
+
+def _expand_inputs(paths: Iterable[PathLike]) -> List[Path]:
+    files: List[Path] = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files += FileDiscovery.find_processable_files(
+                path, SUPPORTED_MIME_TYPES, SUPPORTED_INPUT_EXTENSIONS
+            )
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileError(f"Input path does not exist: {path}")
+    return files
+
+
+def _to_result(job: JobResult, read_content: bool) -> ConversionResult:
+    result = ConversionResult(
+        input_file=job.input_file,
+        success=job.success,
+        error=job.error,
+        page_count=job.page_count,
+        submitted_at=job.submitted_at,
+        finished_at=job.finished_at,
+        from_store=job.from_store,
+    )
+    if not job.success:
+        return result
+
+    result.output_file = job.output_paths.markdown_path
+    images_dir = job.output_paths.images_dir
+    if images_dir.is_dir():
+        result.images = sorted(p for p in images_dir.iterdir() if p.is_file())
+    if result.page_count is None and job.input_file.suffix.lower() == ".pdf":
+        result.page_count = count_pdf_pages(job.input_file)
+    if read_content:
+        try:
+            result.content = result.output_file.read_text(encoding="utf-8")
+        except OSError as e:
+            result.success = False
+            result.error = f"Could not read output {result.output_file}: {e}"
+    return result
+
+
+def convert_many(
+    paths: Iterable[PathLike],
+    options: Optional[Dict[str, Any]] = None,
+    progress: Optional[ProgressCallback] = None,
+    api_key: Optional[str] = None,
+    read_content: bool = True,
+) -> Iterator[ConversionResult]:
+    """
+    Converts documents and yields each result once it is known.
+
+    Args:
+        paths: Files and/or directories (searched recursively) to convert.
+        options: Config fields to override, e.g. {"output_format": "json",
+            "use_llm": True, "output_dir": "/abs/out"}.
+        progress: Called as progress(done, total, result) after each document.
+        api_key: Marker API key; defaults to the MARKER_PDF_KEY environment variable.
+        read_content: Load each converted document into ConversionResult.content.
+
+    Yields:
+        One ConversionResult per input file, in the order the documents
+        finish: documents reused from the result store as soon as they are
+        found, the others once the API has finished converting them. Every
+        document is polled until the API reports it complete or failed.
+        Failures are yielded with success=False instead of raising.
+
+    Raises:
+        ConfigurationError: If the options or API key are invalid.
+        FileError: If an input path does not exist.
+    """
+    base_config = _build_config(options, api_key)
+    files = _expand_inputs(paths)
+    if not files:
+        return
+    config = replace(base_config, input_path=str(files[0]))
+    config.validate()
+
+    processor = MarkerProcessor(config)
+    try:
+        jobs = processor.jobs_for_files(files)
+        total = len(jobs)
+        for done, job in enumerate(processor.iter_jobs(jobs), start=1):
+            result = _to_result(job, read_content)
+            if progress:
+                progress(done, total, result)
+            yield result
+    finally:
+        processor.close()
+
+
+async def aconvert_many(
+    paths: Iterable[PathLike],
+    options: Optional[Dict[str, Any]] = None,
+    progress: Optional[ProgressCallback] = None,
+    api_key: Optional[str] = None,
+    read_content: bool = True,
+) -> AsyncIterator[ConversionResult]:
+    """
+    Async version of convert_many.
+
+    The conversion runs in a background thread, so the event loop stays free
+    while documents are uploaded and polled. The progress callback runs in
+    that thread. Arguments and errors are as for convert_many.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def run() -> None:
+        try:
+            for result in convert_many(paths, options, progress, api_key, read_content):
+                loop.call_soon_threadsafe(queue.put_nowait, result)
+                if cancelled.is_set():
+                    break
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    worker = threading.Thread(target=run, name="convert-many", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import OutputPaths, determine_output_paths
+from docs_to_md.core.processor import JobResult, MarkerProcessor
+from docs_to_md.utils.exceptions import ConfigurationError, FileError
+
+logger = logging.getLogger(__name__)
+
+RESULTS_SUFFIX = ".results.jsonl"
+CHECKPOINT_SUFFIX = ".offset"
+
+
+@dataclass
+class BatchManifestLine:
+    """One line of a batch manifest."""
+    offset: int  # Byte offset of the line in the manifest; identifies the entry
+    input_file: Optional[Path] = None
+    output_paths: Optional[OutputPaths] = None
+    config: Optional[Config] = None
+    options_key: str = ""
+    error: Optional[str] = None  # Set if the line cannot be converted
+
+
+@dataclass
+class _Group:
+    """Entries of one window that share their options and can be converted together."""
+    config: Config
+    jobs: List[Tuple[Path, OutputPaths]] = field(default_factory=list)
+    entries: Dict[Path, BatchManifestLine] = field(default_factory=dict)
+
+
+def default_results_path(manifest_path: Path) -> Path:
+    return manifest_path.with_name(manifest_path.name + RESULTS_SUFFIX)
+
+
+class ManifestBatch:
+    """
+    Converts the documents listed in a JSONL manifest.
+
+    Each manifest line is an object such as
+    {"input": "a.pdf", "output": "/out/a.md", "images_dir": "/out/a_img", "options": {"use_llm": true}};
+    only "input" is required, and relative paths are relative to the manifest.
+    Without "output", output paths are chosen as for a normal run.
+
+    The manifest is read lazily, batch_size lines at a time, and one result
+    line is appended to the results log as each document finishes. After every
+    window a checkpoint records how far the manifest has been worked through,
+    so an interrupted run continues where it stopped.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        processor: Optional[MarkerProcessor] = None,
+        results_path: Optional[Path] = None,
+    ):
+        self.config = config
+        self.manifest_path = Path(config.input_path)
+        self.results_path = results_path or config.batch_results or default_results_path(self.manifest_path)
+        self.checkpoint_path = self.results_path.with_name(self.results_path.name + CHECKPOINT_SUFFIX)
+        self.processor = processor or MarkerProcessor(config)
+
+    # --- Manifest reading ---
+
+    def _parse_line(self, offset: int, line: bytes) -> BatchManifestLine:
+        entry = BatchManifestLine(offset)
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict) or not isinstance(record.get("input"), str):
+                raise ValueError('expected an object with an "input" path')
+            options = record.get("options") or {}
+            if not isinstance(options, dict):
+                raise ValueError('"options" must be an object')
+
+            base_dir = self.manifest_path.parent
+            entry.input_file = (base_dir / record["input"]).resolve()
+            entry.config = self.config.with_job_options(str(entry.input_file), options)
+            entry.options_key = json.dumps(options, sort_keys=True)
+            if record.get("output"):
+                output = (base_dir / record["output"]).resolve()
+                images_dir = record.get("images_dir")
+                entry.output_paths = OutputPaths(
+                    output,
+                    (base_dir / images_dir).resolve() if images_dir else output.parent / f"images_{output.stem}",
+                    output.stem,
+                )
+                output.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                entry.output_paths = determine_output_paths(
+                    entry.input_file, entry.config.output_dir, entry.config.output_format
+                )
+        except (ValueError, TypeError, ConfigurationError, FileError, OSError) as e:
+            entry.error = f"Invalid manifest line: {e}"
+        return entry
+
+    def iter_windows(self, start_offset: int = 0) -> Iterator[Tuple[List[BatchManifestLine], int]]:
+        """
+        Yields (entries, next_offset) for each window of up to batch_size lines.
+
+        Raises:
+            FileError: If the manifest cannot be read.
+        """
+        try:
+            manifest: BinaryIO = open(self.manifest_path, "rb")
+        except OSError as e:
+            raise FileError(f"Cannot open manifest {self.manifest_path}: {e}") from e
+        with manifest:
+            manifest.seek(start_offset)
+            offset = start_offset
+            window: List[BatchManifestLine] = []
+            for line in manifest:
+                line_offset, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                window.append(self._parse_line(line_offset, line))
+                if len(window) >= self.config.batch_size:
+                    yield window, offset
+                    window = []
+            if window:
+                yield window, offset
+
+    # --- Results log and checkpoint ---
+
+    def _read_checkpoint(self) -> Tuple[int, int]:
+        """Returns (manifest_offset, results_size) of the last checkpoint, or zeros."""
+        try:
+            data = json.loads(self.checkpoint_path.read_text())
+            return int(data["manifest_offset"]), int(data["results_size"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0
+
+    def _write_checkpoint(self, manifest_offset: int, results_size: int) -> None:
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"manifest_offset": manifest_offset, "results_size": results_size}))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _logged_offsets(self, from_size: int) -> Set[int]:
+        """Manifest offsets of results logged after the checkpoint, i.e. of the interrupted window."""
+        offsets: Set[int] = set()
+        try:
+            with open(self.results_path, "rb") as log:
+                log.seek(from_size)
+                for line in log:
+                    try:
+                        offsets.add(int(json.loads(line)["offset"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Partly written line from the interrupted run
+        except OSError:
+            pass
+        return offsets
+
+    def _record(self, log: BinaryIO, entry: BatchManifestLine, result: Optional[JobResult]) -> None:
+        record: Dict[str, Any] = {
+            "offset": entry.offset,
+            "input": str(entry.input_file) if entry.input_file else None,
+        }
+        if result is None:
+            record.update(status="invalid", error=entry.error)
+        else:
+            duration = None
+            if result.submitted_at is not None and result.finished_at is not None:
+                duration = round(result.finished_at - result.submitted_at, 3)
+            record.update(
+                status="done" if result.success else "failed",
+                output=str(result.output_paths.markdown_path) if result.success else None,
+                images_dir=str(result.output_paths.images_dir) if result.success else None,
+                pages=result.page_count,
+                error=result.error,
+                submitted_at=result.submitted_at,
+                finished_at=result.finished_at,
+                duration=duration,
+                from_store=result.from_store,
+            )
+        log.write(json.dumps(record).encode("utf-8") + b"\n")
+        log.flush()
+
+    # --- Conversion ---
+
+    def _group(self, entries: List[BatchManifestLine]) -> List[_Group]:
+        """Groups valid entries by options; an input listed twice goes into a separate group."""
+        groups: List[Tuple[str, _Group]] = []
+        for entry in entries:
+            for key, group in groups:
+                if key == entry.options_key and entry.input_file not in group.entries:
+                    break
+            else:
+                group = _Group(entry.config)
+                groups.append((entry.options_key, group))
+            group.jobs.append((entry.input_file, entry.output_paths))
+            group.entries[entry.input_file] = entry
+        return [group for _, group in groups]
+
+    def _run_window(self, entries: List[BatchManifestLine], log: BinaryIO) -> Dict[str, int]:
+        counts = {"done": 0, "failed": 0, "invalid": 0}
+        for entry in entries:
+            if entry.error:
+                logger.warning(f"Skipping manifest line at offset {entry.offset}: {entry.error}")
+                self._record(log, entry, None)
+                counts["invalid"] += 1
+
+        for group in self._group([e for e in entries if not e.error]):
+            for result in self.processor.iter_jobs(group.jobs, group.config):
+                self._record(log, group.entries[result.input_file], result)
+                counts["done" if result.success else "failed"] += 1
+        return counts
+
+    def run(self, start_offset: Optional[int] = None, resume: bool = False) -> Dict[str, int]:
+        """
+        Works through the manifest and releases resources.
+
+        Args:
+            start_offset: Byte offset of the manifest line to start at (as logged in "offset").
+            resume: Continue from the last checkpoint, skipping documents already logged.
+
+        Returns:
+            Number of documents per result status.
+
+        Raises:
+            FileError: If the manifest or the results log cannot be opened.
+        """
+        skip: Set[int] = set()
+        if resume:
+            start_offset, results_size = self._read_checkpoint()
+            skip = self._logged_offsets(results_size)
+            logger.info(f"Resuming manifest at byte {start_offset} ({len(skip)} document(s) already done).")
+        start_offset = start_offset or 0
+
+        totals = {"done": 0, "failed": 0, "invalid": 0}
+        try:
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            log = open(self.results_path, "ab" if resume or start_offset else "wb")
+        except OSError as e:
+            raise FileError(f"Cannot open results log {self.results_path}: {e}") from e
+        try:
+            with log:
+                if log.tell() and not self._ends_with_newline():
+                    log.write(b"\n")  # Terminate a line cut off by the interruption
+                for entries, next_offset in self.iter_windows(start_offset):
+                    counts = self._run_window([e for e in entries if e.offset not in skip], log)
+                    for status, count in counts.items():
+                        totals[status] += count
+                    log.flush()
+                    os.fsync(log.fileno())
+                    self._write_checkpoint(next_offset, log.tell())
+                    logger.info(
+                        f"Manifest at byte {next_offset}: {totals['done']} done, "
+                        f"{totals['failed']} failed, {totals['invalid']} invalid."
+                    )
+        finally:
+            self.processor.close()
+        return totals
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.results_path, "rb") as log:
+            log.seek(-1, os.SEEK_END)
+            return log.read(1) == b"\n"
@@ -0,0 +1,145 @@
+"""
+Archive bundles of finished outputs (--bundle zip|tar).
+
+Each finished document (its output, sidecars and images directory) is
+written into an archive, either one per document next to where the output
+would have been or one for the whole run. The loose files are removed once
+the archive holding them is complete and in place.
+Images that are already compressed are stored as they are; in tar bundles,
+images hardlinked by deduplication are stored once.
+"""
+import logging
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from docs_to_md.api.models import SUPPORTED_IMAGE_EXTENSIONS
+from docs_to_md.core.page_index import index_path
+from docs_to_md.core.render import rendered_path
+from docs_to_md.utils.exceptions import ResultProcessingError
+from docs_to_md.utils.file_utils import partial_path, safe_delete
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMATS = ("zip", "tar")
+BUNDLE_EXTENSIONS = {"zip": ".zip", "tar": ".tar"}
+
+
+def bundle_path(output_file: Path, bundle_format: str) -> Path:
+    """The per-document archive of an output."""
+    return output_file.with_suffix(BUNDLE_EXTENSIONS[bundle_format])
+
+
+class BundleWriter:
+    """
+    Writes files into a zip or tar archive, which is renamed into place on close.
+
+    Raises:
+        ResultProcessingError: If the archive cannot be created.
+    """
+
+    def __init__(self, path: Path, bundle_format: str):
+        self.path = path
+        self.bundle_format = bundle_format
+        self._tmp_path = partial_path(path)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._bundled: List[Path] = []  # Loose files and directories removed once the archive is in place
+        try:
+            if bundle_format == "zip":
+                self._zip = zipfile.ZipFile(self._tmp_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+            else:
+                self._tar = tarfile.open(self._tmp_path, "w", format=tarfile.PAX_FORMAT)
+        except OSError as e:
+            raise ResultProcessingError(f"Failed to create bundle {path}: {e}") from e
+
+    def add_file(self, path: Path, arcname: str) -> None:
+        if self._zip is not None:
+            compressed = path.suffix.lower().lstrip(".") in SUPPORTED_IMAGE_EXTENSIONS
+            self._zip.write(path, arcname, zipfile.ZIP_STORED if compressed else zipfile.ZIP_DEFLATED)
+        else:
+            # Files hardlinked to one already in the archive become link members
+            self._tar.add(path, arcname, recursive=False)
+
+    def add_tree(self, directory: Path, prefix: str) -> None:
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                self.add_file(path, f"{prefix}/{path.relative_to(directory).as_posix()}")
+
+    def remove_on_close(self, path: Path) -> None:
+        """Deletes path (a bundled file or directory) once the archive is closed and in place."""
+        self._bundled.append(path)
+
+    def close(self) -> None:
+        archive = self._zip or self._tar
+        archive.close()
+        os.replace(self._tmp_path, self.path)
+        for path in self._bundled:
+            safe_delete(path)
+        self._bundled = []
+
+    def abort(self) -> None:
+        """Closes and removes the unfinished archive; the bundled files are kept."""
+        try:
+            (self._zip or self._tar).close()
+        except Exception:
+            pass
+        safe_delete(self._tmp_path)
+
+
+def bundle_output(writer: BundleWriter, files: List[Path], images_dir: Optional[Path]) -> None:
+    """
+    Adds an output's files (the output and its sidecars) and its images
+    directory to writer, which deletes them once it is closed. Files that do
+    not exist are skipped.
+    """
+    files = [path for path in files if path.is_file()]
+    for path in files:
+        writer.add_file(path, path.name)
+    if images_dir and images_dir.is_dir():
+        writer.add_tree(images_dir, images_dir.name)
+
+    for path in files:
+        writer.remove_on_close(path)
+    if images_dir:
+        writer.remove_on_close(images_dir)
+    if files:
+        logger.debug(f"Bundled {files[0].name} into {writer.path}")
+
+
+def bundle_outputs(
+    outputs: List[Tuple[Path, Optional[Path]]],
+    bundle_format: str,
+    run_writer: Optional[BundleWriter] = None,
+    render_formats: Sequence[str] = (),
+) -> List[Path]:
+    """
+    Moves finished outputs, given as (output file, images directory) pairs,
+    with their page index and rendered formats into archives: run_writer if
+    given, otherwise one archive per output. The loose files stay until their
+    archive is closed, so with run_writer they remain until the end of the run.
+
+    Returns:
+        The archives written to.
+
+    Raises:
+        ResultProcessingError: If an archive cannot be written; a per-output
+            archive is then removed and its loose files are kept.
+    """
+    archives = []
+    for output_file, images_dir in outputs:
+        files = [output_file, index_path(output_file)]
+        files += [rendered_path(output_file, fmt) for fmt in render_formats]
+        writer = run_writer or BundleWriter(bundle_path(output_file, bundle_format), bundle_format)
+        try:
+            bundle_output(writer, files, images_dir)
+            if writer is not run_writer:
+                writer.close()
+        except OSError as e:
+            if writer is not run_writer:
+                writer.abort()
+            raise ResultProcessingError(f"Failed to bundle {output_file} into {writer.path}: {e}") from e
+        archives.append(writer.path)
+    return archives
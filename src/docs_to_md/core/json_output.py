@@ -0,0 +1,105 @@
+"""
+Merging of per-chunk JSON results into one document.
+
+The API returns each chunk as a block tree whose top-level "children" are
+its pages, with block ids ("/page/0/Text/3") counted from the chunk's first
+page. The merged document keeps one "children" array holding every chunk's
+pages in order, ids shifted by the chunk's page offset. It is written piece
+by piece: the opening, each chunk's pages as the chunk becomes available, and
+finally the remaining top-level fields merged across chunks. Only one chunk's
+tree is parsed at a time.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+DOCUMENT_OPEN = b'{"children":['
+PAGE_SEPARATOR = b","
+
+# A block id at the start of a string or quoted inside one (HTML content-refs)
+_PAGE_ID_PATTERN = re.compile(r"""(?:^|(?<=["']))/page/(\d+)(?=/|["']|$)""")
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def renumber_pages(value: Any, offset: int) -> Any:
+    """
+    Returns value with every "/page/N" block id (in strings and keys) and
+    every integer "page_id" (in metadata) shifted by offset.
+    """
+    if not offset:
+        return value
+    if isinstance(value, str):
+        if "/page/" not in value:
+            return value
+        return _PAGE_ID_PATTERN.sub(lambda m: f"/page/{int(m.group(1)) + offset}", value)
+    if isinstance(value, list):
+        return [renumber_pages(item, offset) for item in value]
+    if isinstance(value, dict):
+        return {
+            renumber_pages(key, offset): (
+                item + offset if key == "page_id" and type(item) is int else renumber_pages(item, offset)
+            )
+            for key, item in value.items()
+        }
+    return value
+
+
+def split_tree(tree: Any, offset: int) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Splits a chunk's tree into its renumbered pages and its other top-level fields.
+
+    A tree without a "children" list is kept whole as a single child.
+    """
+    tree = renumber_pages(tree, offset)
+    if isinstance(tree, dict) and isinstance(tree.get("children"), list):
+        children = tree.pop("children")
+        return children, tree
+    return [tree], {}
+
+
+def children_pieces(children: List[Any]) -> List[bytes]:
+    """Serializes each page; written joined by PAGE_SEPARATOR."""
+    return [_dumps(child) for child in children]
+
+
+def children_bytes(children: List[Any], continued: bool) -> bytes:
+    """
+    Serializes pages as members of the merged "children" array.
+
+    Args:
+        continued: Whether pages were already written, so a separator is needed.
+    """
+    if not children:
+        return b""
+    body = PAGE_SEPARATOR.join(children_pieces(children))
+    return PAGE_SEPARATOR + body if continued else body
+
+
+def merge_fields(merged: Dict[str, Any], fields: Dict[str, Any]) -> None:
+    """
+    Merges a later chunk's top-level fields into merged: lists are
+    concatenated, objects merged key by key, anything else keeps the first
+    chunk's value.
+    """
+    for key, value in fields.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(merged[key], list) and isinstance(value, list):
+            merged[key].extend(value)
+        elif isinstance(merged[key], dict) and isinstance(value, dict):
+            merge_fields(merged[key], value)
+
+
+def document_close(fields: Dict[str, Any]) -> bytes:
+    """Ends the "children" array and the document, adding the merged top-level fields."""
+    members = b"".join(b"," + _dumps(key) + b":" + _dumps(value) for key, value in fields.items())
+    return b"]" + members + b"}"
+
+
+def fields_path(result_path: Path) -> Path:
+    """Where a chunk's top-level fields are kept once its pages are in the output."""
+    return result_path.with_name(result_path.name + ".fields")
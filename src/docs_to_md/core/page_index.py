@@ -0,0 +1,136 @@
+"""
+Page offset index written next to an output (<output>.index.json).
+
+Lets readers jump to a page of a large output without scanning it:
+
+    {"version": 1, "size": <output bytes>,
+     "pages": [[page, offset, length], ...],
+     "figures": [[page, offset, reference], ...]}
+
+Pages are 0-based source page numbers. Each entry of "pages" starts at its
+page and runs up to the next entry; with JSON output or --pages (page
+delimiters) there is one entry per page, otherwise one per chunk. Figures
+point at the image reference (or, for JSON, the block) in the output.
+
+Entries are collected per chunk while the chunk is appended and written
+once the output is complete.
+"""
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from docs_to_md.utils.file_utils import FileIO
+
+INDEX_VERSION = 1
+
+_PAGE_DELIMITER = re.compile(rb"\{(\d+)\}-{48}")  # Written by the API with paginate
+_IMAGE_REF = re.compile(rb"""!\[[^\]\n]*\]\(([^)\s]+)|<img\s[^>]*?src=["']([^"']+)""")
+_JSON_FIGURE = re.compile(rb'"id":"(/page/(\d+)/(?:Picture|Figure)/\d+)"')
+_FIGURE_PAGE = re.compile(rb"page_(\d+)_fig")
+_JSON_PAGE_ID = re.compile(r"/page/(\d+)")
+
+ChunkIndex = Dict[str, List[List[Any]]]
+
+
+def index_path(output_file: Path) -> Path:
+    """The index sidecar of an output file."""
+    return output_file.with_name(output_file.name + ".index.json")
+
+
+def chunk_index_path(result_path: Path) -> Path:
+    """Where a chunk's entries are kept once the chunk is in the output."""
+    return result_path.with_name(result_path.name + ".index")
+
+
+def scan_text_chunk(result_path: Path, first_page: int, base: int) -> ChunkIndex:
+    """
+    Indexes a markdown/HTML chunk result that will be written at offset base.
+
+    Page delimiters, if present, give one entry per page; otherwise the chunk
+    is a single entry starting at first_page.
+    """
+    size = result_path.stat().st_size
+    pages: List[List[Any]] = []
+    figures: List[List[Any]] = []
+    if size:
+        with open(result_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            starts = [(first_page + int(m.group(1)), m.start()) for m in _PAGE_DELIMITER.finditer(data)]
+            paginated = bool(starts)
+            if starts and not data[:starts[0][1]].strip():
+                starts[0] = (starts[0][0], 0)  # Leading blank lines belong to the first page
+            if not starts or starts[0][1] > 0:
+                starts.insert(0, (first_page, 0))
+            for (page, start), (_, end) in zip(starts, starts[1:] + [(None, size)]):
+                pages.append([page, base + start, end - start])
+
+            for match in _IMAGE_REF.finditer(data):
+                named = _FIGURE_PAGE.search(match.group(0))
+                if paginated or not named:
+                    page = max(page for page, start in starts if start <= match.start())
+                else:
+                    page = int(named.group(1))  # Image names carry their page number
+                reference = (match.group(1) or match.group(2)).decode("utf-8", "replace")
+                figures.append([page, base + match.start(), reference])
+    else:
+        pages.append([first_page, base, 0])
+    return {"pages": pages, "figures": figures}
+
+
+def index_json_pages(pieces: List[bytes], children: List[Any], first_page: int, base: int,
+                     separator: int) -> ChunkIndex:
+    """
+    Indexes serialized JSON pages written one after another from offset
+    base, with separator bytes before every page but the first.
+    """
+    pages: List[List[Any]] = []
+    figures: List[List[Any]] = []
+    offset = base
+    for i, (piece, child) in enumerate(zip(pieces, children)):
+        if i:
+            offset += separator
+        match = _JSON_PAGE_ID.match(str(child.get("id", ""))) if isinstance(child, dict) else None
+        page = int(match.group(1)) if match else first_page + i
+        pages.append([page, offset, len(piece)])
+        for figure in _JSON_FIGURE.finditer(piece):
+            start = piece.rfind(b"{", 0, figure.start())
+            figures.append([int(figure.group(2)), offset + max(start, 0), figure.group(1).decode()])
+        offset += len(piece)
+    return {"pages": pages, "figures": figures}
+
+
+def save_chunk_index(result_path: Path, entries: ChunkIndex) -> None:
+    FileIO.write_file_atomic(chunk_index_path(result_path), json.dumps(entries))
+
+
+def write_index(output_file: Path, size: int, result_paths: List[Path]) -> Path:
+    """Merges the entries saved for each chunk result into the sidecar of output_file."""
+    pages: List[List[Any]] = []
+    figures: List[List[Any]] = []
+    for result_path in result_paths:
+        entries = json.loads(FileIO.read_text(chunk_index_path(result_path)))
+        pages.extend(entries["pages"])
+        figures.extend(entries["figures"])
+    sidecar = index_path(output_file)
+    FileIO.write_file_atomic(
+        sidecar,
+        json.dumps({"version": INDEX_VERSION, "size": size, "pages": pages, "figures": figures},
+                   separators=(",", ":")),
+    )
+    for result_path in result_paths:
+        chunk_index_path(result_path).unlink(missing_ok=True)
+    return sidecar
+
+
+def page_span(index: Dict[str, Any], page: int) -> Optional[Tuple[int, int]]:
+    """
+    Returns (offset, length) of the output span holding page, or None if the
+    page is not in the index. With one entry per chunk, the span is the whole chunk.
+    """
+    found = None
+    for first_page, offset, length in index["pages"]:
+        if first_page > page:
+            break
+        found = (offset, length)
+    return found
@@ -29,18 +29,23 @@ class OutputPaths:
 
 
 def determine_output_paths(
-    input_file: Path, output_dir_config: Optional[Path], output_format: str
+    input_file: Path,
+    output_dir_config: Optional[Path],
+    output_format: str,
+    unique_key: Optional[str] = None,
 ) -> OutputPaths:
     """
     Determines the final output markdown path and images directory path
     using a unique key for each run.
+    A previously used unique_key can be passed to reproduce the same paths.
     The image directory path is determined but not created here.
     """
     if not input_file.is_file():
         raise ValueError(f"Input path must be a file: {input_file}")
 
-    unique_key = generate_unique_key()
-    logger.debug(f"Generated unique key for run: {unique_key}")
+    if unique_key is None:
+        unique_key = generate_unique_key()
+        logger.debug(f"Generated unique key for run: {unique_key}")
 
     base_output_dir = output_dir_config if output_dir_config else input_file.parent
     try:
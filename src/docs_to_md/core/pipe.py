@@ -0,0 +1,257 @@
+import base64
+import io
+import logging
+import sys
+import tarfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
+
+import filetype
+
+from docs_to_md.api.client import MarkerClient
+from docs_to_md.api.models import SUPPORTED_MIME_TYPES, MarkerStatus, StatusEnum
+from docs_to_md.config.settings import Config
+from docs_to_md.core.processor import build_api_params
+from docs_to_md.core.json_output import DOCUMENT_OPEN, children_bytes, document_close, merge_fields, split_tree
+from docs_to_md.core.result_handler import (
+    CHUNK_SEPARATOR,
+    chunk_page_offset,
+    rewrite_image_refs,
+    transform_image_name,
+)
+from docs_to_md.storage.models import ChunkInfo, Status
+from docs_to_md.utils.exceptions import APIError, FileError, ResultProcessingError
+from docs_to_md.utils.file_utils import ensure_directory
+from docs_to_md.utils.memory import budget_from_mb
+from docs_to_md.utils.pdf_splitter import iter_pdf_chunks_in_memory
+
+logger = logging.getLogger(__name__)
+
+STDIN_NAME = "stdin"
+MAX_WAIT_SECONDS = 3 * 60 * 60  # A pipe cannot be resumed later, so give the API ample time
+
+
+class DirectoryImageSink:
+    """Writes extracted images into a directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.ref_prefix = str(directory)  # Images are referenced as given on the command line
+
+    def add(self, name: str, data: bytes) -> None:
+        ensure_directory(self.directory)
+        (self.directory / name).write_bytes(data)
+
+    def close(self) -> None:
+        pass
+
+
+class TarImageSink:
+    """Streams extracted images into an uncompressed tar archive as they arrive."""
+
+    ref_prefix = "images"
+
+    def __init__(self, fileobj: BinaryIO):
+        # Stream mode never seeks, so pipes and FIFOs work
+        self._tar = tarfile.open(fileobj=fileobj, mode="w|")
+
+    def add(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(f"{self.ref_prefix}/{name}")
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        self._tar.close()
+
+
+ImageSink = Union[DirectoryImageSink, TarImageSink]
+
+
+class PipeConverter:
+    """
+    Converts a document read from a stream and writes the result to a stream.
+
+    Nothing is written below the temp directory: PDFs are split in memory,
+    chunk results are held in memory only until every earlier chunk has been
+    written, and output is streamed in page order as chunks complete. With a
+    memory budget, buffered chunks count against it, so later results that would
+    not fit are left on the server until earlier chunks have been written; the
+    next chunk to be written is fetched regardless.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        client: Optional[MarkerClient] = None,
+        image_sink: Optional[ImageSink] = None,
+        check_interval: float = 5.0,
+    ):
+        self.config = config
+        self.budget = budget_from_mb(config.memory_budget_mb)
+        self.client = client or MarkerClient(config.api_key, budget=self.budget)
+        self.image_sink = image_sink
+        self.check_interval = check_interval
+
+    def _api_params(self) -> Dict:
+        params = asdict(build_api_params(self.config))
+        if self.image_sink is None:
+            # Images would be thrown away, so don't have the API send them
+            params["disable_image_extraction"] = True
+        return params
+
+    def _submit_chunks(self, data: bytes, mime: str, extension: str) -> List[ChunkInfo]:
+        params = self._api_params()
+        if mime == "application/pdf":
+            pieces = iter_pdf_chunks_in_memory(data, self.config.chunk_size)
+        else:
+            pieces = iter([(0, data)])
+
+        chunks: List[ChunkInfo] = []
+        for index, (start_page, chunk_data) in enumerate(pieces):
+            chunk = ChunkInfo(path=Path(f"{STDIN_NAME}_{index:03d}.{extension}"), index=index, start_page=start_page)
+            request_id = self.client.submit_data(chunk.path.name, chunk_data, **params)
+            if not request_id:
+                raise APIError(f"Submission of chunk {index} failed")
+            chunk.mark_processing(request_id)
+            chunks.append(chunk)
+        logger.info(f"Submitted {len(chunks)} chunk(s) from stdin.")
+        return chunks
+
+    def _chunk_output(self, chunk: ChunkInfo, status: MarkerStatus) -> Tuple[bytes, Optional[Dict]]:
+        """
+        Returns the chunk's text and, for JSON output, its top-level fields
+        (the text then holds its pages as members of the merged "children").
+        """
+        fields = None
+        if status.markdown is not None:
+            content = status.markdown
+        elif status.json_data is not None:
+            children, fields = split_tree(status.json_data, chunk_page_offset(chunk, self.config.chunk_size))
+            content = children_bytes(children, continued=False).decode("utf-8")
+        else:
+            raise ResultProcessingError(f"No content in completed API result for chunk {chunk.index}")
+
+        if status.images and self.image_sink is not None:
+            image_map = {}
+            for original_name, b64_content in status.images.items():
+                name = transform_image_name(original_name, chunk, self.config.chunk_size)
+                try:
+                    self.image_sink.add(name, base64.b64decode(b64_content))
+                    image_map[original_name] = f"{self.image_sink.ref_prefix}/{name}"
+                except ValueError as e:
+                    logger.error(f"Failed to decode image '{original_name}' in chunk {chunk.index}: {e}")
+            content = rewrite_image_refs(content, image_map)
+        return content.encode("utf-8"), fields
+
+    def convert(self, source: BinaryIO, output: BinaryIO) -> int:
+        """
+        Converts the document in source and writes it to output.
+
+        Returns:
+            Number of bytes written.
+
+        Raises:
+            FileError: If the input is empty or of an unsupported type.
+            APIError: If submission fails, a chunk fails, or the API takes too long.
+        """
+        data = source.read()
+        if not data:
+            raise FileError("No input received on stdin")
+        kind = filetype.guess(data)
+        if not kind or kind.mime not in SUPPORTED_MIME_TYPES:
+            raise FileError(f"Unsupported input type: {kind.mime if kind else 'unknown'}")
+
+        chunks = self._submit_chunks(data, kind.mime, kind.extension)
+        del data
+
+        finished: Dict[int, Tuple[bytes, Optional[Dict]]] = {}
+        json_fields: Optional[Dict] = None  # Merged top-level fields once JSON output has begun
+        charged: Set[int] = set()  # Chunks in finished whose size is held in the memory budget
+        next_index = 0
+        written = 0
+        deadline = time.monotonic() + MAX_WAIT_SECONDS
+        while next_index < len(chunks):
+            for chunk in chunks:
+                if chunk.status != Status.PROCESSING:
+                    continue
+                # The next chunk to write is always fetched: only it can free the buffered ones
+                status = self.client.check_status(chunk.request_id, admit=chunk.index == next_index)
+                if status is None or status.status == StatusEnum.PROCESSING:
+                    continue
+                if status.status == StatusEnum.FAILED:
+                    raise APIError(f"Chunk {chunk.index} failed: {status.error or 'unknown error'}")
+                piece, fields = self._chunk_output(chunk, status)
+                del status
+                # Only chunks waiting for an earlier one are buffered
+                if chunk.index != next_index and self.budget is not None:
+                    self.budget.charge(len(piece))
+                    charged.add(chunk.index)
+                finished[chunk.index] = (piece, fields)
+                chunk.mark_complete()
+
+            # Emit every chunk whose predecessors have all been written
+            while next_index in finished:
+                piece, fields = finished.pop(next_index)
+                if fields is not None:
+                    # JSON: pages go into one "children" array, closed after the last chunk
+                    if json_fields is None:
+                        json_fields = {}
+                        written += output.write(DOCUMENT_OPEN)
+                    elif piece and written > len(DOCUMENT_OPEN):
+                        written += output.write(b",")
+                    merge_fields(json_fields, fields)
+                elif next_index > 0:
+                    written += output.write(CHUNK_SEPARATOR)
+                written += output.write(piece)
+                output.flush()
+                if next_index in charged:
+                    self.budget.release(len(piece))
+                next_index += 1
+
+            if next_index < len(chunks):
+                if time.monotonic() > deadline:
+                    raise APIError(f"Timed out after {MAX_WAIT_SECONDS}s waiting for the API")
+                time.sleep(self.check_interval)
+
+        if json_fields is not None:
+            written += output.write(document_close(json_fields))
+            output.flush()
+        logger.info(f"Wrote {written} bytes from {len(chunks)} chunk(s).")
+        return written
+
+    def close(self) -> None:
+        if self.image_sink is not None:
+            self.image_sink.close()
+        self.client.close()
+
+
+def run_pipe(config: Config) -> None:
+    """
+    Converts stdin to stdout, sending images to config.pipe_images_dir or
+    config.pipe_images_tar if one is set.
+
+    Raises:
+        FileError: If the images tar cannot be opened, or the input is invalid.
+        APIError: If the conversion fails.
+    """
+    tar_file = None
+    image_sink: Optional[ImageSink] = None
+    if config.pipe_images_tar:
+        try:
+            tar_file = open(config.pipe_images_tar, "wb")
+        except OSError as e:
+            raise FileError(f"Cannot open images tar {config.pipe_images_tar}: {e}") from e
+        image_sink = TarImageSink(tar_file)
+    elif config.pipe_images_dir:
+        image_sink = DirectoryImageSink(config.pipe_images_dir)
+
+    converter = PipeConverter(config, image_sink=image_sink)
+    try:
+        converter.convert(sys.stdin.buffer, sys.stdout.buffer)
+    finally:
+        converter.close()
+        if tar_file:
+            tar_file.close()
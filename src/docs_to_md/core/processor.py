@@ -1,7 +1,12 @@
 import logging
+import os
+import time
 import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Tuple, Dict
+from typing import Iterable, Iterator, Optional, List, Tuple, Dict
 
 from docs_to_md.api.client import MarkerClient
 from docs_to_md.api.models import (
@@ -11,20 +16,37 @@ from docs_to_md.api.models import (
 )
 from docs_to_md.config.settings import Config
 from docs_to_md.storage.cache import CacheManager
-from docs_to_md.storage.models import ConversionRequest, Status
+from docs_to_md.storage.manifest import SyncManifest
+from docs_to_md.storage.models import ConversionRequest, DuplicateTarget, Status
+from docs_to_md.storage.response_archive import ResponseArchive
+from docs_to_md.storage.result_store import ResultStore
 from docs_to_md.utils.exceptions import (
     FileError,
     PDFProcessingError,
     ConfigurationError,
+    ResultProcessingError,
+)
+from docs_to_md.utils.file_utils import (
+    FileDiscovery,
+    TemporaryDirectory,
+    compute_file_hash,
 )
-from docs_to_md.utils.file_utils import FileDiscovery, TemporaryDirectory
 from docs_to_md.utils.pdf_splitter import chunk_pdf_to_temp
 from docs_to_md.utils.logging import ProgressTracker
-from docs_to_md.core.result_handler import ResultHandler
+from docs_to_md.utils.image_dedup import ImageDeduplicator
+from docs_to_md.utils.memory import MemoryBudget, budget_from_mb
+from docs_to_md.core.render import new_render_pool, submit_renders, wait_for_renders
+from docs_to_md.core.bundle import BundleWriter, bundle_outputs
+from docs_to_md.core.replay import ReplayClient, replay_request
+from docs_to_md.core.result_handler import RENDER_WORKERS, ResultHandler, ResultSaver
 from docs_to_md.core.paths import determine_output_paths, OutputPaths
+from docs_to_md.core.scheduler import order_jobs
+from docs_to_md.core.sync import DirectorySync
 
 logger = logging.getLogger(__name__)
 
+POLL_INTERVAL = 5.0  # Seconds between status checks of the in-flight requests
+
 
 class BatchProcessor:
     """Handles processing of files, including chunking if needed."""
@@ -35,6 +57,9 @@ class BatchProcessor:
         cache: CacheManager,
         root_tmp_dir: Path,
         chunk_size: int,
+        result_store: Optional[ResultStore] = None,
+        stable_chunks: bool = False,
+        page_index: bool = False,
     ):
         """
         Initialize the batch processor with shared client and cache.
@@ -44,17 +69,27 @@ class BatchProcessor:
             cache: Initialized CacheManager instance.
             root_tmp_dir: Base directory for temporary files.
             chunk_size: Pages per chunk for PDFs.
+            result_store: Optional store used to reuse unchanged chunk results.
+            stable_chunks: Place chunk boundaries by page content.
+            page_index: Write a page offset index next to each output.
         """
         self.client = client
         self.cache = cache
         self.root_tmp_dir = root_tmp_dir
         self.chunk_size = chunk_size
+        self.result_store = result_store
+        self.stable_chunks = stable_chunks
+        self.page_index = page_index
 
     def should_chunk(self, file_path: Path) -> bool:
         return file_path.suffix.lower() == ".pdf"
 
     def _chunk_file(
-        self, file_path: Path, tmp_dir: Path, request: ConversionRequest
+        self,
+        file_path: Path,
+        tmp_dir: Path,
+        request: ConversionRequest,
+        api_params: ApiParams,
     ) -> bool:
         """Chunk the provided PDF and populate the request object.
 
@@ -62,10 +97,22 @@ class BatchProcessor:
         as failed.
         """
         try:
-            chunk_result = chunk_pdf_to_temp(str(file_path), self.chunk_size, tmp_dir)
+            chunk_result = chunk_pdf_to_temp(
+                str(file_path),
+                self.chunk_size,
+                tmp_dir,
+                stable_boundaries=self.stable_chunks,
+                with_hashes=self.result_store is not None,
+            )
             if chunk_result:
                 for chunk_info in chunk_result.chunks:
-                    request.add_chunk(Path(chunk_info.path), chunk_info.index)
+                    chunk = request.add_chunk(
+                        Path(chunk_info.path), chunk_info.index, chunk_info.start_page
+                    )
+                    if chunk_info.content_hash:
+                        chunk.cache_key = ResultStore.make_chunk_key(
+                            chunk_info.content_hash, api_params
+                        )
                 logger.debug(
                     f"Created {len(request.chunks)} chunks in {tmp_dir}"
                 )
@@ -91,6 +138,17 @@ class BatchProcessor:
         with ProgressTracker(len(request.chunks), "Submitting to API", "chunk") as progress:
             for chunk in request.ordered_chunks:
                 try:
+                    if (
+                        self.result_store
+                        and chunk.cache_key
+                        and self.result_store.get(chunk.cache_key)
+                    ):
+                        logger.debug(
+                            f"Chunk {chunk.index} of {request.original_file.name} is unchanged, reusing stored result."
+                        )
+                        chunk.from_cache = True
+                        continue
+
                     chunk_request_id = self.client.submit_file(
                         chunk.path,
                         output_format=api_params.output_format,
@@ -128,6 +186,8 @@ class BatchProcessor:
         final_output_path: Path,
         api_params: ApiParams,
         output_paths_obj: OutputPaths,
+        result_key: Optional[str] = None,
+        duplicates: Optional[List[DuplicateTarget]] = None,
     ) -> Optional[str]:
         """Process a single file and submit it to the Marker API.
 
@@ -144,16 +204,19 @@ class BatchProcessor:
                 status=Status.PENDING,
                 tmp_dir=tmp_dir,
                 chunk_size=self.chunk_size,
+                page_index=self.page_index,
             )
 
             # Store the determined image dir in the request for the result handler
             request.images_dir = output_paths_obj.images_dir
+            request.result_key = result_key
+            request.duplicates = duplicates or []
 
             self.cache.save(request)
 
             try:
                 if self.should_chunk(file_path):
-                    if self._chunk_file(file_path, tmp_dir, request):
+                    if self._chunk_file(file_path, tmp_dir, request, api_params):
                         return request.request_id
 
                 if not request.chunks:
@@ -190,6 +253,34 @@ class BatchProcessor:
                 return request.request_id
 
 
+def build_api_params(config: Config) -> ApiParams:
+    """Collects the API submission parameters from the configuration."""
+    return ApiParams(
+        output_format=config.output_format,
+        langs=config.langs,
+        use_llm=config.use_llm,
+        strip_existing_ocr=config.strip_existing_ocr,
+        disable_image_extraction=config.disable_image_extraction,
+        force_ocr=config.force_ocr,
+        paginate=config.paginate,
+        max_pages=config.max_pages,
+    )
+
+
+@dataclass
+class JobResult:
+    """Outcome of one input file, reported as soon as it is known."""
+    input_file: Path
+    output_paths: OutputPaths
+    success: bool
+    error: Optional[str] = None
+    page_count: Optional[int] = None  # As reported by the API; None if it reported none
+    submitted_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    from_store: bool = False  # Output was recreated from the result store without an API call
+    request_id: Optional[str] = None  # Request the file was converted by, if it was submitted
+
+
 class MarkerProcessor:
     """Handles the core business logic for processing files via Marker API."""
 
@@ -203,16 +294,128 @@ class MarkerProcessor:
         """
         self.config = config
         self.client = None
+        self.budget: Optional[MemoryBudget] = None
+        self.image_dedup: Optional[ImageDeduplicator] = None  # Shared by all outputs with image_dedup "run"
         self.cache = None
+        self.result_store: Optional[ResultStore] = None
+        self.response_archive: Optional[ResponseArchive] = None  # Records responses (archive_responses)
+        self.saver = ResultSaver()
+        self.sync: Optional[DirectorySync] = None
+        self.completed_files: List[Path] = []  # Inputs whose output was written this run
+        self._file_hashes: Dict[Path, str] = {}
+        self._duplicates: Dict[Path, List[DuplicateTarget]] = {}  # Keyed by representative file
+        self._render_pool: Optional[ProcessPoolExecutor] = None  # Renders --render formats of stored results
+        self.bundle: Optional[BundleWriter] = None  # Archive of the whole run with bundle_path
         try:
-            self.client = MarkerClient(config.api_key)
+            self.budget = budget_from_mb(config.memory_budget_mb)
+            if config.image_dedup == "run":
+                self.image_dedup = ImageDeduplicator()
+            if config.bundle and config.bundle_path:
+                self.bundle = BundleWriter(config.bundle_path, config.bundle)
+            if config.replay:
+                self.client = ReplayClient(ResponseArchive(config.response_archive_dir))
+            else:
+                self.client = MarkerClient(config.api_key, budget=self.budget)
+                if config.archive_responses:
+                    self.response_archive = ResponseArchive(config.response_archive_dir)
             self.cache = CacheManager(config.cache_dir)
+            if config.use_result_store:
+                self.result_store = ResultStore(
+                    config.result_store_dir, config.result_store_max_bytes
+                )
         except Exception as e:
             logger.critical(f"Failed to initialize core components: {e}", exc_info=True)
             raise ConfigurationError(f"Initialization failed: {e}") from e
 
+    def _prepare_sync_jobs(self) -> List[Tuple[Path, OutputPaths]]:
+        """Plans an incremental run against the sync manifest."""
+        input_path = Path(self.config.input_path)
+        manifest = SyncManifest(
+            self.config.manifest_dir,
+            input_path,
+            self.config.output_dir,
+            self.config.output_format,
+        )
+        self.sync = DirectorySync(manifest, self.config.output_dir, self.config.output_format)
+        try:
+            plan = self.sync.plan(input_path)
+        except FileError as fe:
+            logger.error(f"Error finding processable files: {fe}")
+            return []
+        self._file_hashes.update(plan.file_hashes)
+        return plan.jobs
+
+    def _finish_sync(self) -> None:
+        """Records this run's conversions in the sync manifest."""
+        if not self.sync:
+            return
+        for file_path in self.completed_files:
+            self.sync.record_converted(file_path)
+        self.sync.save()
+
+    def _collapse_duplicates(
+        self, jobs: List[Tuple[Path, OutputPaths]]
+    ) -> List[Tuple[Path, OutputPaths]]:
+        """
+        Keeps one job per distinct file content.
+
+        Files are grouped by size first; only files sharing a size are hashed.
+        The first file of each identical group is converted and the others are
+        recorded as its duplicates, to receive copies of its output.
+        """
+        by_size: Dict[int, List[int]] = defaultdict(list)
+        for i, (file_path, _) in enumerate(jobs):
+            try:
+                by_size[os.stat(file_path).st_size].append(i)
+            except OSError as e:
+                logger.debug(f"Could not stat {file_path} for deduplication: {e}")
+
+        duplicate_of: Dict[int, int] = {}
+        for indices in by_size.values():
+            if len(indices) < 2:
+                continue
+            first_with_hash: Dict[str, int] = {}
+            for i in indices:
+                try:
+                    file_hash = self._file_hash(jobs[i][0])
+                except FileError as e:
+                    logger.debug(f"Could not hash {jobs[i][0]} for deduplication: {e}")
+                    continue
+                if file_hash in first_with_hash:
+                    duplicate_of[i] = first_with_hash[file_hash]
+                else:
+                    first_with_hash[file_hash] = i
+
+        if not duplicate_of:
+            return jobs
+
+        for i, representative in duplicate_of.items():
+            file_path, output_paths = jobs[i]
+            self._duplicates.setdefault(jobs[representative][0], []).append(
+                DuplicateTarget(
+                    source_file=file_path,
+                    target_file=output_paths.markdown_path,
+                    images_dir=output_paths.images_dir,
+                )
+            )
+        logger.info(
+            f"Found {len(duplicate_of)} duplicate file(s); each distinct file is converted once."
+        )
+        return [job for i, job in enumerate(jobs) if i not in duplicate_of]
+
     def _prepare_jobs(self) -> List[Tuple[Path, OutputPaths]]:
-        jobs: List[Tuple[Path, OutputPaths]] = []
+        if self.config.sync:
+            jobs = self._prepare_sync_jobs()
+        else:
+            jobs = self._discover_jobs()
+        jobs = self._collapse_duplicates(jobs)
+        return order_jobs(jobs, self.config.order, self.config.max_pages)
+
+    def discover_jobs(self) -> List[Tuple[Path, OutputPaths]]:
+        """Finds the files under the configured input path, in submission order."""
+        return order_jobs(self._discover_jobs(), self.config.order, self.config.max_pages)
+
+    def _discover_jobs(self) -> List[Tuple[Path, OutputPaths]]:
         input_path = Path(self.config.input_path)
         try:
             files_to_process = FileDiscovery.find_processable_files(
@@ -227,12 +430,23 @@ class MarkerProcessor:
             return []
 
         logger.debug(f"Prepared {len(files_to_process)} file(s) for processing.")
-        for file_path in files_to_process:
+        return self.jobs_for_files(files_to_process)
+
+    def jobs_for_files(
+        self, files: List[Path], config: Optional[Config] = None
+    ) -> List[Tuple[Path, OutputPaths]]:
+        """
+        Pairs files with new output paths, skipping files whose paths cannot be
+        determined. config (see process_files) decides where outputs go.
+        """
+        config = config or self.config
+        jobs: List[Tuple[Path, OutputPaths]] = []
+        for file_path in files:
             try:
                 output_paths = determine_output_paths(
                     input_file=file_path,
-                    output_dir_config=self.config.output_dir,
-                    output_format=self.config.output_format,
+                    output_dir_config=config.output_dir,
+                    output_format=config.output_format,
                 )
                 jobs.append((file_path, output_paths))
             except (ValueError, FileError, OSError, Exception) as path_e:
@@ -242,28 +456,107 @@ class MarkerProcessor:
 
         return jobs
 
+    def _build_api_params(self, config: Optional[Config] = None) -> ApiParams:
+        return build_api_params(config or self.config)
+
+    def _file_hash(self, file_path: Path) -> str:
+        """Returns the content hash of a file, computing it at most once per run."""
+        if file_path not in self._file_hashes:
+            self._file_hashes[file_path] = compute_file_hash(file_path)
+        return self._file_hashes[file_path]
+
+    def _result_key(
+        self, file_path: Path, api_params: ApiParams, config: Optional[Config] = None
+    ) -> Optional[str]:
+        """Computes the result key of a file, or None if neither the result store nor the response archive is used."""
+        config = config or self.config
+        if not self.result_store and not self.response_archive and not config.replay:
+            return None
+        try:
+            return ResultStore.make_key(
+                self._file_hash(file_path), api_params, config.chunk_size
+            )
+        except FileError as e:
+            logger.warning(f"Could not hash {file_path}, result store skipped: {e}")
+            return None
+
+    def _restore_stored_result(
+        self,
+        file_path: Path,
+        output_paths: OutputPaths,
+        result_key: Optional[str],
+        config: Optional[Config] = None,
+    ) -> bool:
+        """Recreates a stored result at output_paths. Returns True on a store hit."""
+        config = config or self.config
+        if not self.result_store or not result_key or config.replay:
+            return False
+        entry = self.result_store.get(result_key)
+        if not entry:
+            return False
+        targets = [(file_path, output_paths.markdown_path, output_paths.images_dir)]
+        targets += [
+            (dup.source_file, dup.target_file, dup.images_dir)
+            for dup in self._duplicates.get(file_path, [])
+        ]
+        try:
+            for _, target_file, images_dir in targets:
+                self.saver.replicate_output(
+                    self.result_store.output_path(entry),
+                    self.result_store.images_path(entry),
+                    entry.images_dir_name,
+                    target_file,
+                    images_dir,
+                    link_images=False,
+                )
+            if config.render_formats:
+                # The store keeps the JSON only; the other formats are rendered again
+                if self._render_pool is None:
+                    self._render_pool = new_render_pool(min(RENDER_WORKERS, os.cpu_count() or 1))
+                renders = []
+                for _, target_file, images_dir in targets:
+                    renders += submit_renders(
+                        self._render_pool, target_file, images_dir,
+                        config.render_formats, config.paginate,
+                    )
+                wait_for_renders(renders)
+        except Exception as e:
+            logger.warning(f"Could not reuse stored result for {file_path}, converting again: {e}")
+            return False
+        if config.bundle:
+            try:
+                bundle_outputs(
+                    [(target_file, images_dir) for _, target_file, images_dir in targets],
+                    config.bundle, self.bundle, config.render_formats,
+                )
+            except ResultProcessingError as e:
+                logger.error(f"{e}; the output is kept as loose files.")
+        logger.info(
+            f"Reused stored result for {file_path.name} -> {output_paths.markdown_path} (no API call)."
+        )
+        self.completed_files.extend(source for source, _, _ in targets)
+        return True
+
     def _submit_jobs(
-        self, jobs: List[Tuple[Path, OutputPaths]]
+        self, jobs: List[Tuple[Path, OutputPaths]], config: Optional[Config] = None
     ) -> Dict[str, OutputPaths]:
+        config = config or self.config
         submitted_requests: Dict[str, OutputPaths] = {}
 
         if not jobs:
             return submitted_requests
 
-        api_params = ApiParams(
-            output_format=self.config.output_format,
-            langs=self.config.langs,
-            use_llm=self.config.use_llm,
-            strip_existing_ocr=self.config.strip_existing_ocr,
-            disable_image_extraction=self.config.disable_image_extraction,
-            force_ocr=self.config.force_ocr,
-            paginate=self.config.paginate,
-            max_pages=self.config.max_pages,
-        )
+        api_params = self._build_api_params(config)
 
         logger.info(f"Starting submission process for {len(jobs)} job(s)...")
         batch_processor = BatchProcessor(
-            self.client, self.cache, self.config.root_tmp_dir, self.config.chunk_size
+            self.client,
+            self.cache,
+            config.root_tmp_dir,
+            config.chunk_size,
+            result_store=self.result_store,
+            stable_chunks=config.stable_chunks,
+            page_index=config.page_index,
         )
 
         for file_path, output_paths in jobs:
@@ -271,11 +564,17 @@ class MarkerProcessor:
                 f"Submitting job: {file_path} -> {output_paths.markdown_path} (images: {output_paths.images_dir})"
             )
             try:
+                result_key = self._result_key(file_path, api_params, config)
+                if self._restore_stored_result(file_path, output_paths, result_key, config):
+                    continue
+
                 request_id = batch_processor.process_file(
                     file_path=file_path,
                     final_output_path=output_paths.markdown_path,
                     api_params=api_params,
                     output_paths_obj=output_paths,
+                    result_key=result_key,
+                    duplicates=self._duplicates.get(file_path),
                 )
                 if request_id:
                     submitted_requests[request_id] = output_paths
@@ -294,6 +593,31 @@ class MarkerProcessor:
         )
         return submitted_requests
 
+    def _replay_jobs(
+        self, jobs: List[Tuple[Path, OutputPaths]]
+    ) -> Dict[str, OutputPaths]:
+        """Queues the jobs with archived responses for the result handler to rebuild (replay mode)."""
+        api_params = self._build_api_params()
+        replayed: Dict[str, OutputPaths] = {}
+        for file_path, output_paths in jobs:
+            result_key = self._result_key(file_path, api_params)
+            document = self.client.archive.get_document(result_key) if result_key else None
+            if document is None:
+                logger.warning(f"No archived responses for {file_path} with these options. Skipping.")
+                continue
+            request = replay_request(
+                document,
+                file_path,
+                output_paths,
+                TemporaryDirectory(self.config.root_tmp_dir, file_path.stem).path,
+                page_index=self.config.page_index,
+                duplicates=self._duplicates.get(file_path),
+            )
+            self.cache.save(request)
+            replayed[request.request_id] = output_paths
+        logger.info(f"Replaying {len(replayed)} of {len(jobs)} file(s) from the response archive.")
+        return replayed
+
     def _process_results(self, submitted_requests: Dict[str, OutputPaths]) -> None:
         if not submitted_requests:
             logger.info(
@@ -306,12 +630,235 @@ class MarkerProcessor:
         )
         request_ids_to_process = list(submitted_requests.keys())
 
-        result_handler = ResultHandler(self.client, self.cache, self.config)
+        result_handler = ResultHandler(
+            self.client, self.cache, self.config,
+            result_store=self.result_store, budget=self.budget,
+            image_dedup=self.image_dedup, bundle=self.bundle,
+            response_archive=self.response_archive,
+        )
         try:
-            result_handler.process_cache_items(request_ids_to_process)
+            completed = result_handler.process_cache_items(request_ids_to_process)
+            for req in completed:
+                self.completed_files.append(req.original_file)
+                self.completed_files.extend(dup.source_file for dup in req.duplicates)
         except Exception as e:
             logger.error(f"Error during result processing phase: {e}", exc_info=True)
 
+    def _run_jobs(self, jobs: List[Tuple[Path, OutputPaths]]) -> None:
+        if self.config.replay:
+            submitted_requests = self._replay_jobs(jobs)
+        else:
+            submitted_requests = self._submit_jobs(jobs)
+        self._process_results(submitted_requests)
+
+    def process_files(
+        self, files: List[Path], config: Optional[Config] = None
+    ) -> Dict[Path, OutputPaths]:
+        """
+        Converts the given files with the already initialized client, cache and
+        result store, leaving them open for further calls. Used by long-running
+        modes; per-run state from earlier calls is discarded first.
+
+        Args:
+            files: Input files to convert.
+            config: Conversion options and output location for this call only;
+                defaults to the processor's own configuration.
+
+        Returns:
+            Output paths of the files that were converted successfully.
+        """
+        return self.process_jobs(self.jobs_for_files(files, config), config)
+
+    def process_jobs(
+        self, jobs: List[Tuple[Path, OutputPaths]], config: Optional[Config] = None
+    ) -> Dict[Path, OutputPaths]:
+        """
+        Like process_files, for jobs whose output paths are already decided.
+
+        Returns:
+            Output paths of the files that were converted successfully.
+        """
+        return {
+            result.input_file: result.output_paths
+            for result in self.iter_jobs(jobs, config)
+            if result.success
+        }
+
+    def start_jobs(
+        self, jobs: List[Tuple[Path, OutputPaths]], config: Optional[Config] = None
+    ) -> Tuple[List[JobResult], Dict[str, List[Tuple[Path, OutputPaths]]]]:
+        """
+        Submits jobs without waiting for their conversions.
+
+        Returns:
+            The results known right away (outputs restored from the result
+            store and failed submissions), and the submitted requests with
+            the jobs each one converts, to be finished by poll_requests.
+        """
+        to_run = self._plan_jobs(jobs, config)
+        return self._start_planned(to_run, dict(jobs), config)
+
+    def _plan_jobs(
+        self, jobs: List[Tuple[Path, OutputPaths]], config: Optional[Config] = None
+    ) -> List[Tuple[Path, OutputPaths]]:
+        """Starts a new run: collapses duplicate files and orders the jobs for submission."""
+        self.completed_files = []
+        self._duplicates = {}
+        self._file_hashes = {}  # Files may have changed since the last call
+        config = config or self.config
+        return order_jobs(self._collapse_duplicates(jobs), config.order, config.max_pages)
+
+    def _start_planned(
+        self,
+        to_run: List[Tuple[Path, OutputPaths]],
+        by_file: Dict[Path, OutputPaths],
+        config: Optional[Config] = None,
+    ) -> Tuple[List[JobResult], Dict[str, List[Tuple[Path, OutputPaths]]]]:
+        """Submits planned jobs; by_file holds the output paths of them and their duplicates."""
+        restored_before = len(self.completed_files)
+        submitted_at = time.time()
+        submitted_requests = self._submit_jobs(to_run, config)
+
+        restored = self.completed_files[restored_before:]
+        results = [
+            JobResult(
+                file_path, by_file[file_path], True,
+                submitted_at=submitted_at, finished_at=time.time(), from_store=True,
+            )
+            for file_path in restored
+        ]
+        reported = set(restored)
+        requests: Dict[str, List[Tuple[Path, OutputPaths]]] = {}
+        request_ids = {paths.markdown_path: request_id for request_id, paths in submitted_requests.items()}
+        for file_path, output_paths in to_run:
+            if file_path in reported:
+                continue
+            sources = [file_path] + [d.source_file for d in self._duplicates.get(file_path, [])]
+            request_id = request_ids.get(output_paths.markdown_path)
+            if request_id:
+                requests[request_id] = [(source, by_file[source]) for source in sources]
+                continue
+            for source in sources:
+                results.append(JobResult(
+                    source, by_file[source], False, error="Submission failed",
+                    submitted_at=submitted_at, finished_at=time.time(),
+                ))
+        return results, requests
+
+    def poll_requests(
+        self,
+        requests: Dict[str, List[Tuple[Path, OutputPaths]]],
+        config: Optional[Config] = None,
+        status_checks: Optional[int] = None,
+    ) -> Iterator[JobResult]:
+        """
+        Checks submitted requests and finishes the ones whose conversion is done.
+
+        Yields a result for each job of every request that finished,
+        successfully or not. Requests still processing after status_checks
+        checks of each pending chunk yield nothing, so they can be polled again.
+
+        Args:
+            requests: Submitted requests and their jobs, as returned by start_jobs.
+            config: Conversion options the requests were submitted with.
+            status_checks: Checks per pending chunk and call (see ResultHandler).
+        """
+        if not requests:
+            return
+        handler_options = {} if status_checks is None else {"status_checks": status_checks}
+        result_handler = ResultHandler(
+            self.client, self.cache, config or self.config,
+            result_store=self.result_store, budget=self.budget,
+            image_dedup=self.image_dedup, bundle=self.bundle,
+            response_archive=self.response_archive, **handler_options,
+        )
+        handled = set()
+        for req, done in result_handler.iter_cache_items(list(requests)):
+            handled.add(req.request_id)
+            if not done and self.cache.get(req.request_id):
+                continue  # Still processing; failed requests are removed from the cache
+            for source, output_paths in requests.get(req.request_id, []):
+                yield JobResult(
+                    source,
+                    output_paths,
+                    done,
+                    error=None if done else req.failure_reason,
+                    page_count=req.page_count,
+                    submitted_at=req.created_at,
+                    finished_at=time.time(),
+                    request_id=req.request_id,
+                )
+
+        # Requests missing from the cache never reach the handler's output
+        for request_id, request_jobs in requests.items():
+            if request_id in handled:
+                continue
+            for source, output_paths in request_jobs:
+                yield JobResult(
+                    source, output_paths, False, error="Request state was lost",
+                    finished_at=time.time(), request_id=request_id,
+                )
+
+    def _poll_in_flight(
+        self,
+        in_flight: Dict[str, List[Tuple[Path, OutputPaths]]],
+        config: Optional[Config] = None,
+    ) -> Iterator[JobResult]:
+        """
+        Checks every in-flight request once, yielding the results of those that
+        finished and removing them from in_flight.
+        """
+        for result in self.poll_requests(dict(in_flight), config, status_checks=1):
+            in_flight.pop(result.request_id, None)
+            if result.success:
+                self.completed_files.append(result.input_file)
+            yield result
+
+    def iter_jobs(
+        self,
+        jobs: List[Tuple[Path, OutputPaths]],
+        config: Optional[Config] = None,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> Iterator[JobResult]:
+        """
+        Converts jobs and yields each file's result as soon as it is known.
+
+        Jobs are submitted batch_size at a time, and every submitted request
+        is checked after each batch and then once per poll_interval seconds,
+        so results come in the order conversions finish, not the order they
+        were submitted in. Requests are polled until the API reports them
+        complete or failed. Every job yields exactly one result.
+        config (see process_files) applies to these jobs only.
+        """
+        batch_size = (config or self.config).batch_size
+        submitted_at = time.time()
+        to_run = self._plan_jobs(jobs, config)
+        by_file = dict(jobs)
+        reported = set()
+        in_flight: Dict[str, List[Tuple[Path, OutputPaths]]] = {}
+
+        def report(results: Iterable[JobResult]) -> Iterator[JobResult]:
+            for result in results:
+                if result.input_file not in reported:
+                    reported.add(result.input_file)
+                    yield result
+
+        for start in range(0, len(to_run), batch_size):
+            results, requests = self._start_planned(to_run[start:start + batch_size], by_file, config)
+            yield from report(results)
+            in_flight.update(requests)
+            yield from report(self._poll_in_flight(in_flight, config))
+        while in_flight:
+            time.sleep(poll_interval)
+            yield from report(self._poll_in_flight(in_flight, config))
+
+        for file_path, output_paths in jobs:
+            if file_path not in reported:
+                yield JobResult(
+                    file_path, output_paths, False, error="Request state was lost",
+                    submitted_at=submitted_at, finished_at=time.time(),
+                )
+
     def process(self) -> None:
         if not self.client or not self.cache:
             logger.critical(
@@ -327,10 +874,13 @@ class MarkerProcessor:
                 logger.info("No jobs to run. Exiting workflow.")
                 return
 
-            submitted_requests = self._submit_jobs(jobs_to_run)
-
-            self._process_results(submitted_requests)
+            self._run_jobs(jobs_to_run)
 
+            if self.image_dedup and self.image_dedup.files_linked:
+                logger.info(
+                    f"Stored {self.image_dedup.files_linked} repeated image(s) once across the run, "
+                    f"saving {self.image_dedup.bytes_saved} bytes."
+                )
             logger.info("Processing workflow finished.")
 
         except Exception as e:
@@ -339,9 +889,29 @@ class MarkerProcessor:
             )
             raise FileError(f"Processing workflow failed: {e}") from e
         finally:
-            if self.cache:
-                try:
-                    logger.debug("Closing cache manager.")
-                    self.cache.close()
-                except Exception as ce:
-                    logger.error(f"Error closing cache manager: {ce}", exc_info=False)
+            try:
+                self._finish_sync()
+            except Exception as se:
+                logger.error(f"Error saving sync manifest: {se}", exc_info=False)
+            self.close()
+
+    def close(self) -> None:
+        """Releases the cache and the API client's connection pool."""
+        if self.cache:
+            try:
+                logger.debug("Closing cache manager.")
+                self.cache.close()
+            except Exception as ce:
+                logger.error(f"Error closing cache manager: {ce}", exc_info=False)
+        if self.client:
+            self.client.close()
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=True)
+            self._render_pool = None
+        if self.bundle is not None:
+            try:
+                self.bundle.close()
+                logger.info(f"Wrote bundle {self.bundle.path}.")
+            except Exception as be:
+                logger.error(f"Error closing bundle {self.bundle.path}: {be}", exc_info=False)
+            self.bundle = None
@@ -0,0 +1,317 @@
+"""
+Local rendering of markdown and HTML from a JSON block tree.
+
+With --render, documents are converted once as JSON and the other formats
+are produced here instead of by further API conversions. Each target is
+rendered in its own process, reading the JSON output one page at a time.
+"""
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from html import escape
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from docs_to_md.api.models import SUPPORTED_FORMAT_EXTENSIONS
+from docs_to_md.api.stream import STREAM_BLOCK_SIZE, iter_json_array
+from docs_to_md.utils.exceptions import ResultProcessingError
+from docs_to_md.utils.file_utils import decode_base64_to_file, ensure_directory, partial_path
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_REF = re.compile(r"""<content-ref\s+src=['"]([^'"]+)['"]\s*/?>(?:</content-ref>)?""")
+_SKIPPED_IN_MARKDOWN = {"PageHeader", "PageFooter"}  # Running heads repeat on every page
+_HTML_BLOCKS = {"Table", "TableOfContents", "Form"}  # Rendered from their own HTML, not their cells
+_IMAGE_SIGNATURES = {"iVBOR": "png", "/9j/": "jpeg", "R0lGOD": "gif", "SUkq": "tiff", "TU0A": "tiff"}
+_HEADINGS = {f"h{level}": level for level in range(1, 7)}
+
+
+def rendered_path(json_path: Path, output_format: str) -> Path:
+    """The file a format rendered from json_path is written to."""
+    return json_path.with_suffix(SUPPORTED_FORMAT_EXTENSIONS[output_format])
+
+
+def _iter_pages(json_path: Path) -> Iterator[Dict[str, Any]]:
+    with open(json_path, "rb") as f:
+        blocks = iter(lambda: f.read(STREAM_BLOCK_SIZE), b"")
+        for page in iter_json_array(blocks, "children"):
+            if isinstance(page, dict):
+                yield page
+
+
+def _page_number(page: Dict[str, Any], default: int) -> int:
+    match = re.match(r"/page/(\d+)", str(page.get("id", "")))
+    return int(match.group(1)) if match else default
+
+
+class _Images:
+    """Writes images embedded in blocks to the images directory and returns their references."""
+
+    def __init__(self, images_dir: Path):
+        self.images_dir = images_dir
+
+    def refs(self, block: Dict[str, Any]) -> List[str]:
+        images = block.get("images")
+        if not isinstance(images, dict):
+            return []
+        refs = []
+        for block_id, data in images.items():
+            if not isinstance(data, str):
+                continue
+            extension = next(
+                (ext for prefix, ext in _IMAGE_SIGNATURES.items() if data.startswith(prefix)), "jpeg"
+            )
+            name = f"{block_id.strip('/').replace('/', '_').lower()}.{extension}"
+            path = self.images_dir / name
+            if not path.exists():
+                # Written under a private name first; the other format's renderer may want it too
+                ensure_directory(self.images_dir)
+                tmp_path = path.with_name(f".{name}.{os.getpid()}")
+                try:
+                    decode_base64_to_file(data, tmp_path)
+                    os.replace(tmp_path, path)
+                except (ValueError, OSError) as e:
+                    logger.error(f"Failed to write image {block_id} to {path}: {e}")
+                    continue
+            refs.append(f"{self.images_dir.name}/{name}")
+        return refs
+
+
+def _resolve_html(block: Dict[str, Any], images: _Images) -> str:
+    """The block's HTML with its content-refs replaced by its children's HTML."""
+    refs = images.refs(block)
+    if refs:
+        return "".join(f"<img src='{escape(ref)}'/>" for ref in refs)
+    children = {
+        child.get("id"): child for child in block.get("children") or [] if isinstance(child, dict)
+    }
+    html = block.get("html") or ""
+    if not children:
+        return html
+    used = set()
+
+    def replace(match: re.Match) -> str:
+        child = children.get(match.group(1))
+        if child is None:
+            return ""
+        used.add(match.group(1))
+        return _resolve_html(child, images)
+
+    html = _CONTENT_REF.sub(replace, html)
+    # Children the HTML does not place are appended in order
+    return html + "".join(
+        _resolve_html(child, images) for child_id, child in children.items() if child_id not in used
+    )
+
+
+class _MarkdownWriter(HTMLParser):
+    """Converts the HTML of a block to markdown."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self._href: List[Optional[str]] = []
+        self._pre = 0
+        self._list_depth = 0
+        self._math: List[str] = []  # Delimiter of each open <math>
+        self._rows: Optional[List[List[str]]] = None  # Table being collected
+        self._cell: Optional[List[str]] = None
+
+    def _emit(self, text: str) -> None:
+        if self._cell is not None:
+            self._cell.append(text)
+        else:
+            self.out.append(text)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        if tag in _HEADINGS:
+            self._emit("\n\n" + "#" * _HEADINGS[tag] + " ")
+        elif tag in ("p", "div", "blockquote"):
+            self._emit("\n\n")
+        elif tag in ("b", "strong"):
+            self._emit("**")
+        elif tag in ("i", "em"):
+            self._emit("*")
+        elif tag == "code" and not self._pre:
+            self._emit("`")
+        elif tag == "pre":
+            self._pre += 1
+            self._emit("\n\n```\n")
+        elif tag == "br":
+            self._emit("\n")
+        elif tag in ("ul", "ol"):
+            self._list_depth += 1
+        elif tag == "li":
+            self._emit("\n" + "  " * max(self._list_depth - 1, 0) + "- ")
+        elif tag == "a":
+            self._href.append(attributes.get("href"))
+            self._emit("[")
+        elif tag == "img":
+            self._emit(f"![{attributes.get('alt') or ''}]({attributes.get('src') or ''})")
+        elif tag == "math":
+            delimiter = "$$" if attributes.get("display") == "block" else "$"
+            self._math.append(delimiter)
+            self._emit(("\n\n" if delimiter == "$$" else "") + delimiter)
+        elif tag == "table":
+            self._rows = []
+        elif tag == "tr" and self._rows is not None:
+            self._rows.append([])
+        elif tag in ("td", "th") and self._rows is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _HEADINGS or tag in ("p", "div", "blockquote"):
+            self._emit("\n\n")
+        elif tag in ("b", "strong"):
+            self._emit("**")
+        elif tag in ("i", "em"):
+            self._emit("*")
+        elif tag == "code" and not self._pre:
+            self._emit("`")
+        elif tag == "pre":
+            self._pre = max(self._pre - 1, 0)
+            self._emit("\n```\n\n")
+        elif tag in ("ul", "ol"):
+            self._list_depth = max(self._list_depth - 1, 0)
+            self._emit("\n\n")
+        elif tag == "a":
+            href = self._href.pop() if self._href else None
+            self._emit(f"]({href})" if href else "]")
+        elif tag == "math" and self._math:
+            delimiter = self._math.pop()
+            self._emit(delimiter + ("\n\n" if delimiter == "$$" else ""))
+        elif tag in ("td", "th") and self._cell is not None:
+            text = " ".join("".join(self._cell).split()).replace("|", "\\|")
+            if self._rows:
+                self._rows[-1].append(text)
+            self._cell = None
+        elif tag == "table" and self._rows is not None:
+            rows = [row for row in self._rows if row]
+            self._rows = None
+            if rows:
+                width = max(len(row) for row in rows)
+                lines = ["| " + " | ".join(row + [""] * (width - len(row))) + " |" for row in rows]
+                lines.insert(1, "|" + "---|" * width)
+                self._emit("\n\n" + "\n".join(lines) + "\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._pre:
+            data = re.sub(r"\s+", " ", data)
+        self._emit(data)
+
+    def markdown(self) -> str:
+        self.close()
+        text = "".join(self.out)
+        lines = [line.rstrip() for line in text.split("\n")]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip("\n")
+
+
+def html_to_markdown(html: str) -> str:
+    """Converts the HTML of a block to markdown."""
+    writer = _MarkdownWriter()
+    writer.feed(html)
+    return writer.markdown()
+
+
+def _block_markdown(block: Dict[str, Any], images: _Images) -> str:
+    block_type = block.get("block_type")
+    if block_type in _SKIPPED_IN_MARKDOWN:
+        return ""
+    refs = images.refs(block)
+    if refs:
+        return "\n\n".join(f"![]({ref})" for ref in refs)
+    children = [child for child in block.get("children") or [] if isinstance(child, dict)]
+    if children and block_type not in _HTML_BLOCKS:
+        separator = "\n" if block_type == "ListGroup" else "\n\n"
+        parts = (_block_markdown(child, images) for child in children)
+        return separator.join(part for part in parts if part)
+    return html_to_markdown(_resolve_html(block, images))
+
+
+def _markdown_pages(pages: Iterator[Dict[str, Any]], images: _Images, paginate: bool) -> Iterator[str]:
+    for index, page in enumerate(pages):
+        text = _block_markdown(page, images)
+        if paginate:
+            yield f"\n\n{{{_page_number(page, index)}}}" + "-" * 48 + "\n\n" + text
+        elif text:
+            yield ("\n\n" if index else "") + text
+    yield "\n"
+
+
+def _html_pages(pages: Iterator[Dict[str, Any]], images: _Images, paginate: bool) -> Iterator[str]:
+    yield '<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head><body>\n'
+    for index, page in enumerate(pages):
+        yield (
+            f"<div class='page' data-page-id='{_page_number(page, index)}'>"
+            f"{_resolve_html(page, images)}</div>\n"
+        )
+    yield "</body></html>\n"
+
+
+_RENDERERS: Dict[str, Callable[[Iterator[Dict[str, Any]], _Images, bool], Iterator[str]]] = {
+    "markdown": _markdown_pages,
+    "html": _html_pages,
+}
+
+
+def render_file(json_path: Path, output_format: str, target: Path, images_dir: Path, paginate: bool = False) -> int:
+    """
+    Renders a JSON output to target, page by page; images embedded in the
+    tree are written to images_dir. The target is renamed into place once
+    complete.
+
+    Returns:
+        Number of bytes written.
+    """
+    renderer = _RENDERERS[output_format]
+    tmp_path = partial_path(target)
+    written = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for piece in renderer(_iter_pages(json_path), _Images(images_dir), paginate):
+                written += f.write(piece)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    return written
+
+
+def new_render_pool(workers: int) -> ProcessPoolExecutor:
+    """A process pool for render_file; rendering is CPU-bound, so it runs outside this process."""
+    # Spawned rather than forked: the parent has image writer threads running
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def submit_renders(
+    pool: Executor, json_path: Path, images_dir: Path, formats: List[str], paginate: bool = False
+) -> List[Tuple[Path, Future]]:
+    """Starts rendering json_path to each format; returns (target, future) pairs."""
+    return [
+        (target, pool.submit(render_file, json_path, output_format, target, images_dir, paginate))
+        for output_format in formats
+        for target in [rendered_path(json_path, output_format)]
+    ]
+
+
+def wait_for_renders(renders: List[Tuple[Path, Future]]) -> None:
+    """
+    Waits for submitted renders.
+
+    Raises:
+        ResultProcessingError: If any of them failed (after all have finished).
+    """
+    errors = []
+    for target, future in renders:
+        try:
+            future.result()
+            logger.debug(f"Rendered {target}")
+        except Exception as e:
+            errors.append(f"{target.name}: {e}")
+    if errors:
+        raise ResultProcessingError(f"Failed to render {len(errors)} output(s): {'; '.join(errors)}")
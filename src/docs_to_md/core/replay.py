@@ -0,0 +1,81 @@
+"""
+Replay mode (--replay): rebuilds outputs from the response archive.
+
+Each input is looked up in the archive by its result key. Its chunks are
+queued as if they had been submitted, and ReplayClient answers the result
+handler's status checks from the archived responses, so naming, image
+handling and assembly run exactly as for a live conversion, without the API.
+"""
+import logging
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from docs_to_md.api.models import MarkerStatus, StatusEnum
+from docs_to_md.api.stream import STREAM_BLOCK_SIZE, StatusSink, parse_status_stream
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.storage.models import ArchivedDocument, ConversionRequest, DuplicateTarget, Status
+from docs_to_md.storage.response_archive import ResponseArchive
+
+logger = logging.getLogger(__name__)
+
+REPLAY_REQUEST_PREFIX = "replay:"
+
+
+class ReplayClient:
+    """Stands in for MarkerClient: status checks are answered from the response archive."""
+
+    def __init__(self, archive: ResponseArchive):
+        self.archive = archive
+
+    def submit_file(self, file_path: Path, **kwargs) -> Optional[str]:
+        logger.error(f"Not submitting {file_path}: replay mode never calls the API.")
+        return None
+
+    def check_status(self, request_id: str, sink: Optional[StatusSink] = None) -> Optional[MarkerStatus]:
+        """Returns the archived response of a replayed chunk, like MarkerClient.check_status."""
+        response_key = request_id[len(REPLAY_REQUEST_PREFIX):]
+        try:
+            with self.archive.open_response(response_key) as response:
+                blocks = iter(lambda: response.read(STREAM_BLOCK_SIZE), b"")
+                if sink is not None:
+                    return parse_status_stream(blocks, sink)
+                return MarkerStatus.model_validate_json(b"".join(blocks))
+        except (OSError, ValueError) as e:
+            if sink is not None:
+                sink.discard()
+            # Reported as failed rather than retried: the archive will not change
+            return MarkerStatus(status=StatusEnum.FAILED, error=f"Archived response unreadable: {e}")
+
+    def close(self) -> None:
+        pass
+
+
+def replay_request(
+    document: ArchivedDocument,
+    file_path: Path,
+    output_paths: OutputPaths,
+    tmp_dir: Path,
+    page_index: bool = False,
+    duplicates: Optional[List[DuplicateTarget]] = None,
+) -> ConversionRequest:
+    """A request for file_path whose chunks are answered from document's archived responses."""
+    request = ConversionRequest(
+        request_id=str(uuid.uuid4()),
+        original_file=file_path,
+        target_file=output_paths.markdown_path,
+        output_format=document.output_format,
+        status=Status.PROCESSING,
+        tmp_dir=tmp_dir,
+        chunk_size=document.chunk_size,
+        page_index=page_index,
+        images_dir=output_paths.images_dir,
+        result_key=document.key,
+        duplicates=duplicates or [],
+    )
+    for archived in document.chunks:
+        # Chunk files are never read; the name only keeps temp results apart
+        chunk_path = tmp_dir / f"{file_path.stem}_chunk_{archived.index}{file_path.suffix}"
+        chunk = request.add_chunk(chunk_path, archived.index, archived.start_page)
+        chunk.mark_processing(REPLAY_REQUEST_PREFIX + archived.response)
+    return request
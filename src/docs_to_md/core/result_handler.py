@@ -1,29 +1,232 @@
-import base64
 import json
 import logging
+import os
 import re
-import shutil
 import time
 import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 from docs_to_md.api.client import MarkerClient
+from docs_to_md.api.stream import StatusSink
 from docs_to_md.api.models import MarkerStatus, StatusEnum, SUPPORTED_IMAGE_EXTENSIONS
 from docs_to_md.config.settings import Config
+from docs_to_md.core.bundle import BundleWriter, bundle_outputs
+from docs_to_md.core.json_output import (
+    DOCUMENT_OPEN,
+    PAGE_SEPARATOR,
+    children_pieces,
+    document_close,
+    fields_path,
+    merge_fields,
+    split_tree,
+)
+from docs_to_md.core.page_index import index_json_pages, save_chunk_index, scan_text_chunk, write_index
+from docs_to_md.core.render import new_render_pool, submit_renders, wait_for_renders
 from docs_to_md.storage.cache import CacheManager
-from docs_to_md.storage.models import ChunkInfo, ConversionRequest, Status
-from docs_to_md.utils.exceptions import ResultProcessingError
-from docs_to_md.utils.file_utils import FileIO, ensure_directory, safe_delete
+from docs_to_md.storage.models import ArchivedChunk, ArchivedDocument, ChunkInfo, ConversionRequest, Status
+from docs_to_md.storage.response_archive import ResponseArchive
+from docs_to_md.storage.result_store import ResultStore
+from docs_to_md.utils.exceptions import CacheError, ResultProcessingError
+from docs_to_md.utils.file_utils import (
+    FileIO,
+    TemporaryDirectory,
+    append_file,
+    copy_tree,
+    decode_base64_to_file,
+    ensure_directory,
+    link_or_copy,
+    link_or_copy_tree,
+    move_or_copy_tree,
+    partial_path,
+    safe_delete,
+)
 from docs_to_md.utils.logging import ProgressTracker
+from docs_to_md.utils.image_dedup import ImageDeduplicator
+from docs_to_md.utils.memory import MemoryBudget
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SEPARATOR = b"\n\n"  # Written between the results of consecutive chunks
+RENDER_WORKERS = 4  # Processes rendering --render formats
+JSON_TREE_MEMORY_FACTOR = 8  # Rough memory held per byte of a chunk's JSON while it is parsed and merged
+REWRITE_BLOCK_SIZE = 1024 * 1024  # Characters read at a time when rewriting image references in a file
+
+
+def chunk_page_offset(chunk: ChunkInfo, chunk_size: int) -> int:
+    """Index of the chunk's first page in the source document."""
+    if chunk.start_page is not None:
+        return chunk.start_page
+    return chunk.index * chunk_size
+
+
+def transform_image_name(original_name: str, chunk: ChunkInfo, chunk_size: int) -> str:
+    """Generates a structured image name based on chunk index and page/figure numbers."""
+    base_page_num = chunk_page_offset(chunk, chunk_size) + 1
+    extension = "jpg"
+    parts = original_name.split(".")
+    if len(parts) > 1:
+        image_extension = parts[-1].lower()
+        if image_extension in SUPPORTED_IMAGE_EXTENSIONS:
+            extension = image_extension
+
+    page_match = re.search(
+        r"(?:_|-)page(?:_|-)?(\d+)", original_name, re.IGNORECASE
+    )
+    figure_match = re.search(
+        r"(?:_|-)(?:figure|fig)(?:_|-)?(\d+)", original_name, re.IGNORECASE
+    )
+
+    if page_match and figure_match:
+        try:
+            page_num = int(page_match.group(1))
+            figure_num = int(figure_match.group(1))
+            corrected_page_num = base_page_num + page_num - 1
+            markdown_name = (
+                f"page_{corrected_page_num}_figure_{figure_num}.{extension}"
+            )
+            return markdown_name
+        except ValueError:
+            logger.warning(
+                f"Could not parse page/figure numbers from {original_name}"
+            )
+
+    timestamp = datetime.now().strftime("%H%M%S")
+    random_suffix = uuid.uuid4().hex[:6]
+    fallback_name = (
+        f"chunk_{chunk.index}_img_{timestamp}_{random_suffix}.{extension}"
+    )
+    logger.debug(
+        f"Using fallback name {fallback_name} for original image {original_name}"
+    )
+    return fallback_name
+
+
+# An image reference: markdown ](name), HTML src="name" (quotes may be JSON-escaped)
+# or a JSON string "name". The name is looked up, so one scan covers every image.
+_IMAGE_REF_OPEN = r"""(?P<open>\]\(|src=\\?["']|")"""
+_IMAGE_REF_NAME = r"""[^"'()<>\\\s]+"""
+_IMAGE_REF_END = r"""(?=[)"'\\\s])"""
+_IMAGE_REF_PATTERN = re.compile(f"{_IMAGE_REF_OPEN}(?P<name>{_IMAGE_REF_NAME}){_IMAGE_REF_END}")
+_PLAIN_IMAGE_NAME = re.compile(_IMAGE_REF_NAME)
+
+
+def _image_ref_pattern(image_map: Dict[str, str]) -> re.Pattern:
+    """
+    _IMAGE_REF_PATTERN, extended with the names in image_map it cannot capture
+    (e.g. with parentheses or spaces). Those are tried first as reference names
+    and are also replaced literally wherever else they occur.
+    """
+    literal = [name for name in image_map if not _PLAIN_IMAGE_NAME.fullmatch(name)]
+    if not literal:
+        return _IMAGE_REF_PATTERN
+    names = "|".join(re.escape(name) for name in sorted(literal, key=len, reverse=True))
+    return re.compile(
+        f"{_IMAGE_REF_OPEN}(?P<name>{names}|{_IMAGE_REF_NAME}){_IMAGE_REF_END}|(?P<literal>{names})"
+    )
+
+
+def _replace_image_ref(match: re.Match, image_map: Dict[str, str]) -> str:
+    literal = match.groupdict().get("literal")
+    if literal is not None:
+        return image_map[literal]
+    new_ref = image_map.get(match.group("name"))
+    if new_ref is None:
+        return match.group(0)
+    return match.group("open") + new_ref
+
+
+def rewrite_image_refs(content: str, image_map: Dict[str, str]) -> str:
+    """Points image references in content at their final relative paths, in a single pass."""
+    if not image_map:
+        return content
+    return _image_ref_pattern(image_map).sub(lambda match: _replace_image_ref(match, image_map), content)
+
+
+def rewrite_image_refs_in_file(
+    source: Path,
+    target: Path,
+    image_map: Dict[str, str],
+    block_size: int = REWRITE_BLOCK_SIZE,
+    remove_source: bool = True,
+) -> None:
+    """
+    Like rewrite_image_refs, streaming source into target; source is removed
+    unless remove_source is False.
+
+    The file is read block_size characters at a time, however long its lines
+    (a JSON result is a single line). The tail of each block that could hold
+    the start of a reference cut off by the block end is carried over to the
+    next one.
+    """
+    if not image_map:
+        if remove_source:
+            os.replace(source, target)
+        else:
+            link_or_copy(source, target)
+        return
+    pattern = _image_ref_pattern(image_map)
+    # Longest mapped reference: opening (at most 6 characters), name and the character after it
+    overlap = max(len(name) for name in image_map) + 8
+    with open(source, "r", encoding="utf-8", newline="") as infile, \
+            open(target, "w", encoding="utf-8", newline="") as outfile:
+        text = ""
+        while True:
+            block = infile.read(block_size)
+            text += block
+            if not block:
+                outfile.write(pattern.sub(lambda match: _replace_image_ref(match, image_map), text))
+                break
+            cut = len(text) - overlap
+            if cut <= 0:
+                continue
+            pos = 0
+            for match in pattern.finditer(text):
+                if match.start() >= cut:
+                    break
+                outfile.write(text[pos:match.start()])
+                outfile.write(_replace_image_ref(match, image_map))
+                pos = match.end()
+            cut = max(cut, pos)
+            outfile.write(text[pos:cut])
+            text = text[cut:]
+    if remove_source:
+        safe_delete(source)
+
+
+def _replace_in_file(source: Path, target: Path, old: str, new: str, block_size: int = REWRITE_BLOCK_SIZE) -> None:
+    """Copies source to target with every occurrence of old replaced by new, a block at a time."""
+    with open(source, "r", encoding="utf-8", newline="") as infile, \
+            open(target, "w", encoding="utf-8", newline="") as outfile:
+        text = ""
+        while True:
+            block = infile.read(block_size)
+            text += block
+            if not block:
+                outfile.write(text.replace(old, new))
+                return
+            # Everything up to the last len(old) - 1 characters is complete
+            cut = len(text) - len(old) + 1
+            end = text.rfind(old, 0, cut + len(old) - 1)
+            if end >= 0:
+                cut = max(cut, end + len(old))
+            if cut > 0:
+                outfile.write(text[:cut].replace(old, new))
+                text = text[cut:]
+
 
 class ResultSaver:
     """Handles saving combined results and moving assets."""
 
+    def __init__(self, budget: Optional[MemoryBudget] = None):
+        """
+        Args:
+            budget: Optional memory budget; JSON chunk results count against it while they are merged.
+        """
+        self.budget = budget
+
     def save_content(self, content: str, path: Path) -> None:
         """Saves text content to a file."""
         try:
@@ -33,11 +236,132 @@ class ResultSaver:
         except Exception as e:
             raise ResultProcessingError(f"Failed to save content to {path}: {e}") from e
 
+    def append_ready_chunks(self, req: ConversionRequest) -> int:
+        """
+        Appends every complete chunk whose predecessors are all in the output.
+
+        Chunk N is written to the partial output (req.target_file plus
+        ".partial") as soon as chunks 0..N are complete, and its temporary
+        result is deleted right away, so the partial file can be followed
+        while the document converts and only out-of-order chunks wait on disk.
+        Progress is kept in req.assembled_chunks / req.assembled_bytes; an
+        append cut off by a crash is truncated away on the next call.
+
+        JSON output is one document: each chunk adds its pages to a shared
+        "children" array, and combine_results closes it. With req.page_index,
+        the offsets of each chunk's pages and figures are recorded on the way
+        for the index sidecar.
+
+        Returns:
+            Number of chunks appended by this call.
+        """
+        if not req.target_file or not req.tmp_dir:
+            raise ResultProcessingError(
+                f"Target file or temporary directory not set for request {req.request_id}"
+            )
+        chunks = req.ordered_chunks
+        ready = 0
+        while (
+            req.assembled_chunks + ready < len(chunks)
+            and chunks[req.assembled_chunks + ready].status == Status.COMPLETE
+        ):
+            ready += 1
+        if not ready:
+            return 0
+
+        assembly_file = partial_path(req.target_file)
+        ensure_directory(assembly_file.parent)
+        if req.assembled_chunks == 0:
+            mode = "wb"
+        elif assembly_file.exists():
+            mode = "r+b"
+        else:
+            raise ResultProcessingError(
+                f"Partial output {assembly_file} disappeared while chunks were being appended"
+            )
+        is_json = req.output_format == "json"
+        # Unbuffered: chunk bytes go straight from file to file via the descriptor
+        with open(assembly_file, mode, buffering=0) as outf:
+            outf.seek(req.assembled_bytes)
+            outf.truncate()
+            if is_json and req.assembled_chunks == 0:
+                req.assembled_bytes = outf.write(DOCUMENT_OPEN)
+            for chunk in chunks[req.assembled_chunks:req.assembled_chunks + ready]:
+                result_path = chunk.get_result_path(req.tmp_dir)
+                if not result_path.exists():
+                    raise ResultProcessingError(
+                        f"Result file for chunk {chunk.index} ({result_path.name}) not found in {req.tmp_dir}"
+                    )
+                logger.debug(
+                    f"Appending chunk {chunk.index + 1}/{len(chunks)} from {result_path.name}"
+                )
+                written = 0
+                if is_json:
+                    written += self._append_json_chunk(result_path, chunk, req, outf)
+                else:
+                    if req.assembled_chunks > 0:
+                        written += outf.write(CHUNK_SEPARATOR)
+                    if req.page_index:
+                        save_chunk_index(result_path, scan_text_chunk(
+                            result_path, chunk_page_offset(chunk, req.chunk_size), req.assembled_bytes + written
+                        ))
+                    written += append_file(result_path, outf.fileno())
+                req.assembled_chunks += 1
+                req.assembled_bytes += written
+                safe_delete(result_path)
+        return ready
+
+    def _append_json_chunk(self, result_path: Path, chunk: ChunkInfo, req: ConversionRequest, outf) -> int:
+        """Writes a chunk's pages to the merged document and keeps its other fields for the end."""
+        if self.budget is None:
+            return self._merge_json_chunk(result_path, chunk, req, outf)
+        with self.budget.hold(result_path.stat().st_size * JSON_TREE_MEMORY_FACTOR):
+            return self._merge_json_chunk(result_path, chunk, req, outf)
+
+    def _merge_json_chunk(self, result_path: Path, chunk: ChunkInfo, req: ConversionRequest, outf) -> int:
+        try:
+            with open(result_path, "rb") as f:
+                tree = json.load(f)
+        except ValueError as e:
+            raise ResultProcessingError(f"Result of chunk {chunk.index} is not valid JSON: {e}") from e
+        first_page = chunk_page_offset(chunk, req.chunk_size)
+        children, fields = split_tree(tree, first_page)
+        del tree
+        FileIO.write_file_atomic(fields_path(result_path), json.dumps(fields, ensure_ascii=False))
+        pieces = children_pieces(children)
+        continued = bool(pieces) and req.assembled_bytes > len(DOCUMENT_OPEN)
+        if req.page_index:
+            base = req.assembled_bytes + (len(PAGE_SEPARATOR) if continued else 0)
+            save_chunk_index(result_path, index_json_pages(pieces, children, first_page, base, len(PAGE_SEPARATOR)))
+        del children
+        written = 0
+        for i, piece in enumerate(pieces):
+            if i or continued:
+                written += outf.write(PAGE_SEPARATOR)
+            written += outf.write(piece)
+        return written
+
+    def _close_json_document(self, req: ConversionRequest, output_file: Path) -> int:
+        """Appends the merged top-level fields of all chunks; returns the bytes written."""
+        fields: Dict[str, Any] = {}
+        for chunk in req.ordered_chunks:
+            path = fields_path(chunk.get_result_path(req.tmp_dir))
+            merge_fields(fields, json.loads(FileIO.read_text(path)))
+        tail = document_close(fields)
+        with open(output_file, "r+b") as outf:
+            outf.seek(req.assembled_bytes)
+            outf.truncate()
+            outf.write(tail)
+        for chunk in req.ordered_chunks:
+            safe_delete(fields_path(chunk.get_result_path(req.tmp_dir)))
+        return len(tail)
+
     def combine_results(self, req: ConversionRequest) -> Tuple[Path, int]:
         """
-        Combine chunk results into a single output file.
-        Assumes req.target_file is set and its parent directory exists.
-        Assumes chunk result files exist in req.tmp_dir.
+        Completes the output from chunk results not yet appended and renames
+        it into place, so req.target_file never holds a partial document.
+        Assumes req.target_file is set and all chunks are complete.
+        Assumes the remaining chunk result files exist in req.tmp_dir.
         """
         output_file = req.target_file
         if not output_file:
@@ -54,40 +378,29 @@ class ResultSaver:
             if req.ordered_chunks
             else f"Processing single result for {output_file}..."
         )
-        total_size = 0
         try:
-            with open(output_file, "w", encoding="utf-8") as outf:
-                if not req.ordered_chunks:
-                    logger.warning(
-                        f"No chunks found for request {req.request_id}, cannot combine. Target file may be empty."
-                    )
-                    # Or maybe handle single-file case differently if needed
-                    return output_file, 0  # Return empty size
+            if not req.ordered_chunks:
+                logger.warning(
+                    f"No chunks found for request {req.request_id}, cannot combine. Target file may be empty."
+                )
+                output_file.write_bytes(b"")
+                return output_file, 0
 
-                for i, chunk in enumerate(req.ordered_chunks):
-                    result_path = chunk.get_result_path(req.tmp_dir)
-                    if not result_path.exists():
-                        raise ResultProcessingError(
-                            f"Result file for chunk {i} ({result_path.name}) not found in {req.tmp_dir}"
-                        )
+            self.append_ready_chunks(req)
+            if req.assembled_chunks < len(req.chunks):
+                raise ResultProcessingError(
+                    f"Chunk {req.assembled_chunks} of request {req.request_id} is not complete"
+                )
 
-                    logger.debug(
-                        f"Appending chunk {i+1}/{len(req.ordered_chunks)} from {result_path.name}"
-                    )
-                    with open(result_path, "r", encoding="utf-8") as infile:
-                        shutil.copyfileobj(
-                            infile, outf, length=65536
-                        )  # More efficient copying
-                        # Rough size estimation (can be inaccurate for multibyte chars)
-                        # For precise size, reopen and check file size after writing is complete.
-                        total_size += result_path.stat().st_size
-
-                    if i < len(req.ordered_chunks) - 1:
-                        outf.write("\n\n")
-                        total_size += 2  # Account for separator bytes
-
-            # Verify final file size
-            final_size = output_file.stat().st_size
+            final_size = req.assembled_bytes
+            if req.output_format == "json":
+                final_size += self._close_json_document(req, partial_path(output_file))
+            if req.page_index:
+                write_index(
+                    output_file, final_size,
+                    [chunk.get_result_path(req.tmp_dir) for chunk in req.ordered_chunks],
+                )
+            os.replace(partial_path(output_file), output_file)
             logger.debug(
                 f"Successfully combined results to {output_file} (Final size: {final_size} bytes)"
             )
@@ -102,20 +415,29 @@ class ResultSaver:
             return output_file, final_size
 
         except Exception as e:
-            if output_file.exists():
-                logger.error(
-                    f"Error during result combination for {output_file}. Deleting partial file."
-                )
-                safe_delete(output_file)
-
+            self.discard_partial_output(req)
             if isinstance(e, ResultProcessingError):
                 raise
             raise ResultProcessingError(
                 f"Failed to combine results into {output_file}: {str(e)}"
             ) from e
 
+    def discard_partial_output(self, req: ConversionRequest) -> None:
+        """Deletes a partly assembled output; an earlier output at the target stays."""
+        assembly_file = partial_path(req.target_file) if req.target_file else None
+        if assembly_file and assembly_file.exists():
+            logger.error(f"Deleting partially assembled output {assembly_file}.")
+            safe_delete(assembly_file)
+        req.assembled_chunks = 0
+        req.assembled_bytes = 0
+
     def move_images(self, source_images_dir: Path, target_images_dir: Path) -> None:
-        """Moves images from temporary source to the final target images directory."""
+        """
+        Moves images from the temporary source to the final images directory.
+
+        Images are renamed into place (the whole directory when the target is
+        new) and only copied when the temp dir is on another filesystem.
+        """
         if not source_images_dir.exists():
             logger.debug(
                 f"Source images directory {source_images_dir} not found, nothing to move."
@@ -123,20 +445,60 @@ class ResultSaver:
             return
 
         logger.debug(
-            f"Moving/Copying images from {source_images_dir} to {target_images_dir}..."
+            f"Moving images from {source_images_dir} to {target_images_dir}..."
         )
 
         try:
-            shutil.copytree(source_images_dir, target_images_dir, dirs_exist_ok=True)
-            logger.debug(
-                f"Successfully copied images tree to {target_images_dir}. Source temp directory will be cleaned up later."
-            )
+            move_or_copy_tree(source_images_dir, target_images_dir)
+            logger.debug(f"Successfully moved images to {target_images_dir}.")
 
         except Exception as e:
             raise ResultProcessingError(
                 f"Failed to move images to {target_images_dir}: {e}"
             ) from e
 
+    def replicate_output(
+        self,
+        source_file: Path,
+        source_images_dir: Optional[Path],
+        source_images_dir_name: Optional[str],
+        target_file: Path,
+        target_images_dir: Path,
+        link_images: bool = True,
+    ) -> None:
+        """
+        Recreates a finished output at a new location.
+
+        Images are hardlinked when possible, unless link_images is False (the
+        source is the result store, which must not share files with outputs
+        that may be edited). The output file is copied, with
+        image references rewritten a block at a time if the images directory
+        name differs, and renamed into place once complete.
+        """
+        try:
+            ensure_directory(target_file.parent)
+            if source_images_dir_name and source_images_dir_name != target_images_dir.name:
+                tmp_file = partial_path(target_file)
+                try:
+                    _replace_in_file(
+                        source_file, tmp_file, f"{source_images_dir_name}/", f"{target_images_dir.name}/"
+                    )
+                    os.replace(tmp_file, target_file)
+                finally:
+                    safe_delete(tmp_file)
+            else:
+                FileIO.copy_file_atomic(source_file, target_file)
+
+            if source_images_dir and source_images_dir.is_dir():
+                if link_images:
+                    link_or_copy_tree(source_images_dir, target_images_dir)
+                else:
+                    copy_tree(source_images_dir, target_images_dir)
+        except Exception as e:
+            raise ResultProcessingError(
+                f"Failed to replicate output {source_file} to {target_file}: {e}"
+            ) from e
+
 
 class ResultHandler:
     """Handles polling for API results, combining them, moving assets, and cleanup."""
@@ -147,6 +509,13 @@ class ResultHandler:
         cache: CacheManager,
         config: Config,
         check_interval: int = 15,
+        result_store: Optional[ResultStore] = None,
+        image_workers: int = 4,
+        budget: Optional[MemoryBudget] = None,
+        image_dedup: Optional[ImageDeduplicator] = None,
+        bundle: Optional[BundleWriter] = None,
+        response_archive: Optional[ResponseArchive] = None,
+        status_checks: int = 5,
     ):
         """
         Initialize the result handler with shared components.
@@ -156,70 +525,96 @@ class ResultHandler:
             cache: Initialized CacheManager instance.
             config: Application configuration (used for chunk_size).
             check_interval: Interval (seconds) between API status checks.
+            result_store: Optional store that receives finished conversions.
+            image_workers: Threads decoding and writing images while polling continues.
+            budget: Optional memory budget; queued images count against it until written,
+                JSON chunk results while they are merged.
+            image_dedup: Deduplicator shared by the run (image_dedup "run"); otherwise one per output.
+            bundle: Archive of the whole run (bundle_path); otherwise one per output with config.bundle.
+            response_archive: Optional archive that keeps every completed API response.
+            status_checks: Status checks of a processing chunk per pass, check_interval apart;
+                a chunk still processing after them is left for the next pass.
         """
         self.client = client
         self.cache = cache
         self.config = config
         self.check_interval = check_interval
-        self.saver = ResultSaver()  # Handles file system operations for results/images
+        self.result_store = result_store
+        self.saver = ResultSaver(budget)  # Handles file system operations for results/images
+        self.image_workers = image_workers
+        self.budget = budget
+        self.image_dedup = image_dedup
+        self.bundle = bundle
+        self.response_archive = response_archive
+        self.status_checks = status_checks
+        self._image_pool: Optional[ThreadPoolExecutor] = None
+        # Image writes (and chunk stores waiting on them) per request:
+        # (image name or None for a store, chunk index, file, future)
+        self._image_tasks: Dict[str, List[Tuple[Optional[str], int, Optional[Path], Future]]] = {}
+        self._render_pool: Optional[ProcessPoolExecutor] = None  # Started on the first --render output
 
     # --- Image Processing Methods (Inlined from ImageProcessor) ---
 
-    def _transform_image_name(
-        self, original_name: str, chunk: ChunkInfo, chunk_size: int
-    ) -> str:
-        """Generates a structured image name based on chunk index and page/figure numbers."""
-        base_page_num = (chunk.index * chunk_size) + 1
-        extension = "jpg"
-        parts = original_name.split(".")
-        if len(parts) > 1:
-            image_extension = parts[-1].lower()
-            if image_extension in SUPPORTED_IMAGE_EXTENSIONS:
-                extension = image_extension
-
-        page_match = re.search(
-            r"(?:_|-)page(?:_|-)?(\d+)", original_name, re.IGNORECASE
-        )
-        figure_match = re.search(
-            r"(?:_|-)(?:figure|fig)(?:_|-)?(\d+)", original_name, re.IGNORECASE
-        )
-
-        if page_match and figure_match:
+    def _submit_image_task(self, req: ConversionRequest, name: Optional[str], chunk: ChunkInfo,
+                           path: Optional[Path], fn, *args) -> Future:
+        if self._image_pool is None:
+            self._image_pool = ThreadPoolExecutor(self.image_workers, thread_name_prefix="image-writer")
+        future = self._image_pool.submit(fn, *args)
+        self._image_tasks.setdefault(req.request_id, []).append((name, chunk.index, path, future))
+        return future
+
+    def _wait_for_images(self, request_id: str) -> None:
+        """Waits until the request's images are written, reporting each failed image."""
+        for original_name, chunk_index, image_file_path, future in self._image_tasks.pop(request_id, []):
             try:
-                page_num = int(page_match.group(1))
-                figure_num = int(figure_match.group(1))
-                corrected_page_num = base_page_num + page_num - 1
-                markdown_name = (
-                    f"page_{corrected_page_num}_figure_{figure_num}.{extension}"
+                future.result()
+            except ValueError as b64_err:  # Catch ValueError for decode issues
+                logger.error(
+                    f"Failed to decode base64 for image '{original_name}' in chunk {chunk_index}: {b64_err}"
                 )
-                return markdown_name
-            except ValueError:
-                logger.warning(
-                    f"Could not parse page/figure numbers from {original_name}"
+            except Exception as e:
+                logger.error(
+                    f"Failed to save image {original_name} to {image_file_path}: {e}"
                 )
 
-        timestamp = datetime.now().strftime("%H%M%S")
-        random_suffix = uuid.uuid4().hex[:6]
-        fallback_name = (
-            f"chunk_{chunk.index}_img_{timestamp}_{random_suffix}.{extension}"
-        )
-        logger.debug(
-            f"Using fallback name {fallback_name} for original image {original_name}"
+    def _close_image_pool(self) -> None:
+        for request_id in list(self._image_tasks):
+            self._wait_for_images(request_id)
+        if self._image_pool is not None:
+            self._image_pool.shutdown(wait=True)
+            self._image_pool = None
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=True)
+            self._render_pool = None
+
+    def _queue_image_write(
+        self, req: ConversionRequest, chunk: ChunkInfo, original_name: str, b64_content, path: Path
+    ) -> Future:
+        """
+        Decodes an image into path on the image pool; len(b64_content) of the
+        budget, taken by the caller, is released once it is written.
+        """
+        write = self._submit_image_task(
+            req, original_name, chunk, path, decode_base64_to_file, b64_content, path,
         )
-        return fallback_name
+        if self.budget is not None:
+            write.add_done_callback(lambda _, size=len(b64_content): self.budget.release(size))
+        return write
 
     def _process_chunk_images(
-        self, images: Dict[str, str], chunk: ChunkInfo, tmp_dir: Path, chunk_size: int, final_images_dir: Path
-    ) -> Dict[str, str]:
+        self, images: Dict[str, str], chunk: ChunkInfo, req: ConversionRequest
+    ) -> Tuple[Dict[str, str], List[Future]]:
         """
-        Saves images from API response to temp dir and returns name mapping
-        using the final relative image directory name.
+        Starts writing images from the API response to the temp dir and returns
+        the name mapping (using the final relative image directory name) and the
+        pending writes. Each image is decoded in blocks straight into its file
+        on a worker thread; failures are reported by _wait_for_images.
         """
         if not images or not isinstance(images, dict):
-            return {}
+            return {}, []
 
         # Images are first saved to a temporary location within the chunk's tmp_dir
-        temp_images_dir = tmp_dir / "images"
+        temp_images_dir = req.tmp_dir / "images"
         ensure_directory(temp_images_dir)
         image_map = {}
         logger.debug(
@@ -227,31 +622,43 @@ class ResultHandler:
         )
 
         # Get the relative name of the final image directory (e.g., "images_xyz123abc")
-        final_images_dir_name = final_images_dir.name
+        final_images_dir_name = req.images_dir.name
 
+        writes = []
         for original_name, b64_content in images.items():
-            markdown_name = self._transform_image_name(original_name, chunk, chunk_size)
+            markdown_name = transform_image_name(original_name, chunk, req.chunk_size)
             # Save to the temporary image directory first
             image_file_path = temp_images_dir / markdown_name
-            try:
-                image_data = base64.b64decode(b64_content)
-                image_file_path.write_bytes(image_data)
-                # The map for markdown replacement uses the FINAL relative directory name
-                image_map[original_name] = f"{final_images_dir_name}/{markdown_name}"
-            except ValueError as b64_err:  # Catch ValueError for decode issues
-                logger.error(
-                    f"Failed to decode base64 for image '{original_name}' in chunk {chunk.index}: {b64_err}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to save image {original_name} to {image_file_path}: {e}"
-                )
-        return image_map
+            if self.budget is not None:
+                # Waits while too many images are queued
+                self.budget.acquire(len(b64_content))
+            write = self._queue_image_write(req, chunk, original_name, b64_content, image_file_path)
+            writes.append(write)
+            # The map for markdown replacement uses the FINAL relative directory name
+            image_map[original_name] = f"{final_images_dir_name}/{markdown_name}"
+        return image_map, writes
 
     # --- Core Result Processing Logic ---
 
-    def process_cache_items(self, request_ids: List[str]) -> None:
-        """Processes a list of completed or pending conversion requests from the cache."""
+    def process_cache_items(self, request_ids: List[str]) -> List[ConversionRequest]:
+        """
+        Processes a list of completed or pending conversion requests from the cache.
+
+        Returns:
+            The requests whose output was written during this call.
+        """
+        return [req for req, done in self.iter_cache_items(request_ids) if done]
+
+    def iter_cache_items(
+        self, request_ids: List[str]
+    ) -> Iterator[Tuple[ConversionRequest, bool]]:
+        """
+        Processes requests one by one, yielding each as soon as it has been handled.
+
+        Yields:
+            (request, done) pairs; done is True if the request's output was
+            written, False if it failed or is still processing on the API.
+        """
         if not request_ids:
             logger.info("No request IDs provided for processing.")
             return
@@ -285,14 +692,25 @@ class ResultHandler:
             return
 
         logger.info(f"Starting processing for {len(reqs_to_process)} requests...")
-        with ProgressTracker(len(reqs_to_process), "Processing requests") as progress:
-            for req in reqs_to_process:
-                self._handle_single_request(req)
-                progress.update()
+        try:
+            with ProgressTracker(len(reqs_to_process), "Processing requests") as progress:
+                for req in reqs_to_process:
+                    done = self._handle_single_request(req)
+                    progress.update()
+                    # On failure req itself carries the chunk states and errors
+                    yield (done or req), done is not None
+        finally:
+            # Requests still processing on the API keep their finished chunks' images
+            self._close_image_pool()
         logger.info("Finished processing all requests.")
 
-    def _handle_single_request(self, req: ConversionRequest) -> None:
-        """Handles the processing state for a single conversion request."""
+    def _handle_single_request(self, req: ConversionRequest) -> Optional[ConversionRequest]:
+        """
+        Handles the processing state for a single conversion request.
+
+        Returns:
+            The request if its output was written, None otherwise.
+        """
         logger.debug(
             f"Handling request {req.request_id} for {req.original_file.name} (Status: {req.status})"
         )
@@ -301,8 +719,10 @@ class ResultHandler:
                 logger.debug(
                     f"Request {req.request_id} already in terminal state ({req.status}). Cleaning up."
                 )
+                if req.status == Status.FAILED and req.assembled_chunks:
+                    self.saver.discard_partial_output(req)
                 self._cleanup_request(req)
-                return
+                return None
 
             if pending_chunks := req.pending_chunks:
                 logger.debug(
@@ -318,7 +738,7 @@ class ResultHandler:
                 logger.error(
                     f"Request {req.request_id} disappeared from cache during processing. Cannot proceed."
                 )
-                return
+                return None
             req = updated_req
 
             if req.all_complete:
@@ -327,16 +747,26 @@ class ResultHandler:
                     if req.chunks
                     else f"Processing complete for single-file request {req.request_id}. Saving result..."
                 )
+                self._wait_for_images(req.request_id)
                 self._combine_and_save_result(req)
                 self._move_final_images(req)
+                self._dedupe_images(req)
+                self._replicate_to_duplicates(req)
+                self._render_outputs(req)
+                self._store_result(req)
+                self._archive_document(req)
+                self._bundle_outputs(req)
                 self._cleanup_request(req)
                 logger.info(
                     f"Converted {req.original_file.name} into {req.target_file.name}, image folder {req.images_dir}."
                 )
+                return req
             elif req.has_failed:
                 logger.error(
                     f"One or more chunks failed for request {req.request_id}. Cleaning up."
                 )
+                if req.assembled_chunks:
+                    self.saver.discard_partial_output(req)
                 self._cleanup_request(req)
             else:
                 logger.debug(
@@ -351,12 +781,15 @@ class ResultHandler:
             )
             try:
                 req.set_status(Status.FAILED, f"Handler error: {str(e)}")
+                if req.assembled_chunks:
+                    self.saver.discard_partial_output(req)
                 self.cache.save(req)
                 self._cleanup_request(req)
             except Exception as cleanup_e:
                 logger.error(
                     f"Further error during error handling/cleanup for {req.request_id}: {cleanup_e}"
                 )
+        return None
 
     def _poll_and_save_pending_chunks(
         self, req: ConversionRequest, chunks: List[ChunkInfo]
@@ -383,6 +816,9 @@ class ResultHandler:
                     logger.debug(
                         f"Chunk {chunk.index} (ID: {chunk.request_id}) processed successfully or still pending."
                     )
+                    if not req.has_failed and self.saver.append_ready_chunks(req):
+                        # Temp results are gone once appended, so record that straight away
+                        self.cache.save(req)
                 progress.update()
         self.cache.save(req)
 
@@ -390,6 +826,9 @@ class ResultHandler:
         self, chunk: ChunkInfo, req: ConversionRequest
     ) -> bool:
         """Polls API status for one chunk, saves result if complete. Returns True if chunk failed."""
+        if chunk.from_cache and chunk.status == Status.PENDING:
+            return self._restore_cached_chunk(chunk, req)
+
         if chunk.status != Status.PROCESSING:
             logger.warning(
                 f"Attempting to process chunk {chunk.index} not in PROCESSING state ({chunk.status}) for request {req.request_id}"
@@ -402,9 +841,10 @@ class ResultHandler:
             chunk.mark_failed(error_msg)
             return True
 
-        max_retries = 5
+        max_retries = self.status_checks
         retry_count = 0
         is_failed = False
+        sink = self._chunk_sink(chunk, req)
 
         logger.debug(
             f"Checking status for chunk {chunk.index} (ID: {chunk.request_id}) [{retry_count}/{max_retries}]..."
@@ -414,7 +854,7 @@ class ResultHandler:
         while retry_count < max_retries:
             status = None
             try:
-                status = self.client.check_status(chunk.request_id)
+                status = self.client.check_status(chunk.request_id, sink=sink)
             except Exception as api_e:
                 logger.error(
                     f"API client error checking status for chunk {chunk.request_id}: {api_e}"
@@ -434,9 +874,13 @@ class ResultHandler:
             elif status.status == StatusEnum.COMPLETE:
                 logger.debug(f"Chunk {chunk.request_id} complete. Saving result...")
                 try:
-                    self._save_chunk_result(chunk, status, req)
+                    if sink.content_key:
+                        self._save_streamed_chunk_result(chunk, status, sink, req)
+                    else:
+                        self._save_chunk_result(chunk, status, req)
                     # Mark complete *only after* saving result successfully
                     chunk.mark_complete()
+                    self._archive_response(chunk, req, sink)
                     logger.debug(
                         f"Successfully saved result for chunk {chunk.request_id}."
                     )
@@ -460,8 +904,8 @@ class ResultHandler:
             # Wait before retrying if not in a terminal state
             retry_count += 1
             if retry_count >= max_retries:
-                logger.warning(
-                    f"Chunk {chunk.request_id} status check timed out after {max_retries} retries for this cycle."
+                logger.debug(
+                    f"Chunk {chunk.request_id} still pending after {max_retries} check(s); left for the next pass."
                 )
                 break
             time.sleep(self.check_interval)
@@ -471,12 +915,16 @@ class ResultHandler:
     def _save_chunk_result(
         self, chunk: ChunkInfo, status: MarkerStatus, req: ConversionRequest
     ) -> None:
-        """Saves the content (markdown/json) and images from a completed API status response."""
+        """
+        Saves the content (markdown/json) and images from a completed API status
+        response held in memory, from clients that do not stream into the sink.
+        """
         content = None
         if status.markdown is not None:
             content = status.markdown
         elif status.json_data is not None:
-            content = json.dumps(status.json_data, indent=2)
+            # Compact, like streamed results; the chunks are merged into one document later
+            content = json.dumps(status.json_data, ensure_ascii=False, separators=(",", ":"))
 
         if content is None:
             logger.error(
@@ -498,27 +946,168 @@ class ResultHandler:
 
         temp_file = chunk.get_result_path(req.tmp_dir)
         logger.debug(f"Preparing to save chunk {chunk.index} result to {temp_file}")
+        chunk.page_count = status.page_count
 
-        image_map = {}
-        if status.images:
-            # Pass the final images directory path to _process_chunk_images
-            image_map = self._process_chunk_images(
-                status.images, chunk, req.tmp_dir, req.chunk_size, req.images_dir
+        image_map, writes = self._process_chunk_images(status.images, chunk, req)
+
+        if chunk.cache_key and self.result_store:
+            # Queued behind the chunk's image writes, which therefore never wait on it
+            self._submit_image_task(
+                req, None, chunk, None, self._store_chunk_result, chunk, content, image_map, req, writes
             )
-            if image_map:
-                logger.debug(
-                    f"Replacing {len(image_map)} image references in content for chunk {chunk.index}"
-                )
-                for original_name, new_ref in image_map.items():
-                    # Simple replace; assumes API format ](original_name)
-                    # new_ref now correctly contains "images_xyz123abc/page_1_fig_1.jpg"
-                    content = content.replace(f"]({original_name})", f"]({new_ref})")
+
+        if image_map:
+            logger.debug(
+                f"Replacing {len(image_map)} image references in content for chunk {chunk.index}"
+            )
+            content = rewrite_image_refs(content, image_map)
 
         logger.debug(
             f"Saving chunk {chunk.index} result ({len(content)} chars) to {temp_file}"
         )
         self.saver.save_content(content, temp_file)
 
+    def _chunk_sink(self, chunk: ChunkInfo, req: ConversionRequest) -> StatusSink:
+        """
+        Where a streamed status response for chunk is written. The text goes
+        to a file as it downloads; images are decoded on the image pool.
+        """
+        temp_images_dir = req.tmp_dir / "images"
+
+        def image_path(original_name: str) -> Path:
+            ensure_directory(temp_images_dir)
+            return temp_images_dir / transform_image_name(original_name, chunk, req.chunk_size)
+
+        def decode_image(original_name: str, path: Path, b64_content: bytes) -> Future:
+            if self.budget is not None:
+                # Already read, so charged rather than waited for; polling pauses
+                # for the chunk's queued images while the budget is overdrawn
+                self.budget.charge(len(b64_content))
+                if self.budget.in_use > self.budget.limit:
+                    wait(sink.image_writes)
+            return self._queue_image_write(req, chunk, original_name, b64_content, path)
+
+        ensure_directory(req.tmp_dir)  # Submission may have removed it along with the chunk files
+        raw_path = None
+        if self.response_archive and ResponseArchive.response_key(chunk, req.result_key):
+            raw_path = req.tmp_dir / f"{chunk.path.name}.response.gz"
+        sink = StatusSink(req.tmp_dir / f"{chunk.path.name}.raw", image_path, raw_path, decode_image)
+        return sink
+
+    def _archive_response(self, chunk: ChunkInfo, req: ConversionRequest, sink: StatusSink) -> None:
+        """Keeps the completed response recorded for chunk in the response archive."""
+        if not sink.raw_path or not sink.raw_path.exists():
+            return
+        try:
+            self.response_archive.put_response(ResponseArchive.response_key(chunk, req.result_key), sink.raw_path)
+        except CacheError as e:
+            logger.warning(f"{e}; chunk {chunk.index} of {req.original_file.name} cannot be replayed.")
+
+    def _save_streamed_chunk_result(
+        self, chunk: ChunkInfo, status: MarkerStatus, sink: StatusSink, req: ConversionRequest
+    ) -> None:
+        """Finishes a chunk result whose content and images check_status wrote to the temp dir."""
+        if sink.images and req.images_dir is None:
+            sink.discard()
+            raise ResultProcessingError(
+                f"Request final images directory is not set for request {req.request_id}, but images were received."
+            )
+        for original_name, error in sink.image_errors.items():
+            logger.error(
+                f"Failed to save image '{original_name}' in chunk {chunk.index}: {error}"
+            )
+        chunk.page_count = status.page_count
+
+        image_map = {
+            original_name: f"{req.images_dir.name}/{path.name}"
+            for original_name, path in sink.images.items()
+        }
+        if chunk.cache_key and self.result_store:
+            # Linked now, as the content file is replaced below; stored once the images are written
+            stored_content = req.tmp_dir / f"{chunk.path.name}.store"
+            link_or_copy(sink.content_path, stored_content)
+            self._submit_image_task(
+                req, None, chunk, None, self._store_chunk_result,
+                chunk, stored_content, image_map, req, sink.image_writes,
+            )
+
+        temp_file = chunk.get_result_path(req.tmp_dir)
+        logger.debug(
+            f"Saving streamed chunk {chunk.index} result with {len(image_map)} image(s) to {temp_file}"
+        )
+        try:
+            rewrite_image_refs_in_file(sink.content_path, temp_file, image_map)
+        except (OSError, UnicodeDecodeError) as e:
+            raise ResultProcessingError(f"Failed to save content to {temp_file}: {e}") from e
+
+    def _store_chunk_result(
+        self,
+        chunk: ChunkInfo,
+        content: Union[str, Path],
+        image_map: Dict[str, str],
+        req: ConversionRequest,
+        image_writes: List[Future],
+    ) -> None:
+        """
+        Adds a chunk's raw result (content and images under their API names) to
+        the result store, so an unchanged chunk can be reused by later runs.
+        Content given as a file is moved into the store.
+        """
+        wait(image_writes)
+        try:
+            with TemporaryDirectory(req.tmp_dir, f"store_chunk_{chunk.index}") as staging_dir:
+                content_file = staging_dir / "chunk.out"
+                if isinstance(content, Path):
+                    os.replace(content, content_file)
+                else:
+                    FileIO.write_file(content_file, content)
+                staging_images_dir = staging_dir / "images"
+                temp_images_dir = req.tmp_dir / "images"
+                for original_name, new_ref in image_map.items():
+                    markdown_name = new_ref.rsplit("/", 1)[-1]
+                    link_or_copy(temp_images_dir / markdown_name, staging_images_dir / original_name)
+                self.result_store.put(chunk.cache_key, content_file, staging_images_dir)
+        except Exception as e:
+            logger.warning(f"Could not store result of chunk {chunk.index} for reuse: {e}")
+
+    def _restore_cached_chunk(self, chunk: ChunkInfo, req: ConversionRequest) -> bool:
+        """
+        Saves a chunk result taken from the result store, as if it had just
+        been received from the API. Returns True if the chunk failed.
+        """
+        entry = None
+        if self.result_store and chunk.cache_key:
+            entry = self.result_store.get(chunk.cache_key)
+        if entry is None or req.tmp_dir is None:
+            chunk.mark_failed(
+                f"Stored result for chunk {chunk.index} is no longer available; convert the file again."
+            )
+            return True
+
+        try:
+            image_map = {}
+            stored_images_dir = self.result_store.images_path(entry)
+            if stored_images_dir.is_dir() and req.images_dir:
+                temp_images_dir = req.tmp_dir / "images"
+                for image_file in stored_images_dir.iterdir():
+                    markdown_name = transform_image_name(
+                        image_file.name, chunk, req.chunk_size
+                    )
+                    # Copied: the temp images become the output's, which may be edited
+                    FileIO.copy_file(image_file, temp_images_dir / markdown_name)
+                    image_map[image_file.name] = f"{req.images_dir.name}/{markdown_name}"
+            rewrite_image_refs_in_file(
+                self.result_store.output_path(entry), chunk.get_result_path(req.tmp_dir), image_map,
+                remove_source=False,
+            )
+        except Exception as e:
+            chunk.mark_failed(f"Failed to reuse stored result for chunk {chunk.index}: {e}")
+            return True
+
+        chunk.mark_complete()
+        logger.debug(f"Reused stored result for chunk {chunk.index} of {req.original_file.name}.")
+        return False
+
     def _combine_and_save_result(self, req: ConversionRequest) -> None:
         """Combines temporary results and saves to the final target file."""
         try:
@@ -532,7 +1121,7 @@ class ResultHandler:
             logger.debug(
                 f"Successfully combined results for {req.request_id} to {output_file} ({total_size} bytes)"
             )
-            print(f"Successfully saved output to {output_file}")
+            logger.info(f"Successfully saved output to {output_file}")
 
             req.set_status(Status.COMPLETE)
             self.cache.save(req)
@@ -575,12 +1164,103 @@ class ResultHandler:
                 f"Cannot move images for request {req.request_id}: Missing temp dir, target file path, or determined images_dir path."
             )
 
+    def _dedupe_images(self, req: ConversionRequest) -> None:
+        """Hardlinks repeated images in the output's images directory to one copy."""
+        if self.config.image_dedup == "off" or not req.images_dir or not req.images_dir.is_dir():
+            return
+        dedup = self.image_dedup if self.config.image_dedup == "run" and self.image_dedup else ImageDeduplicator()
+        linked, saved = dedup.dedupe_dir(req.images_dir)
+        if linked:
+            logger.info(
+                f"Stored {linked} repeated image(s) of {req.original_file.name} once, saving {saved} bytes."
+            )
+
+    def _replicate_to_duplicates(self, req: ConversionRequest) -> None:
+        """Copies the finished output and images to every identical input's targets."""
+        for dup in req.duplicates:
+            try:
+                self.saver.replicate_output(
+                    req.target_file,
+                    req.images_dir,
+                    req.images_dir.name if req.images_dir else None,
+                    dup.target_file,
+                    dup.images_dir,
+                )
+                logger.info(f"Copied result of {req.original_file.name} to duplicate {dup.source_file}.")
+            except ResultProcessingError as e:
+                logger.error(f"Failed to copy result to duplicate {dup.source_file}: {e}")
+
+    def _render_outputs(self, req: ConversionRequest) -> None:
+        """Renders the requested formats from the JSON output of req and its duplicates."""
+        if not self.config.render_formats:
+            return
+        if self._render_pool is None:
+            self._render_pool = new_render_pool(min(RENDER_WORKERS, os.cpu_count() or 1))
+        renders = []
+        for target_file, images_dir in [(req.target_file, req.images_dir)] + [
+            (dup.target_file, dup.images_dir) for dup in req.duplicates
+        ]:
+            renders += submit_renders(
+                self._render_pool, target_file, images_dir, self.config.render_formats, self.config.paginate
+            )
+        try:
+            wait_for_renders(renders)
+        except ResultProcessingError as e:
+            logger.error(f"Request {req.request_id}: {e}")
+
+    def _store_result(self, req: ConversionRequest) -> None:
+        """Adds a finished conversion to the result store, if one is configured."""
+        if not self.result_store or not req.result_key:
+            return
+        try:
+            self.result_store.put(req.result_key, req.target_file, req.images_dir)
+        except Exception as e:
+            logger.error(f"Failed to store result for request {req.request_id}: {e}")
+
+    def _archive_document(self, req: ConversionRequest) -> None:
+        """Records a finished conversion in the response archive, if its responses are all there."""
+        if not self.response_archive or not req.result_key:
+            return
+        document = ArchivedDocument(
+            key=req.result_key,
+            source_name=req.original_file.name,
+            output_format=req.output_format,
+            chunk_size=req.chunk_size,
+            chunks=[
+                ArchivedChunk(
+                    index=chunk.index,
+                    start_page=chunk.start_page,
+                    response=ResponseArchive.response_key(chunk, req.result_key),
+                )
+                for chunk in req.ordered_chunks
+            ],
+        )
+        try:
+            if self.response_archive.put_document(document):
+                logger.debug(f"Archived the responses of {req.original_file.name} for replay.")
+        except Exception as e:
+            logger.warning(f"Failed to archive responses of {req.original_file.name}: {e}")
+
+    def _bundle_outputs(self, req: ConversionRequest) -> None:
+        """Moves the outputs of req and its duplicates into archives, if bundling is configured."""
+        if not self.config.bundle:
+            return
+        outputs = [(req.target_file, req.images_dir)] + [
+            (dup.target_file, dup.images_dir) for dup in req.duplicates
+        ]
+        try:
+            archives = bundle_outputs(outputs, self.config.bundle, self.bundle, self.config.render_formats)
+            logger.info(f"Bundled {req.original_file.name} into {archives[0]}.")
+        except ResultProcessingError as e:
+            logger.error(f"Request {req.request_id}: {e}; the output is kept as loose files.")
+
     def _cleanup_request(self, req: ConversionRequest) -> None:
         """Cleans up temporary directory and cache entry for a request."""
         req_id = req.request_id
         logger.debug(
             f"Cleaning up resources for request {req_id} (Original: {req.original_file.name})..."
         )
+        self._wait_for_images(req_id)  # Writers must be done before their directory goes
         try:
             if req.tmp_dir and Path(req.tmp_dir).exists():
                 logger.debug(f"Deleting temporary directory: {req.tmp_dir}")
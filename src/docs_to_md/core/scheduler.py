@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+from docs_to_md.config.settings import ORDER_POLICIES
+from docs_to_md.utils.pdf_splitter import count_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+BYTES_PER_PAGE_ESTIMATE = 100 * 1024  # Used for formats whose page count is not read
+
+
+class _FairQueue(Generic[T]):
+    """
+    Start-time fair queuing across tenants.
+
+    Each item gets a start tag of max(virtual time, tenant's last finish tag)
+    and a finish tag of start + cost / weight. Items are served in start tag
+    order, so over time every backlogged tenant receives service in proportion
+    to its weight, whatever the size of its backlog.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, T]] = []
+        self._finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: T, tenant: str, cost: float, weight: float) -> None:
+        start = max(self._virtual_time, self._finish.get(tenant, 0.0))
+        self._finish[tenant] = start + cost / weight
+        heapq.heappush(self._heap, (start, next(self._seq), item))
+
+    def pop(self) -> T:
+        start, _, item = heapq.heappop(self._heap)
+        self._virtual_time = start
+        if not self._heap:
+            # Idle: forget history so a returning tenant is not penalised
+            self._finish.clear()
+        return item
+
+
+class FairScheduler(Generic[T]):
+    """
+    Decides which job is submitted next when several tenants share the API.
+
+    Jobs in the interactive lane are always served before bulk jobs; bulk jobs
+    use whatever capacity is left. Within each lane tenants share capacity in
+    proportion to their weights, with job cost (e.g. bytes or pages) as the
+    measure of service. Thread-safe.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0):
+        """
+        Args:
+            weights: Relative share per tenant; unknown tenants get default_weight.
+            default_weight: Weight of tenants not listed in weights.
+
+        Raises:
+            ValueError: If a weight is not positive.
+        """
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        if default_weight <= 0 or any(w <= 0 for w in self.weights.values()):
+            raise ValueError("Tenant weights must be positive")
+        self._lanes: Dict[str, _FairQueue[T]] = {p: _FairQueue() for p in PRIORITIES}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(lane) for lane in self._lanes.values())
+
+    def push(self, item: T, tenant: str = "default", cost: float = 1.0, priority: str = BULK) -> None:
+        """
+        Queue an item.
+
+        Raises:
+            ValueError: If priority is not a known lane.
+        """
+        if priority not in self._lanes:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        weight = self.weights.get(tenant, self.default_weight)
+        with self._lock:
+            self._lanes[priority].push(item, tenant, max(cost, 1.0), weight)
+
+    def pop(self) -> Optional[T]:
+        """Returns the next item to run, or None if nothing is queued."""
+        with self._lock:
+            for priority in PRIORITIES:
+                if self._lanes[priority]:
+                    return self._lanes[priority].pop()
+        return None
+
+    def pop_many(self, limit: int) -> List[T]:
+        """Returns up to limit items in scheduling order."""
+        items: List[T] = []
+        while len(items) < limit:
+            item = self.pop()
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+
+def estimate_pages(file_path: Path, max_pages: Optional[int] = None) -> float:
+    """
+    Cheap estimate of how many pages a conversion will process.
+
+    PDFs report their page count; other formats are estimated from file size.
+    """
+    pages: Optional[float] = None
+    if file_path.suffix.lower() == ".pdf":
+        pages = count_pdf_pages(file_path)
+    if pages is None:
+        try:
+            pages = max(1.0, os.stat(file_path).st_size / BYTES_PER_PAGE_ESTIMATE)
+        except OSError:
+            pages = 1.0
+    if max_pages is not None:
+        pages = min(pages, max_pages)
+    return pages
+
+
+def order_jobs(
+    jobs: List[Tuple[Path, T]],
+    policy: str,
+    max_pages: Optional[int] = None,
+    deadlines: Optional[Dict[Path, float]] = None,
+) -> List[Tuple[Path, T]]:
+    """
+    Orders (file, payload) jobs for submission.
+
+    Policies:
+        input: keep discovery order.
+        smallest: fewest pages first, which minimises the median time to output.
+        largest: most pages first, which minimises the time until the whole batch is done.
+        deadline: earliest deadline first; files without an explicit deadline
+            are due in order of their modification time.
+
+    Ties keep their discovery order.
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Unknown order policy {policy!r}; expected one of {', '.join(ORDER_POLICIES)}")
+    if policy == "input" or len(jobs) < 2:
+        return list(jobs)
+
+    if policy == "deadline":
+        deadlines = deadlines or {}
+
+        def key(job: Tuple[Path, T]) -> float:
+            if job[0] in deadlines:
+                return deadlines[job[0]]
+            try:
+                return os.stat(job[0]).st_mtime
+            except OSError:
+                return float("inf")
+    else:
+        pages = {path: estimate_pages(path, max_pages) for path, _ in jobs}
+        sign = 1 if policy == "smallest" else -1
+
+        def key(job: Tuple[Path, T]) -> float:
+            return sign * pages[job[0]]
+
+    ordered = sorted(jobs, key=key)
+    logger.debug(f"Ordered {len(ordered)} job(s) by policy '{policy}'")
+    return ordered
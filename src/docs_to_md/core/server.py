@@ -0,0 +1,475 @@
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.core.processor import POLL_INTERVAL, JobResult, MarkerProcessor
+from docs_to_md.core.scheduler import BULK, PRIORITIES, FairScheduler, estimate_pages
+from docs_to_md.utils.exceptions import ConfigurationError, DocsToMdError
+from docs_to_md.utils.file_utils import ensure_directory, safe_delete
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+UPLOAD_RETENTION = 24 * 3600.0  # Seconds an upload's output is kept if it is never fetched
+CONTENT_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "json": "application/json",
+    "html": "text/html; charset=utf-8",
+    "txt": "text/plain; charset=utf-8",
+}
+
+
+@dataclass
+class ServerJob:
+    """State of one document submitted to the server."""
+    job_id: str
+    input_file: Path
+    options: Dict[str, Any] = field(default_factory=dict)
+    tenant: str = "default"
+    priority: str = BULK
+    status: str = "queued"  # queued, running (being submitted), processing, complete or failed
+    error: Optional[str] = None
+    output_file: Optional[Path] = None
+    images_dir: Optional[Path] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "input": str(self.input_file),
+            "options": self.options,
+            "tenant": self.tenant,
+            "priority": self.priority,
+            "error": self.error,
+            "output_file": str(self.output_file) if self.output_file else None,
+            "images_dir": str(self.images_dir) if self.images_dir else None,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# A submitted request: its job config, its processor jobs and the server jobs waiting for it
+InFlightRequest = Tuple[Config, List[Tuple[Path, OutputPaths]], List[ServerJob]]
+
+
+class JobManager:
+    """
+    Queues jobs, submits them on one worker thread and polls them on another.
+
+    All jobs go through one MarkerProcessor, so they share its HTTP connection
+    pool, the client's rate limit, the request cache and the result store.
+    The submitter takes up to batch_size jobs at a time from a FairScheduler,
+    so interactive jobs go first and tenants share the remaining submit
+    capacity by weight. Submitting never waits for conversions: the poller
+    checks every in-flight request once per poll_interval, so jobs submitted
+    behind a large batch are not held up by its polling. The two threads take
+    turns on the processor, whose per-run state, image deduplicator and
+    HTTP session are not safe to use from both at once.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        processor: Optional[MarkerProcessor] = None,
+        poll_interval: float = POLL_INTERVAL,
+        upload_retention: float = UPLOAD_RETENTION,
+    ):
+        self.config = config
+        self.processor = processor or MarkerProcessor(config)
+        self.poll_interval = poll_interval
+        self.upload_retention = upload_retention
+        self.upload_dir = Path(config.root_tmp_dir) / "uploads"
+        self._jobs: Dict[str, ServerJob] = {}
+        self._scheduler: FairScheduler[str] = FairScheduler(config.tenant_weights)
+        self._in_flight: Dict[str, InFlightRequest] = {}  # Keyed by request ID
+        self._cond = threading.Condition()
+        self._processor_lock = threading.Lock()  # Held while submitting or polling
+        self._stopping = False
+        self._submitter = threading.Thread(target=self._run_submissions, name="job-submitter", daemon=True)
+        self._poller = threading.Thread(target=self._run_polls, name="job-poller", daemon=True)
+
+    def start(self) -> None:
+        self._submitter.start()
+        self._poller.start()
+
+    def stop(self) -> None:
+        """Stops the worker threads after their current batch and pass, and closes the processor."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in (self._submitter, self._poller):
+            if thread.is_alive():
+                thread.join()
+        self.processor.close()
+
+    def job_config(self, input_file: Path, options: Dict[str, Any]) -> Config:
+        """
+        Builds the configuration for one job.
+
+        Raises:
+            ConfigurationError: If an option is unknown or invalid.
+        """
+        return self.config.with_job_options(str(input_file), options)
+
+    def submit(
+        self,
+        input_file: Path,
+        options: Dict[str, Any],
+        tenant: str = "default",
+        priority: str = BULK,
+    ) -> ServerJob:
+        """
+        Validates and queues a job.
+
+        Args:
+            input_file: Document to convert.
+            options: Per-job conversion options (see Config.with_job_options).
+            tenant: Name of the team or client the job is accounted to.
+            priority: "interactive" jobs are scheduled before "bulk" jobs.
+
+        Raises:
+            ConfigurationError: If the input or options are invalid.
+        """
+        input_file = input_file.resolve()
+        if not input_file.is_file():
+            raise ConfigurationError(f"Input must be an existing file: {input_file}")
+        if priority not in PRIORITIES:
+            raise ConfigurationError(f"Priority must be one of {', '.join(PRIORITIES)}")
+        config = self.job_config(input_file, options)
+        job = ServerJob(
+            job_id=uuid.uuid4().hex,
+            input_file=input_file,
+            options=options,
+            tenant=tenant or "default",
+            priority=priority,
+        )
+        cost = estimate_pages(input_file, config.max_pages)  # Service is accounted in pages
+        with self._cond:
+            self._jobs[job.job_id] = job
+            self._scheduler.push(job.job_id, job.tenant, cost, job.priority)
+            self._cond.notify()
+        logger.info(f"Queued {job.priority} job {job.job_id} from {job.tenant} for {input_file}")
+        return job
+
+    def submit_upload(
+        self,
+        filename: str,
+        data: bytes,
+        options: Dict[str, Any],
+        tenant: str = "default",
+        priority: str = BULK,
+    ) -> ServerJob:
+        """
+        Stores an uploaded document and queues it.
+
+        Each upload gets its own directory. Uploads without an output_dir
+        option get their output there; the directory is deleted once the
+        output has been fetched, or upload_retention seconds after the job
+        finished. Expired upload directories are cleaned up here.
+
+        Raises:
+            ConfigurationError: If the filename or options are invalid.
+        """
+        self._expire_uploads()
+        name = Path(filename).name
+        if not name or name in (".", ".."):
+            raise ConfigurationError("A filename is required for uploads")
+        upload_dir = self.upload_dir / uuid.uuid4().hex
+        ensure_directory(upload_dir)
+        input_file = upload_dir / name
+        input_file.write_bytes(data)
+        return self.submit(input_file, options, tenant, priority)
+
+    def get(self, job_id: str) -> Optional[ServerJob]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def _next_batch(self) -> List[ServerJob]:
+        with self._cond:
+            while not len(self._scheduler) and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return []
+            batch = [
+                self._jobs[job_id]
+                for job_id in self._scheduler.pop_many(self.config.batch_size)
+            ]
+            for job in batch:
+                job.status = "running"
+            return batch
+
+    def _run_submissions(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            groups: Dict[str, List[ServerJob]] = {}
+            for job in batch:
+                groups.setdefault(json.dumps(job.options, sort_keys=True, default=str), []).append(job)
+            for jobs in groups.values():
+                self._submit_group(jobs)
+
+    def _submit_group(self, jobs: List[ServerJob]) -> None:
+        """Submits jobs sharing their options and hands their requests to the poller."""
+        try:
+            config = self.job_config(jobs[0].input_file, jobs[0].options)
+            files = list(dict.fromkeys(job.input_file for job in jobs))
+            with self._processor_lock:
+                results, requests = self.processor.start_jobs(self.processor.jobs_for_files(files, config), config)
+        except Exception as e:
+            logger.error(f"Batch of {len(jobs)} job(s) failed: {e}", exc_info=True)
+            self._finish_jobs(jobs, [], str(e))
+            return
+
+        self._finish_jobs(jobs, results)
+        with self._cond:
+            waiting = []
+            for request_id, request_jobs in requests.items():
+                sources = {source for source, _ in request_jobs}
+                request_server_jobs = [job for job in jobs if job.input_file in sources]
+                for job in request_server_jobs:
+                    job.status = "processing"
+                self._in_flight[request_id] = (config, request_jobs, request_server_jobs)
+                waiting += request_server_jobs
+            self._cond.notify_all()
+        # Jobs that got neither a result nor a request (e.g. no output path could be determined)
+        self._finish_jobs(
+            [job for job in jobs if job.status == "running" and job not in waiting],
+            [],
+            "Conversion failed; see server log for details",
+        )
+
+    def _run_polls(self) -> None:
+        while True:
+            with self._cond:
+                while not self._in_flight and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                in_flight = dict(self._in_flight)
+            self._poll(in_flight)
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping, timeout=self.poll_interval)
+
+    def _poll(self, in_flight: Dict[str, InFlightRequest]) -> None:
+        """Checks each in-flight request once and finishes the jobs of those that are done."""
+        by_config: Dict[int, Tuple[Config, Dict[str, List[Tuple[Path, OutputPaths]]]]] = {}
+        for request_id, (config, request_jobs, _) in in_flight.items():
+            by_config.setdefault(id(config), (config, {}))[1][request_id] = request_jobs
+
+        for config, requests in by_config.values():
+            finishing: Dict[str, List[ServerJob]] = {}
+            try:
+                with self._processor_lock:
+                    for result in self.processor.poll_requests(requests, config, status_checks=1):
+                        with self._cond:
+                            entry = self._in_flight.pop(result.request_id, None)
+                        if entry is not None:
+                            finishing[result.request_id] = entry[2]
+                        self._finish_jobs(finishing.get(result.request_id, []), [result])
+            except Exception as e:
+                # Requests not finished yet are polled again on the next pass
+                logger.error(f"Polling {len(requests)} request(s) failed: {e}", exc_info=True)
+
+    def _finish_jobs(
+        self, jobs: List[ServerJob], results: List[JobResult], error: Optional[str] = None
+    ) -> None:
+        """
+        Records the results of jobs; jobs without a result fail with error if
+        it is given. Jobs still processing on the API are left to the poller.
+        """
+        by_file = {result.input_file: result for result in results}
+        with self._cond:
+            for job in jobs:
+                result = by_file.get(job.input_file)
+                if result is None and error is None:
+                    continue
+                job.finished_at = time.time()
+                if result is not None and result.success:
+                    job.status = "complete"
+                    job.output_file = result.output_paths.markdown_path
+                    images_dir = result.output_paths.images_dir
+                    job.images_dir = images_dir if images_dir.exists() else None
+                else:
+                    job.status = "failed"
+                    job.error = (result.error if result else error) or "Conversion failed; see server log for details"
+                # Before the status is visible to clients
+                self._remove_upload(job)
+
+    def _job_upload_dir(self, job: ServerJob) -> Optional[Path]:
+        """The directory holding the job's upload, or None if the job was not uploaded."""
+        upload_dir = job.input_file.parent
+        return upload_dir if upload_dir.parent == self.upload_dir.resolve() else None
+
+    def _remove_upload(self, job: ServerJob) -> None:
+        """
+        Deletes the stored upload of a finished job, and its directory unless
+        the job's output was written there.
+        """
+        upload_dir = self._job_upload_dir(job)
+        if upload_dir is None:
+            return
+        safe_delete(job.input_file)
+        if job.status == "failed" or not any(upload_dir.iterdir()):
+            safe_delete(upload_dir)
+
+    def release_output(self, job: ServerJob) -> None:
+        """Deletes the directory of an uploaded job once its output has been fetched."""
+        upload_dir = self._job_upload_dir(job)
+        if upload_dir is not None:
+            safe_delete(upload_dir)
+
+    def _expire_uploads(self) -> None:
+        """Deletes the upload directories of jobs that finished over upload_retention seconds ago."""
+        cutoff = time.time() - self.upload_retention
+        with self._cond:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+        for job in expired:
+            upload_dir = self._job_upload_dir(job)
+            if upload_dir is not None and upload_dir.exists():
+                logger.debug(f"Removing output of job {job.job_id}, not fetched within the retention period")
+                safe_delete(upload_dir)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the job server.
+
+    POST /jobs                    {"path": "/abs/doc.pdf", "options": {...},
+                                   "tenant": "team-a", "priority": "interactive"}
+    POST /jobs?filename=doc.pdf   raw document body; options, tenant and priority
+                                  as query parameters
+    GET  /jobs/<id>               job status
+    GET  /jobs/<id>/output        converted document, once complete; an uploaded
+                                  job's output is deleted once fetched
+    GET  /health
+    """
+
+    server_version = "pdf-to-md"
+    manager: JobManager  # Set on the subclass created by create_server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_UPLOAD_BYTES:
+            raise ConfigurationError(f"Request body exceeds {MAX_UPLOAD_BYTES} bytes")
+        return self.rfile.read(length)
+
+    def _job_route(self, path: str) -> Tuple[Optional[ServerJob], bool]:
+        match = re.fullmatch(r"/jobs/([0-9a-f]+)(/output)?", path)
+        if not match:
+            return None, False
+        return self.manager.get(match.group(1)), bool(match.group(2))
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/jobs":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+            return
+        try:
+            body = self._read_body()
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("application/json"):
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict) or not request.get("path"):
+                    raise ConfigurationError("JSON requests need a 'path' field")
+                job = self.manager.submit(
+                    Path(request["path"]),
+                    request.get("options") or {},
+                    request.get("tenant") or "default",
+                    request.get("priority") or BULK,
+                )
+            else:
+                filename = query.pop("filename", "")
+                tenant = query.pop("tenant", "default")
+                priority = query.pop("priority", BULK)
+                job = self.manager.submit_upload(filename, body, query, tenant, priority)
+        except (ConfigurationError, json.JSONDecodeError, ValueError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except DocsToMdError as e:
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+            return
+
+        job, wants_output = self._job_route(url.path)
+        if not job:
+            self._send_error(HTTPStatus.NOT_FOUND, f"No such job or endpoint: {url.path}")
+            return
+        if not wants_output:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+            return
+        if job.status != "complete" or not job.output_file:
+            self._send_error(HTTPStatus.CONFLICT, f"Job {job.job_id} is {job.status}")
+            return
+
+        try:
+            body = job.output_file.read_bytes()
+        except OSError as e:
+            self._send_error(HTTPStatus.GONE, f"Output is no longer available: {e}")
+            return
+        self.manager.release_output(job)
+        output_format = job.options.get("output_format", self.manager.config.output_format)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES.get(output_format, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(manager: JobManager, host: str, port: int) -> ThreadingHTTPServer:
+    """Creates an HTTP server bound to host:port that serves the manager's jobs."""
+    handler = type("BoundJobRequestHandler", (JobRequestHandler,), {"manager": manager})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(config: Config) -> None:
+    """Runs the job server until interrupted."""
+    manager = JobManager(config)
+    server = create_server(manager, config.serve_host, config.serve_port)
+    manager.start()
+    host, port = server.server_address[:2]
+    logger.info(f"Serving conversion jobs on http://{host}:{port}. Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping server.")
+    finally:
+        server.server_close()
+        manager.stop()
@@ -0,0 +1,207 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from docs_to_md.api.models import SUPPORTED_INPUT_EXTENSIONS, SUPPORTED_MIME_TYPES
+from docs_to_md.config.settings import RENDER_FORMATS
+from docs_to_md.core.paths import OutputPaths, determine_output_paths
+from docs_to_md.core.page_index import index_path
+from docs_to_md.core.render import rendered_path
+from docs_to_md.storage.manifest import SyncManifest
+from docs_to_md.storage.models import ManifestEntry
+from docs_to_md.utils.exceptions import FileError
+from docs_to_md.utils.file_utils import FileDiscovery, compute_file_hash, safe_delete
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncPlan:
+    """Outcome of comparing an input tree against its sync manifest."""
+    jobs: List[Tuple[Path, OutputPaths]] = field(default_factory=list)
+    file_hashes: Dict[Path, str] = field(default_factory=dict)  # Hashes computed while planning
+    unchanged: int = 0
+    removed: int = 0
+
+
+class DirectorySync:
+    """
+    Incremental conversion of a directory tree.
+
+    Files whose size and modification time match the manifest are skipped
+    without being opened. Files that changed are hashed; only those whose
+    content actually differs are converted again, reusing their previous
+    output paths: the new output replaces the old one when it is complete,
+    and whatever the new conversion did not rewrite (e.g. images of pages
+    that no longer exist) is deleted once it is recorded. Until then the
+    old outputs and manifest entry stay, so a failed conversion loses
+    nothing. Outputs of sources that no longer exist are deleted.
+    """
+
+    def __init__(
+        self, manifest: SyncManifest, output_dir: Optional[Path], output_format: str
+    ):
+        self.manifest = manifest
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self._pending: Dict[Path, ManifestEntry] = {}
+        # Changed files: previous entry and its output files as (inode, ctime) when planned
+        self._replaced: Dict[Path, Tuple[ManifestEntry, Dict[Path, Tuple[int, int]]]] = {}
+        self._dirty = False
+
+    @staticmethod
+    def _output_files(entry: ManifestEntry) -> List[Path]:
+        """The output of entry and its sidecars."""
+        output_file = Path(entry.output_file)
+        files = [output_file, index_path(output_file)]
+        if output_file.suffix == ".json":
+            files += [rendered_path(output_file, output_format) for output_format in RENDER_FORMATS]
+        return files
+
+    def _remove_outputs(self, entry: ManifestEntry) -> None:
+        logger.debug(f"Removing outputs {entry.output_file} and {entry.images_dir}")
+        for path in self._output_files(entry):
+            safe_delete(path)
+        safe_delete(Path(entry.images_dir))
+
+    def _snapshot_outputs(self, entry: ManifestEntry) -> Dict[Path, Tuple[int, int]]:
+        """Identifies entry's output files, so the ones a conversion leaves untouched can be told apart."""
+        files = self._output_files(entry)
+        images_dir = Path(entry.images_dir)
+        if images_dir.is_dir():
+            files += [path for path in images_dir.rglob("*") if path.is_file()]
+        snapshot = {}
+        for path in files:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (st.st_ino, st.st_ctime_ns)
+        return snapshot
+
+    def _remove_stale_outputs(self, entry: ManifestEntry, snapshot: Dict[Path, Tuple[int, int]]) -> None:
+        """Deletes the files of entry's outputs that were not rewritten since snapshot was taken."""
+        stale = 0
+        for path, identity in snapshot.items():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            # Renaming or linking a file into place changes its inode or ctime
+            if (st.st_ino, st.st_ctime_ns) == identity:
+                safe_delete(path)
+                stale += 1
+        images_dir = Path(entry.images_dir)
+        if images_dir.is_dir() and not any(images_dir.iterdir()):
+            safe_delete(images_dir)
+        if stale:
+            logger.debug(f"Removed {stale} stale output file(s) of {entry.output_file}")
+
+    def plan(self, input_path: Path) -> SyncPlan:
+        """
+        Find new or changed files below input_path and drop outputs of removed ones.
+
+        Raises:
+            FileError: If the input path does not exist.
+        """
+        plan = SyncPlan()
+        seen = set()
+        # Image directories written by earlier syncs may sit inside the input tree
+        skip_dirs = {entry.images_dir for entry in self.manifest.entries.values()}
+
+        for source, st in FileDiscovery.scan_candidate_files(
+            input_path, SUPPORTED_INPUT_EXTENSIONS, skip_dirs
+        ):
+            seen.add(source)
+            entry = self.manifest.get(source)
+            if (
+                entry
+                and entry.size == st.st_size
+                and entry.mtime_ns == st.st_mtime_ns
+                and os.path.exists(entry.output_file)
+            ):
+                plan.unchanged += 1
+                continue
+
+            path = Path(source)
+            if not FileDiscovery.is_processable(
+                path, SUPPORTED_INPUT_EXTENSIONS, SUPPORTED_MIME_TYPES
+            ):
+                continue
+
+            try:
+                file_hash = compute_file_hash(path)
+            except FileError as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+
+            if entry and entry.file_hash == file_hash and os.path.exists(entry.output_file):
+                # Touched but not modified; only refresh the recorded stat
+                self.manifest.set(
+                    source, entry.model_copy(update={"size": st.st_size, "mtime_ns": st.st_mtime_ns})
+                )
+                self._dirty = True
+                plan.unchanged += 1
+                continue
+
+            if entry:
+                logger.info(f"{path} changed since last sync, converting again.")
+                self._replaced[path] = (entry, self._snapshot_outputs(entry))
+
+            try:
+                output_paths = determine_output_paths(
+                    input_file=path,
+                    output_dir_config=self.output_dir,
+                    output_format=self.output_format,
+                    unique_key=entry.unique_key if entry else None,
+                )
+            except (ValueError, FileError, OSError) as path_e:
+                logger.error(f"Error determining output paths for {path}: {path_e}. Skipping file.")
+                continue
+
+            self._pending[path] = ManifestEntry(
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                file_hash=file_hash,
+                output_file=str(output_paths.markdown_path),
+                images_dir=str(output_paths.images_dir),
+                unique_key=output_paths.unique_key,
+            )
+            plan.file_hashes[path] = file_hash
+            plan.jobs.append((path, output_paths))
+
+        for source, entry in list(self.manifest.entries.items()):
+            if source not in seen:
+                logger.info(f"{source} no longer exists, removing its outputs.")
+                self._remove_outputs(entry)
+                self.manifest.remove(source)
+                self._dirty = True
+                plan.removed += 1
+
+        logger.info(
+            f"Sync: {len(plan.jobs)} new or changed, {plan.unchanged} unchanged, {plan.removed} removed."
+        )
+        return plan
+
+    def record_converted(self, source: Path) -> None:
+        """
+        Record a successful conversion planned by plan(), deleting what is left
+        of the previous conversion of a changed file.
+        """
+        entry = self._pending.pop(source, None)
+        if entry is None:
+            logger.debug(f"No pending sync entry for {source}")
+            return
+        self.manifest.set(str(source), entry)
+        self._dirty = True
+        replaced = self._replaced.pop(source, None)
+        if replaced is not None:
+            self._remove_stale_outputs(*replaced)
+
+    def save(self) -> None:
+        """Write the manifest if anything changed."""
+        if self._dirty:
+            self.manifest.save()
+            self._dirty = False
@@ -0,0 +1,140 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from docs_to_md.api.models import SUPPORTED_INPUT_EXTENSIONS, SUPPORTED_MIME_TYPES
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.core.processor import POLL_INTERVAL, MarkerProcessor
+from docs_to_md.utils.dir_watch import create_watcher
+from docs_to_md.utils.file_utils import FileDiscovery
+
+logger = logging.getLogger(__name__)
+
+
+class SettleTracker:
+    """
+    Debounces files that are still being written.
+
+    A file is ready once its size and modification time have not changed for
+    settle_seconds. Empty files are never ready.
+    """
+
+    def __init__(self, settle_seconds: float):
+        self.settle_seconds = settle_seconds
+        self._pending: Dict[Path, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, path: Path, now: float) -> None:
+        """Mark path as changed; its settle period starts over."""
+        self._pending[path] = (None, now)
+
+    def pop_ready(self, now: float) -> List[Path]:
+        """Returns (and forgets) the files that have settled."""
+        ready: List[Path] = []
+        for path, (last_state, since) in list(self._pending.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._pending[path]  # Deleted or moved away before settling
+                continue
+            state = (st.st_size, st.st_mtime_ns)
+            if state != last_state:
+                self._pending[path] = (state, now)
+            elif st.st_size > 0 and now - since >= self.settle_seconds:
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+
+class WatchService:
+    """
+    Converts files as they appear in a directory.
+
+    The processor is created once, so the API connection pool, the cache and
+    the result store stay warm between batches. Settled files are submitted
+    right away; their requests are checked once per poll_interval on later
+    iterations until the API reports them complete or failed, so a long
+    conversion neither blocks new files nor gets dropped. Outputs written next
+    to the inputs are ignored so they are not picked up as new files.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        processor: Optional[MarkerProcessor] = None,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.config = config
+        self.root = Path(config.input_path).resolve()
+        self.processor = processor or MarkerProcessor(config)
+        self.poll_interval = poll_interval
+        self.tracker = SettleTracker(config.watch_settle_seconds)
+        self._outputs: Set[Path] = set()
+        self._in_flight: Dict[str, List[Tuple[Path, OutputPaths]]] = {}  # Submitted requests by ID
+        self._last_poll = 0.0
+        self.watcher = create_watcher(
+            self.root, SUPPORTED_INPUT_EXTENSIONS, config.watch_poll_interval
+        )
+        if config.output_dir:
+            self.watcher.ignored_dirs.add(str(config.output_dir.resolve()))
+
+    def _record_outputs(self, jobs: List[Tuple[Path, OutputPaths]]) -> None:
+        for _, output_paths in jobs:
+            self._outputs.add(output_paths.markdown_path.resolve())
+            self.watcher.ignored_dirs.add(str(output_paths.images_dir.resolve()))
+
+    def _is_candidate(self, path: Path) -> bool:
+        if path.resolve() in self._outputs:
+            return False
+        return FileDiscovery.is_processable(path, SUPPORTED_INPUT_EXTENSIONS, SUPPORTED_MIME_TYPES)
+
+    def run_once(self, timeout: float) -> List[Path]:
+        """
+        Waits up to timeout seconds for changes, submits whatever has settled
+        and checks the requests in flight if poll_interval has passed since
+        the last check (or files were just submitted).
+
+        Returns:
+            The input files whose conversion finished successfully in this call.
+        """
+        now = time.monotonic()
+        for path in self.watcher.poll(timeout):
+            if path.resolve() not in self._outputs:
+                self.tracker.touch(path, now)
+
+        converted: List[Path] = []
+        ready = [p for p in self.tracker.pop_ready(time.monotonic()) if self._is_candidate(p)]
+        if ready:
+            logger.info(f"Converting {len(ready)} new or changed file(s)...")
+            jobs = self.processor.jobs_for_files(ready)
+            self._record_outputs(jobs)
+            results, requests = self.processor.start_jobs(jobs)
+            converted += [result.input_file for result in results if result.success]
+            self._in_flight.update(requests)
+
+        if self._in_flight and (ready or time.monotonic() - self._last_poll >= self.poll_interval):
+            self._last_poll = time.monotonic()
+            for result in self.processor.poll_requests(dict(self._in_flight), status_checks=1):
+                self._in_flight.pop(result.request_id, None)
+                if result.success:
+                    converted.append(result.input_file)
+        return converted
+
+    def run(self) -> None:
+        """Watches until interrupted, then releases the processor's resources."""
+        logger.info(f"Watching {self.root} for new files. Press Ctrl+C to stop.")
+        try:
+            while True:
+                # Wake up often enough to notice files settling
+                timeout = min(self.config.watch_settle_seconds, 1.0) if len(self.tracker) else 1.0
+                self.run_once(timeout)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch.")
+        finally:
+            self.watcher.close()
+            self.processor.close()
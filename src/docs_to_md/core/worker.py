@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.core.processor import MarkerProcessor
+from docs_to_md.storage.job_queue import JobQueue, make_worker_id
+from docs_to_md.storage.models import QueuedJob
+
+logger = logging.getLogger(__name__)
+
+
+class _Heartbeat:
+    """Keeps leases alive from a background thread while a batch converts."""
+
+    def __init__(self, queue: JobQueue, worker_id: str, jobs: List[QueuedJob], lease_seconds: float):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.job_ids = [job.job_id for job in jobs]
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            held = self.queue.heartbeat(self.worker_id, self.job_ids, self.lease_seconds)
+            if held < len(self.job_ids):
+                logger.warning(
+                    f"Lost {len(self.job_ids) - held} lease(s); another worker may convert them too."
+                )
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class QueueWorker:
+    """
+    Converts files leased from a shared JobQueue until the batch is done.
+
+    Every worker runs the same command: each one enqueues the files it
+    discovers (inputs already queued are ignored, so output names stay those
+    chosen by the first worker) and then leases small batches. Work is shared
+    by whole files: all chunks of a PDF are converted by the worker holding
+    its lease. Inputs and outputs must be reachable under the same paths on
+    every machine.
+    """
+
+    def __init__(self, config: Config, processor: Optional[MarkerProcessor] = None):
+        self.config = config
+        self.queue = JobQueue(config.queue_path)
+        self.processor = processor or MarkerProcessor(config)
+        self.worker_id = make_worker_id()
+
+    def enqueue(self) -> int:
+        """Adds the files under the configured input path to the queue."""
+        return self.queue.add_jobs(self.processor.discover_jobs())
+
+    def run_batch(self) -> int:
+        """
+        Leases and converts one batch.
+
+        The leases are held until every file's conversion is complete or has
+        failed; files still processing on the API are polled, not given up on.
+
+        Returns:
+            Number of jobs leased; 0 means nothing was available.
+        """
+        jobs = self.queue.lease(self.worker_id, self.config.batch_size, self.config.lease_seconds)
+        if not jobs:
+            return 0
+
+        logger.info(f"Worker {self.worker_id} leased {len(jobs)} job(s).")
+        by_file = {job.input_file: job for job in jobs}
+        with _Heartbeat(self.queue, self.worker_id, jobs, self.config.lease_seconds):
+            for result in self.processor.iter_jobs(
+                [
+                    (job.input_file, OutputPaths(job.output_file, job.images_dir, job.unique_key))
+                    for job in jobs
+                ]
+            ):
+                job = by_file[result.input_file]
+                if result.success:
+                    self.queue.complete(self.worker_id, job.job_id)
+                else:
+                    logger.warning(f"Conversion of {job.input_file} failed (attempt {job.attempts}): {result.error}")
+                    self.queue.fail(self.worker_id, job.job_id, job.attempts, result.error or "Conversion failed")
+        return len(jobs)
+
+    def run(self) -> None:
+        """Works until no job is pending or leased, then releases resources."""
+        try:
+            self.enqueue()
+            while True:
+                if self.run_batch():
+                    continue
+                counts = self.queue.counts()
+                if not counts.get("leased") and not counts.get("pending"):
+                    break
+                # Others hold the remaining leases; wait in case one of them dies
+                time.sleep(min(self.config.lease_seconds / 3, 30))
+            counts = self.queue.counts()
+            logger.info(
+                f"Queue finished: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed."
+            )
+        finally:
+            self.processor.close()
@@ -9,7 +9,12 @@ import sys
 import argparse
 
 from docs_to_md.config.cli import create_config_from_args
+from docs_to_md.core.batch import ManifestBatch
+from docs_to_md.core.pipe import run_pipe
 from docs_to_md.core.processor import MarkerProcessor
+from docs_to_md.core.server import serve
+from docs_to_md.core.watcher import WatchService
+from docs_to_md.core.worker import QueueWorker
 from docs_to_md.utils.exceptions import ConfigurationError, DocsToMdError
 from docs_to_md.utils.logging import setup_logging
 
@@ -40,8 +45,24 @@ def main() -> int:
         # This will re-parse but it's okay as argparse is idempotent
         config = create_config_from_args()
         
+        if config.command == "serve":
+            serve(config)
+            return 0
+        if config.input_path == "-":
+            run_pipe(config)
+            return 0
+
         # Create processor and run
         processor = MarkerProcessor(config)
+        if config.command == "watch":
+            WatchService(config, processor).run()
+            return 0
+        if config.command == "worker":
+            QueueWorker(config, processor).run()
+            return 0
+        if config.command == "batch":
+            ManifestBatch(config, processor).run(config.batch_offset, config.batch_resume)
+            return 0
         processor.process()
         
         logger.info("Conversion completed successfully.")
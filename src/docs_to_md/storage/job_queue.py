@@ -0,0 +1,200 @@
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.storage.models import QueuedJob
+from docs_to_md.utils.exceptions import CacheError
+from docs_to_md.utils.file_utils import ensure_directory
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    input_file TEXT NOT NULL UNIQUE,
+    output_file TEXT NOT NULL,
+    images_dir TEXT NOT NULL,
+    unique_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+
+def make_worker_id() -> str:
+    """Returns an identifier unique to this worker process."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    """
+    File-level job queue in a SQLite database shared by several workers.
+
+    Workers lease jobs for a limited time and extend the lease with
+    heartbeats while they work. A job whose lease expires, because its worker
+    died or lost access to the queue, becomes available to other workers.
+    Failed jobs are retried until max_attempts is reached.
+
+    Every operation uses its own short transaction and connection, so one
+    queue object can be used from several threads. The database may live on
+    shared storage; it is used in rollback-journal mode, which works on
+    network file systems with working locks.
+    """
+
+    def __init__(self, db_path: Path, max_attempts: int = 3):
+        """
+        Open (creating if needed) the queue database.
+
+        Raises:
+            CacheError: If the database cannot be opened or initialized.
+        """
+        self.db_path = Path(db_path)
+        self.max_attempts = max_attempts
+        try:
+            ensure_directory(self.db_path.parent)
+            with self._transaction() as conn:
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+        except (sqlite3.Error, OSError) as e:
+            raise CacheError(f"Failed to open job queue {self.db_path}: {e}") from e
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def add_jobs(self, jobs: Iterable[Tuple[Path, OutputPaths]]) -> int:
+        """
+        Adds (input file, OutputPaths) jobs. Inputs already in the queue keep
+        their existing entry, so every worker can enqueue the same batch.
+
+        Returns:
+            Number of jobs that were new.
+
+        Raises:
+            CacheError: If the queue cannot be written.
+        """
+        now = time.time()
+        rows = [
+            (str(input_file), str(paths.markdown_path), str(paths.images_dir), paths.unique_key, now)
+            for input_file, paths in jobs
+        ]
+        try:
+            with self._transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (input_file, output_file, images_dir, unique_key, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                added = conn.total_changes - before
+        except sqlite3.Error as e:
+            raise CacheError(f"Failed to add jobs to {self.db_path}: {e}") from e
+        logger.info(f"Queue {self.db_path}: {added} new job(s), {len(rows) - added} already queued.")
+        return added
+
+    def lease(self, worker: str, limit: int, lease_seconds: float) -> List[QueuedJob]:
+        """
+        Claims up to limit pending jobs, or jobs whose lease has expired.
+
+        Raises:
+            CacheError: If the queue cannot be read or written.
+        """
+        now = time.time()
+        try:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT job_id, input_file, output_file, images_dir, unique_key, attempts FROM jobs "
+                    "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY job_id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    [(worker, now + lease_seconds, now, row[0]) for row in rows],
+                )
+        except sqlite3.Error as e:
+            raise CacheError(f"Failed to lease jobs from {self.db_path}: {e}") from e
+        return [
+            QueuedJob(
+                job_id=row[0],
+                input_file=Path(row[1]),
+                output_file=Path(row[2]),
+                images_dir=Path(row[3]),
+                unique_key=row[4],
+                attempts=row[5] + 1,
+            )
+            for row in rows
+        ]
+
+    def heartbeat(self, worker: str, job_ids: List[int], lease_seconds: float) -> int:
+        """
+        Extends this worker's leases on job_ids.
+
+        Returns:
+            Number of leases still held; fewer than len(job_ids) means some
+            expired and may have been taken over.
+        """
+        expires = time.time() + lease_seconds
+        try:
+            with self._transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                    [(expires, job_id, worker) for job_id in job_ids],
+                )
+                return conn.total_changes - before
+        except sqlite3.Error as e:
+            logger.warning(f"Heartbeat to {self.db_path} failed: {e}")
+            return 0
+
+    def complete(self, worker: str, job_id: int) -> None:
+        self._finish(worker, job_id, "done", None)
+
+    def fail(self, worker: str, job_id: int, attempts: int, error: str) -> None:
+        """Returns the job to the queue, or marks it failed once out of attempts."""
+        status = "failed" if attempts >= self.max_attempts else "pending"
+        self._finish(worker, job_id, status, error)
+
+    def _finish(self, worker: str, job_id: int, status: str, error: Optional[str]) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_expires = NULL, "
+                    "updated_at = ? WHERE job_id = ? AND worker = ?",
+                    (status, error, time.time(), job_id, worker),
+                )
+        except sqlite3.Error as e:
+            # The lease will expire and another worker retries the job
+            logger.error(f"Failed to record job {job_id} as {status}: {e}")
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status (pending, leased, done, failed)."""
+        try:
+            with self._transaction() as conn:
+                return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        except sqlite3.Error as e:
+            raise CacheError(f"Failed to read {self.db_path}: {e}") from e
@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from docs_to_md.storage.models import ManifestEntry, SyncManifestData
+from docs_to_md.utils.exceptions import CacheError
+from docs_to_md.utils.file_utils import ensure_directory
+
+logger = logging.getLogger(__name__)
+
+
+class SyncManifest:
+    """
+    Persistent record of which input files have been converted, and to where.
+
+    One manifest exists per (input path, output directory, output format)
+    combination. It is loaded fully into memory and written back atomically.
+    """
+
+    def __init__(
+        self,
+        manifest_dir: Path,
+        input_path: Path,
+        output_dir: Optional[Path],
+        output_format: str,
+    ):
+        """
+        Initialize the manifest for the given input and output settings.
+
+        Raises:
+            CacheError: If an existing manifest cannot be read
+        """
+        self.input_path = Path(input_path).resolve()
+        identity = f"{self.input_path}|{output_dir or ''}|{output_format}"
+        name = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+        self.path = Path(manifest_dir) / f"{name}.json"
+        self._lock = threading.RLock()
+        self._data = self._load()
+
+    def _load(self) -> SyncManifestData:
+        if not self.path.exists():
+            return SyncManifestData(input_path=str(self.input_path))
+        try:
+            return SyncManifestData.model_validate_json(self.path.read_bytes())
+        except Exception as e:
+            logger.error(f"Failed to load sync manifest {self.path}: {e}")
+            raise CacheError(f"Failed to load sync manifest {self.path}: {e}")
+
+    @property
+    def entries(self) -> Dict[str, ManifestEntry]:
+        """All entries, keyed by absolute source path."""
+        return self._data.entries
+
+    def get(self, source: str) -> Optional[ManifestEntry]:
+        return self._data.entries.get(source)
+
+    def set(self, source: str, entry: ManifestEntry) -> None:
+        with self._lock:
+            self._data.entries[source] = entry
+
+    def remove(self, source: str) -> None:
+        with self._lock:
+            self._data.entries.pop(source, None)
+
+    def save(self) -> None:
+        """
+        Write the manifest to disk via a temporary file and rename.
+
+        Raises:
+            CacheError: If the manifest cannot be written
+        """
+        with self._lock:
+            tmp_path = self.path.with_suffix(".json.tmp")
+            try:
+                ensure_directory(self.path.parent)
+                tmp_path.write_text(self._data.model_dump_json(), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+                logger.debug(f"Saved sync manifest with {len(self.entries)} entries to {self.path}")
+            except Exception as e:
+                logger.error(f"Failed to save sync manifest {self.path}: {e}")
+                raise CacheError(f"Failed to save sync manifest {self.path}: {e}")
@@ -1,6 +1,6 @@
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 import time
 
@@ -20,6 +20,10 @@ class ChunkInfo(BaseModel):
     request_id: Optional[str] = None
     status: Status = Status.PENDING
     error: Optional[str] = None
+    start_page: Optional[int] = None  # First source page (0-based) covered by this chunk
+    cache_key: Optional[str] = None  # Result store key for this chunk's pages and options
+    from_cache: bool = False  # Result is taken from the result store instead of the API
+    page_count: Optional[int] = None  # Pages converted, as reported by the API
 
     def mark_processing(self, request_id: str) -> None:
         """Mark chunk as processing with given request ID."""
@@ -40,12 +44,20 @@ class ChunkInfo(BaseModel):
         return tmp_dir / f"{Path(self.path).name}.out"
 
 
+class DuplicateTarget(BaseModel):
+    """Another input with identical content whose outputs are copied from the converted one."""
+    source_file: Path
+    target_file: Path
+    images_dir: Path
+
+
 class ConversionRequest(BaseModel):
     """Tracks a conversion request and its state."""
     request_id: str
     original_file: Path
     target_file: Path
     output_format: str = "markdown"
+    page_index: bool = False  # Write a page offset index next to target_file
     status: Status = Status.PENDING
     error: Optional[str] = None
     # Use default_factory to avoid shared mutable list across instances
@@ -53,6 +65,10 @@ class ConversionRequest(BaseModel):
     chunk_size: int
     tmp_dir: Optional[Path] = None  # Directory for temporary files for this conversion
     images_dir: Optional[Path] = None  # Added to store determined image path
+    result_key: Optional[str] = None  # Result store key (content hash + options), if caching is enabled
+    duplicates: List[DuplicateTarget] = Field(default_factory=list)  # Identical inputs sharing this conversion
+    assembled_chunks: int = 0  # Leading chunks already appended to target_file
+    assembled_bytes: int = 0  # Size of target_file after those chunks
     created_at: float = Field(default_factory=time.time)
     updated_at: float = Field(default_factory=time.time)
 
@@ -62,9 +78,9 @@ class ConversionRequest(BaseModel):
         if error:
             self.error = error
 
-    def add_chunk(self, path: Path, index: int) -> ChunkInfo:
+    def add_chunk(self, path: Path, index: int, start_page: Optional[int] = None) -> ChunkInfo:
         """Add a new chunk and return it."""
-        chunk = ChunkInfo(path=path, index=index)
+        chunk = ChunkInfo(path=path, index=index, start_page=start_page)
         self.chunks.append(chunk)
         return chunk
 
@@ -86,4 +102,81 @@ class ConversionRequest(BaseModel):
     @property
     def all_complete(self) -> bool:
         """Check if all chunks are complete."""
-        return all(c.status == Status.COMPLETE for c in self.chunks) 
\ No newline at end of file
+        return all(c.status == Status.COMPLETE for c in self.chunks) 
+
+    @property
+    def page_count(self) -> Optional[int]:
+        """Pages converted across all chunks, or None if the API did not report it for every chunk."""
+        counts = [c.page_count for c in self.chunks]
+        if not counts or any(count is None for count in counts):
+            return None
+        return sum(counts)
+
+    @property
+    def failure_reason(self) -> str:
+        """Best available explanation of why the request has not produced output."""
+        if self.error:
+            return self.error
+        for chunk in self.ordered_chunks:
+            if chunk.status == Status.FAILED and chunk.error:
+                return chunk.error
+        if pending := self.pending_chunks:
+            api_ids = ", ".join(c.request_id for c in pending if c.request_id) or "not yet submitted"
+            return f"Timed out waiting for the API; still processing (API request {api_ids})"
+        return "Conversion failed"
+
+
+class StoredResult(BaseModel):
+    """Metadata for a finished conversion kept in the result store."""
+    key: str
+    output_name: str  # File name of the stored output inside the entry directory
+    images_dir_name: Optional[str] = None  # Name of the images dir the output references, if any
+    size: int = 0  # Total bytes of output plus images
+    created_at: float = Field(default_factory=time.time)
+    last_accessed: float = Field(default_factory=time.time)
+
+
+class ArchivedChunk(BaseModel):
+    """One chunk of an archived conversion and the response it was converted from."""
+    index: int
+    start_page: Optional[int] = None
+    response: str  # Response key in the archive
+
+
+class ArchivedDocument(BaseModel):
+    """The archived API responses a finished conversion can be rebuilt from."""
+    key: str  # Result key of the input (content hash + options)
+    source_name: str  # Input file name when archived, for reference
+    output_format: str
+    chunk_size: int
+    chunks: List[ArchivedChunk] = Field(default_factory=list)
+    created_at: float = Field(default_factory=time.time)
+
+
+class ManifestEntry(BaseModel):
+    """State of one input file as of its last successful conversion in sync mode."""
+    size: int
+    mtime_ns: int
+    file_hash: str
+    # Plain strings: manifests can hold 100k+ entries and Path parsing dominates load time
+    output_file: str
+    images_dir: str
+    unique_key: str
+    updated_at: float = Field(default_factory=time.time)
+
+
+class SyncManifestData(BaseModel):
+    """On-disk layout of a sync manifest."""
+    version: int = 1
+    input_path: str
+    entries: Dict[str, ManifestEntry] = Field(default_factory=dict)  # Keyed by absolute source path
+
+
+class QueuedJob(BaseModel):
+    """A file conversion held in the shared job queue."""
+    job_id: int
+    input_file: Path
+    output_file: Path
+    images_dir: Path
+    unique_key: str
+    attempts: int = 0
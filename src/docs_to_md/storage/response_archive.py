@@ -0,0 +1,117 @@
+"""
+Archive of raw API status responses (--archive-responses).
+
+The API deletes results an hour after completion. With the archive enabled,
+every completed chunk response is kept as received, gzip-compressed, and
+every finished conversion gets an entry listing its chunks, keyed like the
+result store (input content hash plus options). Replay mode rebuilds
+outputs from these entries through the normal result handling, so changes
+to naming, image handling or layout can be applied without converting again.
+"""
+import gzip
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from docs_to_md.storage.models import ArchivedDocument, ChunkInfo
+from docs_to_md.utils.exceptions import CacheError
+from docs_to_md.utils.file_utils import FileIO, ensure_directory, link_or_copy, partial_path, safe_delete
+
+logger = logging.getLogger(__name__)
+
+RESPONSES_DIR_NAME = "responses"
+DOCUMENTS_DIR_NAME = "documents"
+
+
+class ResponseArchive:
+    """
+    Compressed raw status responses of completed chunks, and the conversions
+    they make up. Nothing is evicted; the archive grows until it is pruned by hand.
+    """
+
+    def __init__(self, root_dir: Path):
+        """
+        Args:
+            root_dir: Directory holding the archive
+
+        Raises:
+            CacheError: If the archive directory cannot be created
+        """
+        self.root_dir = Path(root_dir)
+        try:
+            ensure_directory(self.root_dir / RESPONSES_DIR_NAME)
+            ensure_directory(self.root_dir / DOCUMENTS_DIR_NAME)
+        except OSError as e:
+            raise CacheError(f"Failed to initialize response archive in {root_dir}: {e}") from e
+
+    @staticmethod
+    def response_key(chunk: ChunkInfo, result_key: Optional[str]) -> Optional[str]:
+        """
+        Key of a chunk's response: the chunk's page content key if it has one,
+        so unchanged chunks share their response across versions of a file,
+        otherwise derived from the input's result key and the chunk index.
+        """
+        if chunk.cache_key:
+            return chunk.cache_key
+        if result_key:
+            return hashlib.sha256(f"{result_key}:{chunk.index}".encode("utf-8")).hexdigest()
+        return None
+
+    def response_path(self, response_key: str) -> Path:
+        return self.root_dir / RESPONSES_DIR_NAME / response_key[:2] / f"{response_key}.json.gz"
+
+    def _document_path(self, key: str) -> Path:
+        return self.root_dir / DOCUMENTS_DIR_NAME / key[:2] / f"{key}.json"
+
+    def put_response(self, response_key: str, recorded: Path) -> None:
+        """
+        Moves a response recorded by a StatusSink (gzip-compressed) into the archive.
+
+        Raises:
+            CacheError: If it cannot be archived.
+        """
+        target = self.response_path(response_key)
+        tmp_path = partial_path(target)
+        try:
+            ensure_directory(target.parent)
+            link_or_copy(recorded, tmp_path)
+            os.replace(tmp_path, target)
+        except OSError as e:
+            safe_delete(tmp_path)
+            raise CacheError(f"Failed to archive response {response_key[:12]}: {e}") from e
+        finally:
+            safe_delete(recorded)
+
+    def put_document(self, document: ArchivedDocument) -> bool:
+        """
+        Records a finished conversion. Returns False, without recording it, if
+        a chunk's response is not in the archive (e.g. it was reused from the
+        result store before archiving was enabled).
+        """
+        missing = [c.index for c in document.chunks if not self.response_path(c.response).exists()]
+        if missing:
+            logger.debug(
+                f"Not archiving {document.source_name}: responses of chunk(s) {missing} are not archived."
+            )
+            return False
+        path = self._document_path(document.key)
+        ensure_directory(path.parent)
+        FileIO.write_file_atomic(path, document.model_dump_json())
+        return True
+
+    def get_document(self, key: str) -> Optional[ArchivedDocument]:
+        """Looks up an archived conversion; None if it is missing or unreadable."""
+        path = self._document_path(key)
+        if not path.exists():
+            return None
+        try:
+            return ArchivedDocument.model_validate_json(FileIO.read_text(path))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable response archive entry {path}: {e}")
+            return None
+
+    def open_response(self, response_key: str) -> BinaryIO:
+        """Opens an archived response for reading (decompressed)."""
+        return gzip.open(self.response_path(response_key), "rb")
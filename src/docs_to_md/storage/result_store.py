@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+from docs_to_md.api.models import ApiParams
+from docs_to_md.storage.models import StoredResult
+from docs_to_md.utils.exceptions import CacheError
+from docs_to_md.utils.file_utils import (
+    FileIO,
+    copy_tree,
+    ensure_directory,
+    safe_delete,
+)
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FILE_NAME = "entry.json"
+ENTRY_IMAGES_DIR_NAME = "images"
+EVICT_TARGET = 0.9  # Share of max_bytes eviction frees the store down to
+
+
+class ResultStore:
+    """
+    Content-addressed store of finished conversions and chunk results.
+
+    Each entry lives in its own directory named after its key and holds the
+    combined output file, the extracted images and an ``entry.json`` with
+    metadata. Entries are written to a staging directory and renamed into
+    place, so concurrent runs never observe half-written entries. Files are
+    copied in and out, never hardlinked, so editing an output cannot alter
+    a stored entry. The store is bounded by total size; once it is exceeded,
+    the least recently used entries are evicted until it is back under
+    EVICT_TARGET of the limit, so the store is only scanned now and then.
+    """
+
+    def __init__(self, root_dir: Path, max_bytes: int):
+        """
+        Initialize the result store in the given directory.
+
+        Args:
+            root_dir: Directory holding the store entries
+            max_bytes: Upper bound on the total size of stored entries
+
+        Raises:
+            CacheError: If the store directory cannot be created
+        """
+        self.root_dir = Path(root_dir)
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None  # Size of all entries; counted on the first put, then kept up to date
+        self._lock = threading.RLock()
+        try:
+            ensure_directory(self.root_dir)
+        except Exception as e:
+            logger.error(f"Failed to initialize result store in {root_dir}: {e}")
+            raise CacheError(f"Failed to initialize result store in {root_dir}: {e}")
+
+    @staticmethod
+    def make_key(file_hash: str, api_params: ApiParams, chunk_size: int) -> str:
+        """Build a store key from the input content hash and the conversion options."""
+        options = dict(asdict(api_params), chunk_size=chunk_size)
+        payload = json.dumps(options, sort_keys=True)
+        return hashlib.sha256(f"{file_hash}:{payload}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_chunk_key(chunk_hash: str, api_params: ApiParams) -> str:
+        """Build a store key for a single chunk from its page content hash and the options."""
+        payload = json.dumps(asdict(api_params), sort_keys=True)
+        return hashlib.sha256(f"chunk:{chunk_hash}:{payload}".encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root_dir / key[:2] / key
+
+    def output_path(self, entry: StoredResult) -> Path:
+        """Path of the stored output file for an entry."""
+        return self._entry_dir(entry.key) / entry.output_name
+
+    def images_path(self, entry: StoredResult) -> Path:
+        """Path of the stored images directory for an entry."""
+        return self._entry_dir(entry.key) / ENTRY_IMAGES_DIR_NAME
+
+    def _read_entry(self, entry_dir: Path) -> Optional[StoredResult]:
+        try:
+            return StoredResult.model_validate_json(
+                (entry_dir / ENTRY_FILE_NAME).read_text(encoding="utf-8")
+            )
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable result store entry {entry_dir}: {e}")
+            return None
+
+    def _write_entry(self, entry_dir: Path, entry: StoredResult) -> None:
+        (entry_dir / ENTRY_FILE_NAME).write_text(entry.model_dump_json(), encoding="utf-8")
+
+    def get(self, key: str) -> Optional[StoredResult]:
+        """
+        Look up a stored result and mark it as recently used.
+
+        Returns:
+            StoredResult if present and intact, None otherwise
+        """
+        with self._lock:
+            entry_dir = self._entry_dir(key)
+            entry = self._read_entry(entry_dir)
+            if entry is None:
+                return None
+            if not self.output_path(entry).exists():
+                logger.warning(f"Result store entry {key} is missing its output. Dropping it.")
+                safe_delete(entry_dir)
+                return None
+            try:
+                entry.last_accessed = time.time()
+                self._write_entry(entry_dir, entry)
+            except OSError as e:
+                logger.debug(f"Could not update access time for result store entry {key}: {e}")
+            return entry
+
+    def put(
+        self, key: str, output_file: Path, images_dir: Optional[Path] = None
+    ) -> Optional[StoredResult]:
+        """
+        Store a finished conversion.
+
+        Args:
+            key: Store key from make_key
+            output_file: Combined output file
+            images_dir: Final images directory referenced by the output, if any
+
+        Returns:
+            The stored entry, or None if it was not stored
+        """
+        with self._lock:
+            entry_dir = self._entry_dir(key)
+            if (entry_dir / ENTRY_FILE_NAME).exists():
+                return self._read_entry(entry_dir)
+
+            staging_dir = self.root_dir / f".staging_{uuid.uuid4().hex[:8]}"
+            try:
+                FileIO.copy_file(output_file, staging_dir / output_file.name)
+                size = output_file.stat().st_size
+                has_images = bool(images_dir and images_dir.is_dir())
+                if has_images:
+                    size += copy_tree(images_dir, staging_dir / ENTRY_IMAGES_DIR_NAME)
+
+                if size > self.max_bytes:
+                    logger.debug(
+                        f"Result for {output_file.name} ({size} bytes) exceeds the result store limit. Not storing."
+                    )
+                    return None
+
+                entry = StoredResult(
+                    key=key,
+                    output_name=output_file.name,
+                    images_dir_name=images_dir.name if has_images else None,
+                    size=size,
+                )
+                self._write_entry(staging_dir, entry)
+                ensure_directory(entry_dir.parent)
+                try:
+                    staging_dir.rename(entry_dir)
+                except OSError:
+                    # Another run stored the same key first; keep theirs.
+                    return self._read_entry(entry_dir)
+                logger.debug(f"Stored result for {output_file.name} under key {key[:12]}")
+            except Exception as e:
+                logger.error(f"Failed to store result for {output_file}: {e}")
+                return None
+            finally:
+                safe_delete(staging_dir)
+
+            if self._total is None:
+                self._total = sum(e.size for e in self._all_entries())
+            else:
+                self._total += entry.size
+            if self._total > self.max_bytes:
+                self._evict()
+            return entry
+
+    def _all_entries(self) -> List[StoredResult]:
+        entries = []
+        for entry_file in self.root_dir.glob(f"*/*/{ENTRY_FILE_NAME}"):
+            if entry := self._read_entry(entry_file.parent):
+                entries.append(entry)
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Drop least recently used entries until the store is under EVICT_TARGET
+        of its size limit. The entries are counted again, as other runs may
+        have added or evicted some.
+        """
+        entries = self._all_entries()
+        total = sum(e.size for e in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET
+            for entry in sorted(entries, key=lambda e: e.last_accessed):
+                if total <= target:
+                    break
+                logger.debug(f"Evicting result store entry {entry.key[:12]} ({entry.size} bytes)")
+                safe_delete(self._entry_dir(entry.key))
+                total -= entry.size
+        self._total = total
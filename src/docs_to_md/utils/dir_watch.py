@@ -0,0 +1,203 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from docs_to_md.utils.exceptions import FileError
+from docs_to_md.utils.file_utils import FileDiscovery
+
+logger = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+
+class PollingWatcher:
+    """
+    Detects changed files by comparing periodic snapshots of the tree.
+
+    Only files with a supported extension are tracked. Each poll is a single
+    scandir walk with one stat per file.
+    """
+
+    def __init__(self, root: Path, supported_extensions: Set[str], interval: float = 2.0):
+        self.root = Path(root).resolve()
+        self.supported_extensions = supported_extensions
+        self.interval = interval
+        self.ignored_dirs: Set[str] = set()
+        self._snapshot = self._scan()
+        self._last_scan = time.monotonic()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        return {
+            path: (st.st_size, st.st_mtime_ns)
+            for path, st in FileDiscovery.scan_candidate_files(
+                self.root, self.supported_extensions, self.ignored_dirs
+            )
+        }
+
+    def poll(self, timeout: float) -> Set[Path]:
+        """Waits up to timeout seconds and returns files created or modified since the last poll."""
+        wait = self.interval - (time.monotonic() - self._last_scan)
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            if time.monotonic() - self._last_scan < self.interval:
+                return set()
+
+        snapshot = self._scan()
+        self._last_scan = time.monotonic()
+        changed = {
+            Path(path)
+            for path, state in snapshot.items()
+            if self._snapshot.get(path) != state
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changed files through Linux inotify, without rescanning the tree.
+
+    A watch is placed on every directory below the root, and on directories
+    created later. If the kernel event queue overflows, the next poll reports
+    every file in the tree so nothing is missed.
+    """
+
+    def __init__(self, root: Path, supported_extensions: Set[str]):
+        """
+        Raises:
+            FileError: If inotify is unavailable.
+        """
+        self.root = Path(root).resolve()
+        self.supported_extensions = supported_extensions
+        self.ignored_dirs: Set[str] = set()
+        self._wd_to_dir: Dict[int, str] = {}
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            raise FileError(f"inotify is not available: {e}") from e
+        if self._fd < 0:
+            raise FileError(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+
+        self._add_tree(str(self.root))
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            logger.warning(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._wd_to_dir[wd] = directory
+
+    def _add_tree(self, directory: str) -> Set[Path]:
+        """Watches directory and its subdirectories; returns the files already inside."""
+        found: Set[Path] = set()
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            if current in self.ignored_dirs:
+                continue
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            found.add(Path(entry.path))
+            except OSError as e:
+                logger.warning(f"Cannot scan directory {current}: {e}")
+        return found
+
+    def _rescan(self) -> Set[Path]:
+        return {
+            Path(path)
+            for path, _ in FileDiscovery.scan_candidate_files(
+                self.root, self.supported_extensions, self.ignored_dirs
+            )
+        }
+
+    def poll(self, timeout: float) -> Set[Path]:
+        """Waits up to timeout seconds and returns files created or modified since the last poll."""
+        changed: Set[Path] = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("inotify event queue overflowed; rescanning the watched tree.")
+                    changed |= self._rescan()
+                    continue
+                if mask & IN_IGNORED:
+                    self._wd_to_dir.pop(wd, None)
+                    continue
+                directory = self._wd_to_dir.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files may land in a new directory before its watch exists
+                        changed |= self._add_tree(path)
+                else:
+                    changed.add(Path(path))
+
+        return {
+            p for p in changed
+            if p.suffix.lower().strip('.') in self.supported_extensions
+            and not any(str(p).startswith(d + os.sep) for d in self.ignored_dirs)
+        }
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(root: Path, supported_extensions: Set[str], poll_interval: float = 2.0):
+    """Returns an inotify watcher on Linux, or a polling watcher elsewhere or if inotify fails."""
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(root, supported_extensions)
+            logger.debug(f"Watching {root} with inotify")
+            return watcher
+        except FileError as e:
+            logger.warning(f"{e}. Falling back to polling every {poll_interval}s.")
+    logger.debug(f"Watching {root} by polling every {poll_interval}s")
+    return PollingWatcher(root, supported_extensions, poll_interval)
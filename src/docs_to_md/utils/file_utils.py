@@ -1,8 +1,13 @@
+import base64
+import errno
+import hashlib
 import logging
+import os
+import re
 import shutil
 import uuid
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Iterator, List, Optional, Set, Tuple
 
 import filetype
 
@@ -10,6 +15,12 @@ from docs_to_md.utils.exceptions import FileError
 
 logger = logging.getLogger(__name__)
 
+COPY_BUFFER_SIZE = 1024 * 1024
+BASE64_BLOCK_SIZE = 4 * 256 * 1024  # Encoded characters decoded at a time; a multiple of 4
+_WHITESPACE = re.compile(rb"\s+")
+# Errors meaning an in-kernel copy is not possible between these files; anything else is real
+_NO_KERNEL_COPY = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
 
 def ensure_directory(path: Path) -> None:
     """Create directory if it doesn't exist."""
@@ -29,6 +40,218 @@ def safe_delete(path: Path) -> None:
         logger.error(f"Error preparing to delete {path}: {e}", exc_info=False)
 
 
+def compute_file_hash(path: Path, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's content.
+
+    The file is read in fixed-size blocks into a reused buffer, so memory use
+    stays constant regardless of file size.
+
+    Raises:
+        FileError: If the file cannot be read.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while n := f.readinto(buffer):
+                digest.update(view[:n])
+    except OSError as e:
+        raise FileError(f"Failed to hash file {path}: {e}") from e
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, falling back to a copy (e.g. across filesystems)."""
+    ensure_directory(dst.parent)
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def link_or_copy_tree(src_dir: Path, dst_dir: Path) -> int:
+    """
+    Hardlink (or copy) every file below src_dir into dst_dir, keeping the
+    relative layout.
+
+    Returns:
+        Total number of bytes in the linked files.
+    """
+    total = 0
+    for src in src_dir.rglob("*"):
+        if src.is_file():
+            link_or_copy(src, dst_dir / src.relative_to(src_dir))
+            total += src.stat().st_size
+    return total
+
+
+def copy_tree(src_dir: Path, dst_dir: Path) -> int:
+    """
+    Copy every file below src_dir into dst_dir, keeping the relative layout.
+    Unlike link_or_copy_tree, later changes to either side stay on that side.
+
+    Returns:
+        Total number of bytes copied.
+    """
+    total = 0
+    for src in src_dir.rglob("*"):
+        if src.is_file():
+            dst = dst_dir / src.relative_to(src_dir)
+            ensure_directory(dst.parent)
+            shutil.copy2(src, dst)
+            total += src.stat().st_size
+    return total
+
+
+def move_or_copy_tree(src_dir: Path, dst_dir: Path) -> None:
+    """
+    Move every file below src_dir into dst_dir, keeping the relative layout.
+
+    Renames the whole directory when dst_dir is missing or empty, otherwise
+    each file, so no bytes are rewritten on the same filesystem. Falls back to
+    copying (leaving src_dir in place) across devices.
+    """
+    ensure_directory(dst_dir.parent)
+    try:
+        if not dst_dir.exists() or not any(dst_dir.iterdir()):
+            os.replace(src_dir, dst_dir)  # Also replaces an empty dst_dir
+            return
+        for src in src_dir.rglob("*"):
+            if src.is_file():
+                dst = dst_dir / src.relative_to(src_dir)
+                ensure_directory(dst.parent)
+                os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        logger.debug(f"{src_dir} and {dst_dir} are on different devices; copying instead")
+        shutil.copytree(src_dir, dst_dir, dirs_exist_ok=True)
+
+
+def partial_path(path: Path) -> Path:
+    """Where a file is written before being renamed into place once complete."""
+    return path.with_name(path.name + ".partial")
+
+
+def append_file(src: Path, dst_fd: int) -> int:
+    """
+    Copy all of src to the current position of the open file descriptor dst_fd.
+
+    The bytes are copied inside the kernel with copy_file_range or sendfile
+    where the platform allows it, falling back to a large-buffer binary copy.
+
+    Returns:
+        Number of bytes copied.
+    """
+    with open(src, "rb", buffering=0) as f:
+        src_fd = f.fileno()
+        size = os.fstat(src_fd).st_size
+        copied = 0
+        for kernel_copy in (
+            getattr(os, "copy_file_range", None),
+            getattr(os, "sendfile", None),
+        ):
+            if kernel_copy is None or copied:
+                continue
+            try:
+                while copied < size:
+                    if kernel_copy is os.sendfile:
+                        n = os.sendfile(dst_fd, src_fd, None, size - copied)
+                    else:
+                        n = kernel_copy(src_fd, dst_fd, size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError as e:
+                if copied or e.errno not in _NO_KERNEL_COPY:
+                    raise
+        if copied >= size:
+            return copied
+
+        # Buffered fallback, also picking up anything the file grew by
+        f.seek(copied)
+        buffer = bytearray(COPY_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while n := f.readinto(buffer):
+            written = 0
+            while written < n:
+                written += os.write(dst_fd, view[written:n])
+            copied += n
+    return copied
+
+
+class Base64FileWriter:
+    """Decodes base64 text, written in pieces of any size, into a file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.written = 0
+        self._carry = b""
+        self._file = open(path, "wb")
+
+    def write(self, data) -> None:
+        """
+        Raises:
+            ValueError: If data is not base64.
+        """
+        if isinstance(data, str):
+            data = data.encode("ascii")
+        piece = self._carry + data
+        if _WHITESPACE.search(piece):
+            piece = _WHITESPACE.sub(b"", piece)  # Line-wrapped base64
+        usable = len(piece) - len(piece) % 4
+        self._carry = piece[usable:]
+        if usable:
+            self.written += self._file.write(base64.b64decode(piece[:usable]))
+
+    def close(self) -> int:
+        """
+        Finishes the file and returns the number of bytes written.
+
+        Raises:
+            ValueError: If the data ended in the middle of a base64 group (the file is removed).
+        """
+        try:
+            if self._carry:
+                self.written += self._file.write(base64.b64decode(self._carry))
+        except ValueError:
+            self.abort()
+            raise
+        self._file.close()
+        return self.written
+
+    def abort(self) -> None:
+        """Closes and removes the partial file."""
+        self._file.close()
+        safe_delete(self.path)
+
+
+def decode_base64_to_file(data: str, path: Path, block_size: int = BASE64_BLOCK_SIZE) -> int:
+    """
+    Decode base64 text into a file block by block, so only one decoded block
+    is held in memory next to the encoded text.
+
+    Returns:
+        Number of bytes written.
+
+    Raises:
+        ValueError: If data is not valid base64 (the partial file is removed).
+        OSError: If the file cannot be written.
+    """
+    writer = Base64FileWriter(path)
+    try:
+        for start in range(0, len(data), block_size):
+            writer.write(data[start:start + block_size])
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
 def get_unique_filename(path: Path) -> Path:
     """Generates a unique filename if the path exists by appending _1, _2, etc."""
     if not path.exists():
@@ -75,7 +298,7 @@ class FileDiscovery:
             return None
 
     @staticmethod
-    def _is_processable(
+    def is_processable(
         file_path: Path,
         supported_extensions: Set[str],
         supported_types: Set[str]
@@ -125,7 +348,7 @@ class FileDiscovery:
             raise FileError(f"Input path does not exist: {input_path}")
 
         if input_path.is_file():
-            if FileDiscovery._is_processable(input_path, supported_extensions, supported_types):
+            if FileDiscovery.is_processable(input_path, supported_extensions, supported_types):
                 files_to_process.append(input_path)
             else:
                 ext = input_path.suffix.lower().strip('.')
@@ -136,7 +359,7 @@ class FileDiscovery:
             logger.info(f"Searching for processable files in directory: {input_path}")
             for p in input_path.rglob("*"):
                 if p.is_file():
-                    if FileDiscovery._is_processable(p, supported_extensions, supported_types):
+                    if FileDiscovery.is_processable(p, supported_extensions, supported_types):
                         files_to_process.append(p)
 
         else:
@@ -149,6 +372,57 @@ class FileDiscovery:
 
         return files_to_process
 
+    @staticmethod
+    def scan_candidate_files(
+        input_path: Path,
+        supported_extensions: Set[str],
+        skip_dirs: Optional[Set[str]] = None,
+    ) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Yields files below input_path with a supported extension, with their stat.
+
+        Unlike find_processable_files this does not read file headers, so it
+        stays fast on very large trees. Paths are yielded as absolute path
+        strings to avoid Path overhead on hundreds of thousands of files.
+        Symlinked directories are not followed.
+
+        Args:
+            input_path: Directory or file path to scan.
+            supported_extensions: Set of supported file extensions (without dot).
+            skip_dirs: Directories whose contents are ignored.
+
+        Raises:
+            FileError: If the input path does not exist.
+        """
+        input_path = Path(input_path).resolve()
+        if not input_path.exists():
+            raise FileError(f"Input path does not exist: {input_path}")
+
+        if input_path.is_file():
+            if input_path.suffix.lower().strip('.') in supported_extensions:
+                yield str(input_path), input_path.stat()
+            return
+
+        skip = skip_dirs or set()
+        pending = [str(input_path)]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.path not in skip:
+                                    pending.append(entry.path)
+                            elif entry.is_file():
+                                ext = os.path.splitext(entry.name)[1].lower().strip('.')
+                                if ext in supported_extensions:
+                                    yield entry.path, entry.stat()
+                        except OSError as e:
+                            logger.warning(f"Skipping {entry.path}: {e}")
+            except OSError as e:
+                logger.warning(f"Cannot scan directory {current}: {e}")
+
 
 class TemporaryDirectory:
     """Context manager for temporary directories."""
@@ -218,3 +492,27 @@ class FileIO:
             shutil.copy2(src, dst)
         except Exception as e:
             raise FileError(f"Failed to copy file from {src} to {dst}: {e}")
+
+    @staticmethod
+    def write_file_atomic(path: Path, content: str, encoding: str = "utf-8") -> None:
+        """Write text content to a temporary sibling and rename it over path."""
+        tmp_path = partial_path(path)
+        try:
+            ensure_directory(path.parent)
+            tmp_path.write_text(content, encoding=encoding)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            safe_delete(tmp_path)
+            raise FileError(f"Failed to write to file {path}: {e}")
+
+    @staticmethod
+    def copy_file_atomic(src: Path, dst: Path) -> None:
+        """Copy a file to a temporary sibling of dst and rename it into place."""
+        tmp_path = partial_path(dst)
+        try:
+            ensure_directory(dst.parent)
+            shutil.copy2(src, tmp_path)
+            os.replace(tmp_path, dst)
+        except Exception as e:
+            safe_delete(tmp_path)
+            raise FileError(f"Failed to copy file from {src} to {dst}: {e}")
@@ -0,0 +1,101 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from docs_to_md.utils.exceptions import FileError
+from docs_to_md.utils.file_utils import compute_file_hash, safe_delete
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DEDUP_MODES = ("off", "output", "run")
+
+
+class ImageDeduplicator:
+    """
+    Stores repeated images once by hardlinking identical files to the first copy.
+
+    Only files whose size matches an earlier image are hashed, so documents
+    without repeats cost one stat per image. References in the output keep
+    pointing at their own names. One instance deduplicates across every
+    directory passed to it (a whole run); use a new one per output otherwise.
+    A canonical copy deleted or replaced since it was seen is forgotten, and
+    the next file of its size takes its place, so long-running modes keep
+    deduplicating as old outputs are removed.
+    """
+
+    def __init__(self):
+        self._by_size: Dict[int, List[Path]] = {}  # Canonical copies seen so far
+        self._identities: Dict[Path, Tuple[int, int, int]] = {}  # (device, inode, mtime) of each canonical copy
+        self._digests: Dict[Path, str] = {}
+        self.files_linked = 0
+        self.bytes_saved = 0
+
+    def _digest(self, path: Path) -> str:
+        if path not in self._digests:
+            self._digests[path] = compute_file_hash(path)
+        return self._digests[path]
+
+    def _forget(self, size: int, path: Path) -> None:
+        """Drops a canonical copy that was deleted or replaced since it was seen."""
+        self._by_size[size].remove(path)
+        self._identities.pop(path, None)
+        self._digests.pop(path, None)
+
+    def _add_canonical(self, path: Path, stat: os.stat_result) -> None:
+        self._by_size.setdefault(stat.st_size, []).append(path)
+        self._identities[path] = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def _link(self, canonical: Path, duplicate: Path) -> bool:
+        tmp_path = duplicate.with_name(f".{duplicate.name}.link")
+        try:
+            os.link(canonical, tmp_path)
+            os.replace(tmp_path, duplicate)
+            return True
+        except OSError as e:
+            # E.g. the canonical copy is on another filesystem
+            safe_delete(tmp_path)
+            logger.debug(f"Could not link {duplicate} to {canonical}: {e}")
+            return False
+
+    def dedupe_dir(self, directory: Path) -> Tuple[int, int]:
+        """
+        Replaces images in directory that repeat an image seen before with hardlinks.
+
+        Returns:
+            (files linked, bytes saved) for this directory.
+        """
+        linked = saved = 0
+        for path in sorted(directory.iterdir()):
+            try:
+                stat = path.stat()
+                if not path.is_file():
+                    continue
+                canonical = None
+                for candidate in list(self._by_size.get(stat.st_size, [])):
+                    try:
+                        candidate_stat = candidate.stat()
+                    except OSError:
+                        self._forget(stat.st_size, candidate)
+                        continue
+                    identity = (candidate_stat.st_dev, candidate_stat.st_ino, candidate_stat.st_mtime_ns)
+                    if identity != self._identities.get(candidate) or candidate_stat.st_size != stat.st_size:
+                        self._forget(stat.st_size, candidate)
+                        continue
+                    if (candidate_stat.st_dev, candidate_stat.st_ino) == (stat.st_dev, stat.st_ino):
+                        break  # Already the same file
+                    if self._digest(candidate) == self._digest(path):
+                        canonical = candidate
+                        break
+                else:
+                    self._add_canonical(path, stat)
+                    continue
+            except (OSError, FileError) as e:
+                logger.warning(f"Skipping image {path} during deduplication: {e}")
+                continue
+            if canonical is not None and self._link(canonical, path):
+                linked += 1
+                saved += stat.st_size
+        self.files_linked += linked
+        self.bytes_saved += saved
+        return linked, saved
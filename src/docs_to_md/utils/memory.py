@@ -0,0 +1,80 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+
+
+class MemoryBudget:
+    """
+    Accounts for large in-memory payloads (downloaded responses, decoded
+    images, JSON chunks being merged) against a shared limit. Thread-safe.
+
+    Callers that can postpone work (fetching a finished result, which stays on
+    the server for an hour) use try_acquire and retry later; callers that
+    cannot block in acquire until enough is released. A single request larger
+    than the whole budget is admitted once nothing else is held, so it can
+    never wait forever.
+    """
+
+    def __init__(self, limit_bytes: int):
+        """
+        Raises:
+            ValueError: If the limit is not positive.
+        """
+        if limit_bytes <= 0:
+            raise ValueError("Memory budget must be positive")
+        self.limit = limit_bytes
+        self.in_use = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def _fits(self, nbytes: int) -> bool:
+        return self.in_use + nbytes <= self.limit or self.in_use == 0
+
+    def _take(self, nbytes: int) -> None:
+        self.in_use += nbytes
+        self.peak = max(self.peak, self.in_use)
+
+    def try_acquire(self, nbytes: int) -> bool:
+        """Reserves nbytes if they fit now; returns False otherwise."""
+        with self._cond:
+            if not self._fits(nbytes):
+                return False
+            self._take(nbytes)
+            return True
+
+    def acquire(self, nbytes: int) -> None:
+        """Reserves nbytes, waiting for other holders to release memory if needed."""
+        with self._cond:
+            if not self._fits(nbytes):
+                logger.debug(f"Waiting for {nbytes} bytes of memory budget ({self.in_use}/{self.limit} in use)")
+            self._cond.wait_for(lambda: self._fits(nbytes))
+            self._take(nbytes)
+
+    def charge(self, nbytes: int) -> None:
+        """Records nbytes that are already allocated, even if that exceeds the limit."""
+        with self._cond:
+            self._take(nbytes)
+
+    def release(self, nbytes: int) -> None:
+        with self._cond:
+            self.in_use = max(0, self.in_use - nbytes)
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self, nbytes: int) -> Iterator[None]:
+        """Holds nbytes of the budget for the duration of the block."""
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+
+def budget_from_mb(limit_mb: Optional[int]) -> Optional[MemoryBudget]:
+    """Returns a budget of limit_mb MiB, or None (unlimited) if no limit is set."""
+    return MemoryBudget(limit_mb * MIB) if limit_mb else None
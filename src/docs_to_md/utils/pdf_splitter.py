@@ -1,7 +1,9 @@
+import hashlib
+import io
 import logging
 import uuid
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pikepdf
 from pydantic import BaseModel
@@ -19,6 +21,7 @@ class PDFChunkInfo(BaseModel):
     index: int
     start_page: int
     end_page: int
+    content_hash: Optional[str] = None  # Hash of the chunk's page objects, if requested
 
 
 class PDFChunks(BaseModel):
@@ -26,6 +29,118 @@ class PDFChunks(BaseModel):
     chunks: List[PDFChunkInfo]
 
 
+def _object_digest(obj, digest, memo: Dict[Tuple[int, int], str]) -> None:
+    """
+    Feed a PDF object and everything it references into digest.
+
+    Indirect objects are hashed once and memoized by object number, so shared
+    resources such as fonts are only read once per document. Object numbers
+    themselves never enter the hash, which keeps it stable when pages are
+    inserted or removed elsewhere in the file.
+    """
+    if isinstance(obj, pikepdf.Object) and obj.is_indirect:
+        key = obj.objgen
+        if key not in memo:
+            memo[key] = ""  # Placeholder breaks reference cycles
+            sub = hashlib.sha256()
+            _object_value_digest(obj, sub, memo)
+            memo[key] = sub.hexdigest()
+        digest.update(memo[key].encode("ascii"))
+    else:
+        _object_value_digest(obj, digest, memo)
+
+
+def _object_value_digest(obj, digest, memo: Dict[Tuple[int, int], str]) -> None:
+    if isinstance(obj, pikepdf.Stream):
+        digest.update(b"stream")
+        digest.update(obj.read_raw_bytes())
+        items = obj.stream_dict.items()
+    elif isinstance(obj, pikepdf.Dictionary):
+        items = obj.items()
+    elif isinstance(obj, pikepdf.Array):
+        digest.update(b"[")
+        for item in obj:
+            _object_digest(item, digest, memo)
+        digest.update(b"]")
+        return
+    else:
+        digest.update(str(obj).encode("utf-8", "surrogatepass"))
+        return
+
+    digest.update(b"<<")
+    for key, value in sorted(items, key=lambda kv: kv[0]):
+        # /Parent points back into the page tree (the whole document) and
+        # /Length is implied by the stream bytes.
+        if key in ("/Parent", "/Length"):
+            continue
+        digest.update(key.encode("utf-8"))
+        _object_digest(value, digest, memo)
+    digest.update(b">>")
+
+
+def count_pdf_pages(pdf_path: Path) -> Optional[int]:
+    """
+    Returns the page count of a PDF, or None if it cannot be read.
+
+    Reads the page tree's /Count entry, which only needs the cross-reference
+    table and the document catalog, not the pages themselves.
+    """
+    try:
+        with pikepdf.open(pdf_path) as pdf:
+            count = pdf.Root.Pages.get("/Count")
+            if isinstance(count, int) and count >= 0:
+                return int(count)
+            return len(pdf.pages)
+    except Exception as e:
+        logger.debug(f"Could not count pages of {pdf_path}: {e}")
+        return None
+
+
+def page_fingerprints(pdf: pikepdf.Pdf) -> List[str]:
+    """Return a content hash for every page, independent of its position in the file."""
+    memo: Dict[Tuple[int, int], str] = {}
+    fingerprints = []
+    for page in pdf.pages:
+        digest = hashlib.sha256()
+        _object_digest(page.obj, digest, memo)
+        fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+
+def plan_chunk_ranges(
+    fingerprints: List[str], pages_per_chunk: int, stable_boundaries: bool = False
+) -> List[Tuple[int, int]]:
+    """
+    Split pages into (start, end) ranges, end exclusive.
+
+    By default every chunk holds exactly pages_per_chunk pages. With
+    stable_boundaries, a chunk ends after any page whose fingerprint selects it
+    as an anchor (once the chunk holds a minimum number of pages), or when it
+    reaches pages_per_chunk. Boundaries then depend on page content rather than
+    position, so inserting pages only changes the chunks around the insertion.
+    """
+    num_pages = len(fingerprints)
+    if not stable_boundaries:
+        return [
+            (start, min(start + pages_per_chunk, num_pages))
+            for start in range(0, num_pages, pages_per_chunk)
+        ]
+
+    min_pages = max(1, pages_per_chunk // 4)
+    divisor = max(2, pages_per_chunk // 2)
+    ranges: List[Tuple[int, int]] = []
+    start = 0
+    for i, fingerprint in enumerate(fingerprints):
+        length = i - start + 1
+        is_anchor = int(fingerprint[:8], 16) % divisor == 0
+        if length >= pages_per_chunk or (length >= min_pages and is_anchor):
+            ranges.append((start, i + 1))
+            start = i + 1
+    if start < num_pages:
+        ranges.append((start, num_pages))
+    return ranges
+
+
 def _create_chunk(pdf: pikepdf.Pdf, chunks_dir: Path, chunk_num: int, num_chunks: int, start: int, end: int) -> str:
     """
     Create a single PDF chunk.
@@ -65,15 +180,24 @@ def _create_chunk(pdf: pikepdf.Pdf, chunks_dir: Path, chunk_num: int, num_chunks
         chunk_pdf.close()
 
 
-def _create_chunks(pdf: pikepdf.Pdf, path: Path, pages_per_chunk: int, tmp_dir: Path) -> PDFChunks:
+def _create_chunks(
+    pdf: pikepdf.Pdf,
+    path: Path,
+    pages_per_chunk: int,
+    tmp_dir: Path,
+    stable_boundaries: bool = False,
+    with_hashes: bool = False,
+) -> PDFChunks:
     """
     Create multiple chunks from a PDF.
     
     Args:
         pdf: Source PDF
         path: Original PDF path (for naming)
-        pages_per_chunk: Number of pages per chunk
+        pages_per_chunk: Maximum number of pages per chunk
         tmp_dir: Directory to save chunks
+        stable_boundaries: Place chunk boundaries by page content
+        with_hashes: Compute a content hash for every chunk
         
     Returns:
         PDFChunks with information about created chunks
@@ -84,21 +208,30 @@ def _create_chunks(pdf: pikepdf.Pdf, path: Path, pages_per_chunk: int, tmp_dir:
     # Use provided temp directory
     ensure_directory(tmp_dir)
 
-    num_chunks = (len(pdf.pages) + pages_per_chunk - 1) // pages_per_chunk
+    if stable_boundaries or with_hashes:
+        fingerprints = page_fingerprints(pdf)
+    else:
+        fingerprints = [""] * len(pdf.pages)
+    ranges = plan_chunk_ranges(fingerprints, pages_per_chunk, stable_boundaries)
+    num_chunks = len(ranges)
     chunks: List[PDFChunkInfo] = []
 
     progress = ProgressTracker(num_chunks, "Chunking PDF", "chunk")
     
     try:
-        for chunk_num in range(num_chunks):
-            start = chunk_num * pages_per_chunk
-            end = min(start + pages_per_chunk, len(pdf.pages))
+        for chunk_num, (start, end) in enumerate(ranges):
             chunk_path = _create_chunk(pdf, tmp_dir, chunk_num, num_chunks, start, end)
+            content_hash = None
+            if with_hashes:
+                content_hash = hashlib.sha256(
+                    "".join(fingerprints[start:end]).encode("ascii")
+                ).hexdigest()
             chunks.append(PDFChunkInfo(
                 path=chunk_path,
                 index=chunk_num,
                 start_page=start,
-                end_page=end-1
+                end_page=end-1,
+                content_hash=content_hash,
             ))
             progress.update()
 
@@ -111,7 +244,13 @@ def _create_chunks(pdf: pikepdf.Pdf, path: Path, pages_per_chunk: int, tmp_dir:
         progress.close()
 
 
-def chunk_pdf_to_temp(pdf_path: str, pages_per_chunk: int = 10, tmp_dir: Optional[Path] = None) -> Optional[PDFChunks]:
+def chunk_pdf_to_temp(
+    pdf_path: str,
+    pages_per_chunk: int = 10,
+    tmp_dir: Optional[Path] = None,
+    stable_boundaries: bool = False,
+    with_hashes: bool = False,
+) -> Optional[PDFChunks]:
     """
     Split a PDF into chunks of specified size and save to temp directory.
 
@@ -119,6 +258,9 @@ def chunk_pdf_to_temp(pdf_path: str, pages_per_chunk: int = 10, tmp_dir: Optiona
         pdf_path: Path to the PDF file
         pages_per_chunk: Number of pages per chunk (default: 10)
         tmp_dir: Directory to save chunks in (default: creates one)
+        stable_boundaries: Place chunk boundaries by page content, keeping
+            pages_per_chunk as the maximum chunk size
+        with_hashes: Compute a content hash for every chunk
 
     Returns:
         PDFChunks containing information about each chunk, or None if no chunking needed
@@ -154,7 +296,9 @@ def chunk_pdf_to_temp(pdf_path: str, pages_per_chunk: int = 10, tmp_dir: Optiona
             tmp_dir = Path("chunks") / f"{path.stem}_{uuid.uuid4().hex[:8]}"
             ensure_directory(tmp_dir)
 
-        return _create_chunks(pdf, path, pages_per_chunk, tmp_dir)
+        return _create_chunks(
+            pdf, path, pages_per_chunk, tmp_dir, stable_boundaries, with_hashes
+        )
 
     except pikepdf.PdfError as e:
         raise PDFProcessingError(f"Invalid PDF {pdf_path}: {e}")
@@ -164,4 +308,52 @@ def chunk_pdf_to_temp(pdf_path: str, pages_per_chunk: int = 10, tmp_dir: Optiona
         raise PDFProcessingError(f"Error processing PDF {pdf_path}: {e}")
     finally:
         if pdf is not None:
-            pdf.close() 
\ No newline at end of file
+            pdf.close() 
+
+def iter_pdf_chunks_in_memory(data: bytes, pages_per_chunk: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Split an in-memory PDF into chunks without touching the disk.
+
+    Chunks are built lazily, so only the source and the chunk being handed
+    out are held in memory at a time. A PDF that fits in one chunk is
+    yielded unchanged.
+
+    Yields:
+        (first page index, chunk PDF bytes) pairs in page order.
+
+    Raises:
+        PDFProcessingError: If the data is not a readable PDF
+        ValueError: If pages_per_chunk < 1
+    """
+    if pages_per_chunk < 1:
+        raise ValueError("pages_per_chunk must be at least 1")
+    try:
+        pdf = pikepdf.Pdf.open(io.BytesIO(data))
+    except Exception as e:
+        raise PDFProcessingError(f"Failed to read PDF from memory: {e}") from e
+
+    with pdf:
+        num_pages = len(pdf.pages)
+        if num_pages == 0:
+            raise PDFProcessingError("PDF has no pages")
+        if num_pages <= pages_per_chunk:
+            yield 0, data
+            return
+
+        for start in range(0, num_pages, pages_per_chunk):
+            end = min(start + pages_per_chunk, num_pages)
+            chunk_pdf = pikepdf.Pdf.new()
+            try:
+                for i in range(start, end):
+                    chunk_pdf.pages.append(pdf.pages[i])
+                buffer = io.BytesIO()
+                chunk_pdf.save(
+                    buffer,
+                    compress_streams=True,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                )
+            except Exception as e:
+                raise PDFProcessingError(f"Failed to create PDF chunk at page {start + 1}: {e}") from e
+            finally:
+                chunk_pdf.close()
+            yield start, buffer.getvalue()
@@ -0,0 +1,98 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.batch import ManifestBatch
+from docs_to_md.core.processor import JobResult
+
+
+class FakeProcessor:
+    def __init__(self, stop_after=None):
+        self.calls = []
+        self.stop_after = stop_after  # Simulate an interruption after this many results
+        self.yielded = 0
+        self.closed = False
+
+    def iter_jobs(self, jobs, config):
+        self.calls.append(([path.name for path, _ in jobs], config.use_llm))
+        for path, paths in jobs:
+            if self.yielded == self.stop_after:
+                raise KeyboardInterrupt
+            self.yielded += 1
+            ok = path.name != "bad.pdf"
+            if ok:
+                paths.markdown_path.write_text(f"# {path.name}")
+            yield JobResult(path, paths, ok, error=None if ok else "boom",
+                            page_count=2, submitted_at=1.0, finished_at=3.5)
+
+    def close(self):
+        self.closed = True
+
+
+class TestManifestBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        for name in ("a.pdf", "b.pdf", "bad.pdf", "c.pdf"):
+            (self.tmp_path / name).write_bytes(b"%PDF-1.4")
+        self.manifest = self.tmp_path / "docs.jsonl"
+        lines = [
+            {"input": "a.pdf", "output": "out/a.md"},
+            {"input": "b.pdf", "options": {"use_llm": True}},
+            "not json",
+            {"input": "bad.pdf"},
+            {"input": "c.pdf", "options": {"colour": "red"}},
+            {"input": "missing.pdf"},
+        ]
+        self.manifest.write_text(
+            "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n"
+        )
+        self.config = Config(api_key="key", input_path=str(self.manifest), command="batch", batch_size=4)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _results(self):
+        path = self.tmp_path / "docs.jsonl.results.jsonl"
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def test_runs_manifest_and_logs_results(self):
+        processor = FakeProcessor()
+        totals = ManifestBatch(self.config, processor).run()
+
+        self.assertEqual(totals, {"done": 2, "failed": 1, "invalid": 3})
+        self.assertTrue(processor.closed)
+        # Lines with different options are converted separately
+        self.assertEqual(processor.calls, [(["a.pdf", "bad.pdf"], False), (["b.pdf"], True)])
+        self.assertEqual((self.tmp_path / "out" / "a.md").read_text(), "# a.pdf")
+
+        by_input = {Path(r["input"]).name if r["input"] else r["offset"]: r for r in self._results()}
+        self.assertEqual(by_input["a.pdf"]["status"], "done")
+        self.assertEqual(by_input["a.pdf"]["images_dir"], str(self.tmp_path / "out" / "images_a"))
+        self.assertEqual((by_input["a.pdf"]["pages"], by_input["a.pdf"]["duration"]), (2, 2.5))
+        self.assertEqual(by_input["bad.pdf"]["status"], "failed")
+        self.assertIn("colour", by_input["c.pdf"]["error"])
+        self.assertEqual(sum(r["status"] == "invalid" for r in self._results()), 3)
+
+    def test_resume_skips_finished_documents(self):
+        with self.assertRaises(KeyboardInterrupt):
+            ManifestBatch(self.config, FakeProcessor(stop_after=1)).run()
+        self.assertEqual([r["status"] for r in self._results()], ["invalid", "done"])
+
+        processor = FakeProcessor()
+        totals = ManifestBatch(self.config, processor).run(resume=True)
+
+        # The first window is redone apart from what was already logged
+        self.assertEqual(processor.calls, [(["b.pdf"], True), (["bad.pdf"], False)])
+        self.assertEqual(totals, {"done": 1, "failed": 1, "invalid": 2})
+        self.assertEqual(len(self._results()), 6)
+        self.assertEqual(len({r["offset"] for r in self._results()}), 6)
+
+        checkpoint = json.loads((self.tmp_path / "docs.jsonl.results.jsonl.offset").read_text())
+        self.assertEqual(checkpoint["manifest_offset"], self.manifest.stat().st_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md.core.bundle import BundleWriter, bundle_outputs
+from docs_to_md.core.page_index import index_path
+from docs_to_md.utils.exceptions import ResultProcessingError
+
+
+class TestBundle(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _output(self, key):
+        output = self.tmp_path / f"doc_{key}.json"
+        output.write_text('{"children":[]}' * 50)
+        index_path(output).write_text('{"version":1}')
+        output.with_suffix(".md").write_text("# Rendered\n")
+        images_dir = self.tmp_path / f"images_{key}"
+        images_dir.mkdir()
+        (images_dir / "page_0_fig_0.png").write_bytes(b"\x89PNG" + b"\0" * 1000)
+        os.link(images_dir / "page_0_fig_0.png", images_dir / "page_1_fig_0.png")
+        return output, images_dir
+
+    def test_zip_per_output_stores_images_uncompressed(self):
+        output, images_dir = self._output("a")
+        archives = bundle_outputs([(output, images_dir)], "zip", render_formats=["markdown"])
+
+        self.assertEqual(archives, [self.tmp_path / "doc_a.zip"])
+        self.assertEqual(sorted(p.name for p in self.tmp_path.iterdir()), ["doc_a.zip"])
+        with zipfile.ZipFile(archives[0]) as bundle:
+            self.assertEqual(
+                sorted(bundle.namelist()),
+                ["doc_a.json", "doc_a.json.index.json", "doc_a.md",
+                 "images_a/page_0_fig_0.png", "images_a/page_1_fig_0.png"],
+            )
+            self.assertEqual(bundle.getinfo("images_a/page_0_fig_0.png").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(bundle.getinfo("doc_a.json").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(bundle.read("doc_a.md"), b"# Rendered\n")
+
+    def test_run_tar_stores_linked_images_once(self):
+        run_writer = BundleWriter(self.tmp_path / "run.tar", "tar")
+        bundle_outputs([self._output("a"), self._output("b")], "tar", run_writer, ["markdown"])
+        self.assertFalse((self.tmp_path / "run.tar").exists())  # Appears once closed
+        self.assertTrue((self.tmp_path / "doc_a.json").exists())  # Kept until then
+        run_writer.close()
+
+        with tarfile.open(self.tmp_path / "run.tar") as bundle:
+            members = {m.name: m for m in bundle.getmembers()}
+            self.assertIn("doc_b.json.index.json", members)
+            self.assertTrue(members["images_a/page_1_fig_0.png"].islnk())
+            self.assertEqual(members["images_a/page_1_fig_0.png"].linkname, "images_a/page_0_fig_0.png")
+            self.assertEqual(bundle.extractfile("images_b/page_0_fig_0.png").read()[:4], b"\x89PNG")
+        self.assertEqual(sorted(p.name for p in self.tmp_path.iterdir()), ["run.tar"])
+
+    def test_failed_close_keeps_loose_files(self):
+        output, images_dir = self._output("a")
+        with mock.patch("docs_to_md.core.bundle.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(ResultProcessingError):
+                bundle_outputs([(output, images_dir)], "zip")
+
+        self.assertTrue(output.exists())
+        self.assertTrue((images_dir / "page_0_fig_0.png").exists())
+        self.assertFalse(any(p.suffix in (".zip", ".partial") for p in self.tmp_path.iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
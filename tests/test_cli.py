@@ -31,6 +31,19 @@ class TestCLI(unittest.TestCase):
             self.assertTrue(config.use_llm)
             self.assertTrue(config.force_ocr)
             self.assertEqual(config.output_dir, Path(tmp_dir))
+            self.assertEqual(config.command, "convert")
+            self.assertFalse(config.use_result_store)  # Inputs are only hashed with --cache
+
+    def test_watch_command(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            argv = ["prog", "watch", tmp_dir, "--settle", "0.5", "--cache"]
+            with mock.patch.dict(os.environ, {"MARKER_PDF_KEY": "abc"}, clear=False):
+                with mock.patch.object(sys, "argv", argv):
+                    config = create_config_from_args()
+            self.assertEqual(config.command, "watch")
+            self.assertEqual(config.input_path, tmp_dir)
+            self.assertEqual(config.watch_settle_seconds, 0.5)
+            self.assertTrue(config.use_result_store)
 
 
 if __name__ == "__main__":
@@ -64,15 +64,18 @@ from docs_to_md.storage import cache as cache_module
 
 
 class FakeMarkerClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, budget=None):
         self.api_key = api_key
 
     def submit_file(self, *args, **kwargs):
         return "req-1"
 
-    def check_status(self, request_id: str):
+    def check_status(self, request_id: str, sink=None):
         return MarkerStatus(status=StatusEnum.COMPLETE, markdown="# mock", success=True)
 
+    def close(self):
+        pass
+
     def __enter__(self):
         return self
 
@@ -98,6 +101,7 @@ class TestCLIOperation(unittest.TestCase):
                                         output_dir=Path(tmp_dir),
                                         output_format="markdown",
                                         chunk_size=1000,
+                                        result_store_dir=Path(tmp_dir) / "results",
                                     )
                                     cfg.validate()
                                     processor = MarkerProcessor(cfg)
@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md import aconvert_many, convert_many
+from docs_to_md.api.models import MarkerStatus, StatusEnum
+
+
+class FakeMarkerClient:
+    _ids = itertools.count()
+
+    def __init__(self, api_key, budget=None):
+        self.names = {}
+        self.checks = {}
+
+    def submit_file(self, file_path, **kwargs):
+        if file_path.name.startswith("bad"):
+            return None
+        request_id = f"req-{next(self._ids)}"
+        self.names[request_id] = file_path.name
+        return request_id
+
+    def check_status(self, request_id, sink=None):
+        self.checks[request_id] = self.checks.get(request_id, 0) + 1
+        if self.names[request_id].startswith("slow") and self.checks[request_id] <= 3:
+            return MarkerStatus(status=StatusEnum.PROCESSING)
+        return MarkerStatus(
+            status=StatusEnum.COMPLETE,
+            markdown=f"# {self.names[request_id]}",
+            success=True,
+            page_count=3,
+        )
+
+    def close(self):
+        pass
+
+
+class TestConvertMany(unittest.TestCase):
+    def _options(self, tmp_path: Path):
+        return {
+            "cache_dir": tmp_path / "cache",
+            "root_tmp_dir": tmp_path / "tmp",
+            "output_dir": tmp_path / "out",
+            "use_result_store": False,
+        }
+
+    def _inputs(self, tmp_path: Path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        for name in ("a.docx", "b.docx", "bad.docx"):
+            (docs / name).write_bytes(b"PK\x03\x04 " + name.encode())
+        return docs
+
+    def test_yields_result_per_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            docs = self._inputs(tmp_path)
+            progress = []
+            with mock.patch("docs_to_md.core.processor.MarkerClient", FakeMarkerClient):
+                results = list(
+                    convert_many(
+                        [docs],
+                        self._options(tmp_path),
+                        progress=lambda done, total, r: progress.append((done, total)),
+                        api_key="key",
+                    )
+                )
+
+            by_name = {r.input_file.name: r for r in results}
+            self.assertEqual(sorted(by_name), ["a.docx", "b.docx", "bad.docx"])
+            self.assertEqual(by_name["a.docx"].content, "# a.docx")
+            self.assertEqual(by_name["a.docx"].page_count, 3)
+            self.assertGreaterEqual(by_name["a.docx"].duration, 0)
+            self.assertFalse(by_name["bad.docx"].success)
+            self.assertIn("failed", by_name["bad.docx"].error)
+            self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    def test_results_come_in_the_order_documents_finish(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            for name in ("slow.docx", "a.docx"):
+                (tmp_path / name).write_bytes(b"PK\x03\x04 " + name.encode())
+            options = dict(self._options(tmp_path), batch_size=1)
+            with mock.patch("docs_to_md.core.processor.MarkerClient", FakeMarkerClient), \
+                    mock.patch("docs_to_md.core.processor.time.sleep") as sleep:
+                results = list(
+                    convert_many([tmp_path / "slow.docx", tmp_path / "a.docx"], options, api_key="key")
+                )
+
+            # slow.docx was submitted first but is still processing when a.docx is done
+            self.assertEqual([r.input_file.name for r in results], ["a.docx", "slow.docx"])
+            self.assertTrue(all(r.success for r in results))
+            self.assertEqual(results[1].content, "# slow.docx")
+            self.assertEqual(sleep.call_count, 2)  # Polled until the API finished it
+
+    def test_async_iterator(self):
+        async def collect(tmp_path, docs):
+            return [r async for r in aconvert_many([docs / "a.docx"], self._options(tmp_path), api_key="key")]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            docs = self._inputs(tmp_path)
+            with mock.patch("docs_to_md.core.processor.MarkerClient", FakeMarkerClient):
+                results = asyncio.run(collect(tmp_path, docs))
+            self.assertEqual([r.content for r in results], ["# a.docx"])
+
+
+if __name__ == "__main__":
+    unittest.main()
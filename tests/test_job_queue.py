@@ -0,0 +1,89 @@
+import sqlite3
+import tempfile
+import time
+import unittest
+from contextlib import closing
+from pathlib import Path
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import OutputPaths
+from docs_to_md.core.processor import JobResult
+from docs_to_md.core.worker import QueueWorker
+from docs_to_md.storage.job_queue import JobQueue
+
+
+def _job(tmp_path: Path, name: str):
+    return (
+        tmp_path / f"{name}.pdf",
+        OutputPaths(tmp_path / f"{name}_k.md", tmp_path / "images_k", "k"),
+    )
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_lease_expiry_and_retries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            queue = JobQueue(tmp_path / "queue.db", max_attempts=2)
+            self.assertEqual(queue.add_jobs([_job(tmp_path, "a"), _job(tmp_path, "b")]), 2)
+            self.assertEqual(queue.add_jobs([_job(tmp_path, "a")]), 0)  # Second worker enqueues too
+
+            first = queue.lease("w1", limit=1, lease_seconds=0.05)
+            self.assertEqual([j.input_file.name for j in first], ["a.pdf"])
+            second = queue.lease("w2", limit=5, lease_seconds=60)
+            self.assertEqual([j.input_file.name for j in second], ["b.pdf"])
+
+            time.sleep(0.1)  # w1 died; its lease expires and w2 takes the job over
+            self.assertEqual(queue.heartbeat("w2", [second[0].job_id], 60), 1)
+            reclaimed = queue.lease("w2", limit=5, lease_seconds=60)
+            self.assertEqual([(j.input_file.name, j.attempts) for j in reclaimed], [("a.pdf", 2)])
+            self.assertEqual(queue.heartbeat("w1", [first[0].job_id], 60), 0)
+
+            queue.complete("w1", first[0].job_id)  # Stale worker cannot finish it
+            queue.fail("w2", reclaimed[0].job_id, reclaimed[0].attempts, "boom")
+            queue.complete("w2", second[0].job_id)
+            self.assertEqual(queue.counts(), {"failed": 1, "done": 1})
+
+
+class FakeProcessor:
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.converted = []
+
+    def discover_jobs(self):
+        return self.jobs
+
+    def iter_jobs(self, jobs):
+        for path, paths in jobs:
+            self.converted.append(path)
+            failed = path.name == "bad.pdf"
+            yield JobResult(path, paths, not failed, error="API error" if failed else None)
+
+    def close(self):
+        pass
+
+
+class TestQueueWorker(unittest.TestCase):
+    def test_worker_drains_queue(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            config = Config(
+                api_key="key",
+                input_path=tmp,
+                command="worker",
+                queue_path=tmp_path / "queue.db",
+                batch_size=2,
+            )
+            processor = FakeProcessor([_job(tmp_path, n) for n in ("a", "b", "c", "bad")])
+            QueueWorker(config, processor).run()
+
+            names = [p.name for p in processor.converted]
+            self.assertEqual(names.count("bad.pdf"), 3)  # Retried up to max_attempts
+            self.assertEqual(sorted(set(names)), ["a.pdf", "b.pdf", "bad.pdf", "c.pdf"])
+            self.assertEqual(JobQueue(config.queue_path).counts(), {"done": 3, "failed": 1})
+            with closing(sqlite3.connect(config.queue_path)) as db:
+                [(error,)] = db.execute("SELECT error FROM jobs WHERE status = 'failed'").fetchall()
+            self.assertEqual(error, "API error")
+
+
+if __name__ == "__main__":
+    unittest.main()
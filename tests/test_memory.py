@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from docs_to_md.api.client import MarkerClient
+from docs_to_md.api.models import StatusEnum
+from docs_to_md.utils.memory import MemoryBudget
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_try_acquire_respects_limit(self):
+        budget = MemoryBudget(100)
+        self.assertTrue(budget.try_acquire(60))
+        self.assertFalse(budget.try_acquire(50))
+        budget.release(60)
+        # Oversized requests are admitted once nothing else is held
+        self.assertTrue(budget.try_acquire(500))
+        self.assertEqual((budget.in_use, budget.peak), (500, 500))
+
+    def test_acquire_waits_for_release(self):
+        budget = MemoryBudget(100)
+        budget.acquire(80)
+        acquired = threading.Event()
+
+        def take():
+            with budget.hold(50):
+                acquired.set()
+
+        thread = threading.Thread(target=take)
+        thread.start()
+        time.sleep(0.05)
+        self.assertFalse(acquired.is_set())
+        budget.release(80)
+        thread.join(timeout=2)
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(budget.in_use, 0)
+
+
+class TestClientDeferral(unittest.TestCase):
+    def _client(self, budget, size):
+        client = MarkerClient("key", budget=budget)
+        response = Mock(status_code=200, headers={"Content-Length": str(size)})
+        response.json.return_value = {"status": "complete", "markdown": "# Done"}
+        client.session = Mock()
+        client.session.get.return_value = response
+        return client, response
+
+    def test_result_is_left_on_server_when_budget_is_full(self):
+        budget = MemoryBudget(1000)
+        budget.acquire(900)
+        client, response = self._client(budget, 100)
+
+        status = client.check_status("req")
+        self.assertEqual(status.status, StatusEnum.PROCESSING)
+        response.close.assert_called_once()
+        response.json.assert_not_called()
+
+        budget.release(900)
+        status = client.check_status("req")
+        self.assertEqual((status.status, status.markdown), (StatusEnum.COMPLETE, "# Done"))
+        self.assertEqual(budget.in_use, 0)
+        self.assertEqual(budget.peak, 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from docs_to_md.core.page_index import index_path, page_span
+from docs_to_md.core.result_handler import ResultSaver
+from docs_to_md.storage.models import ConversionRequest
+
+DELIMITER = "-" * 48
+
+
+class TestPageIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.tmp_dir = self.tmp_path / "temp"
+        self.tmp_dir.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _combine(self, suffix, output_format, results):
+        request = ConversionRequest(
+            request_id="indexed",
+            original_file=self.tmp_path / "input.pdf",
+            target_file=self.tmp_path / f"output{suffix}",
+            output_format=output_format,
+            page_index=True,
+            chunk_size=2,
+            tmp_dir=self.tmp_dir,
+        )
+        saver = ResultSaver()
+        for i, result in enumerate(results):
+            chunk = request.add_chunk(self.tmp_path / f"input_{i}.pdf", i, start_page=2 * i)
+            chunk.get_result_path(self.tmp_dir).write_text(result, encoding="utf-8")
+            chunk.mark_complete()
+            saver.append_ready_chunks(request)
+        output, _ = saver.combine_results(request)
+        return output.read_bytes(), json.loads(index_path(output).read_text())
+
+    def test_paginated_markdown_is_indexed_per_page(self):
+        results = [
+            f"\n\n{{0}}{DELIMITER}\n\n# Café\n\n{{1}}{DELIMITER}\n\n![](images_k/page_1_figure_0.png)",
+            f"{{0}}{DELIMITER}\n\nThird page",
+        ]
+        data, index = self._combine(".md", "markdown", results)
+
+        self.assertEqual([page for page, _, _ in index["pages"]], [0, 1, 2])
+        self.assertEqual(index["size"], len(data))
+        offset, length = page_span(index, 2)
+        self.assertEqual(data[offset:offset + length].decode(), f"{{0}}{DELIMITER}\n\nThird page")
+        offset, length = page_span(index, 0)
+        self.assertIn("# Café".encode(), data[offset:offset + length])
+
+        [(page, offset, ref)] = index["figures"]
+        self.assertEqual((page, ref), (1, "images_k/page_1_figure_0.png"))
+        self.assertTrue(data[offset:].startswith(b"![](images_k/"))
+        self.assertEqual(list(self.tmp_dir.iterdir()), [])
+
+    def test_json_output_is_indexed_per_page(self):
+        results = [
+            json.dumps({"children": [{"id": "/page/0/Page/0"}, {"id": "/page/1/Page/0"}]}),
+            json.dumps({"children": [{"id": "/page/0/Page/0", "children": [{"id": "/page/0/Picture/1"}]}]}),
+        ]
+        data, index = self._combine(".json", "json", results)
+
+        for page, offset, length in index["pages"]:
+            block = json.loads(data[offset:offset + length])
+            self.assertEqual(block["id"], f"/page/{page}/Page/0")
+        [(page, offset, block_id)] = index["figures"]
+        self.assertEqual((page, block_id), (2, "/page/2/Picture/1"))
+        self.assertTrue(data[offset:].startswith(b'{"id":"/page/2/Picture/1"}'))
+
+
+if __name__ == "__main__":
+    unittest.main()
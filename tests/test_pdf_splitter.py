@@ -0,0 +1,39 @@
+import hashlib
+import unittest
+
+from docs_to_md.utils.pdf_splitter import plan_chunk_ranges
+
+
+def _fingerprints(labels):
+    return [hashlib.sha256(label.encode()).hexdigest() for label in labels]
+
+
+class TestPlanChunkRanges(unittest.TestCase):
+    def test_fixed_ranges(self):
+        ranges = plan_chunk_ranges(_fingerprints(str(i) for i in range(7)), 3)
+        self.assertEqual(ranges, [(0, 3), (3, 6), (6, 7)])
+
+    def test_stable_ranges_respect_maximum(self):
+        ranges = plan_chunk_ranges(_fingerprints(str(i) for i in range(200)), 10, True)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 200)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+        self.assertTrue(all(0 < end - start <= 10 for start, end in ranges))
+
+    def test_stable_ranges_survive_page_insertion(self):
+        pages = [str(i) for i in range(200)]
+        edited = pages[:50] + ["new-a", "new-b"] + pages[50:]
+        before = plan_chunk_ranges(_fingerprints(pages), 10, True)
+        after = plan_chunk_ranges(_fingerprints(edited), 10, True)
+
+        def page_groups(labels, ranges):
+            return {tuple(labels[start:end]) for start, end in ranges}
+
+        unchanged = page_groups(pages, before) & page_groups(edited, after)
+        # Only the chunks around the insertion should differ
+        self.assertGreaterEqual(len(unchanged), len(before) - 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import base64
+import io
+import tarfile
+import types
+import unittest
+from unittest import mock
+
+from docs_to_md.api.models import MarkerStatus, StatusEnum
+from docs_to_md.config.settings import Config
+from docs_to_md.core.pipe import PipeConverter, TarImageSink
+
+
+class FakeClient:
+    """Finishes chunks in reverse order, each after a couple of polls."""
+
+    def __init__(self):
+        self.submitted = []
+        self.polls = {}
+        self.params = None
+
+    def submit_data(self, filename, data, **params):
+        self.params = params
+        self.submitted.append(data)
+        return f"req-{len(self.submitted) - 1}"
+
+    def check_status(self, request_id, admit=False):
+        index = int(request_id.split("-")[1])
+        self.polls[index] = self.polls.get(index, 0) + 1
+        if self.polls[index] < len(self.submitted) - index:
+            return MarkerStatus(status=StatusEnum.PROCESSING)
+        return MarkerStatus(
+            status=StatusEnum.COMPLETE,
+            markdown=f"chunk {index} ![](_page_1_Figure_1.jpeg)",
+            images={"_page_1_Figure_1.jpeg": base64.b64encode(b"img").decode()},
+        )
+
+    def close(self):
+        pass
+
+
+def _detect(mime, extension):
+    kind = types.SimpleNamespace(mime=mime, extension=extension)
+    return mock.patch("docs_to_md.core.pipe.filetype.guess", return_value=kind)
+
+
+class TestPipeConverter(unittest.TestCase):
+    def test_streams_chunks_in_page_order_with_tar_images(self):
+        config = Config(api_key="key", input_path="-", chunk_size=2)
+        client = FakeClient()
+        tar_buffer = io.BytesIO()
+        converter = PipeConverter(
+            config, client=client, image_sink=TarImageSink(tar_buffer), check_interval=0
+        )
+        output = io.BytesIO()
+        pieces = [(0, b"c0"), (2, b"c1"), (4, b"c2")]
+        with _detect("application/pdf", "pdf"), mock.patch(
+            "docs_to_md.core.pipe.iter_pdf_chunks_in_memory", return_value=iter(pieces)
+        ):
+            written = converter.convert(io.BytesIO(b"%PDF-1.4 doc"), output)
+        converter.close()
+
+        expected = b"\n\n".join(
+            f"chunk {i} ![](images/page_{2 * i + 1}_figure_1.jpeg)".encode() for i in range(3)
+        )
+        self.assertEqual(output.getvalue(), expected)
+        self.assertEqual(written, len(expected))
+        self.assertEqual(client.submitted, [b"c0", b"c1", b"c2"])
+        self.assertFalse(client.params["disable_image_extraction"])
+
+        tar_buffer.seek(0)
+        with tarfile.open(fileobj=tar_buffer) as tar:
+            self.assertEqual(
+                tar.getnames(),
+                ["images/page_5_figure_1.jpeg", "images/page_3_figure_1.jpeg", "images/page_1_figure_1.jpeg"],
+            )
+
+    def test_without_image_target_images_are_not_requested(self):
+        config = Config(api_key="key", input_path="-")
+        client = FakeClient()
+        converter = PipeConverter(config, client=client, check_interval=0)
+        output = io.BytesIO()
+        docx = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        with _detect(docx, "docx"):
+            converter.convert(io.BytesIO(b"PK\x03\x04 docx"), output)
+        self.assertTrue(client.params["disable_image_extraction"])
+        self.assertEqual(output.getvalue(), b"chunk 0 ![](_page_1_Figure_1.jpeg)")
+
+    def test_next_chunk_is_fetched_when_buffered_chunks_fill_the_budget(self):
+        config = Config(api_key="key", input_path="-", chunk_size=2, memory_budget_mb=1)
+        converter = PipeConverter(config, check_interval=0)
+        converter.client.submit_data = lambda filename, data, **params: f"req-{data.decode()}"
+        texts = {"0": "a" * 400_000, "1": "b" * 200_000}
+        polls = []
+
+        def get(url, **kwargs):
+            index = url.rsplit("-", 1)[1]
+            polls.append(index)
+            # Chunk 1 finishes first and is buffered, filling most of the budget
+            done = index == "1" or polls.count("0") > 1
+            body = {"status": "complete", "markdown": texts[index]} if done else {"status": "processing"}
+            return mock.Mock(
+                status_code=200,
+                headers={"Content-Length": str(len(texts[index]) + 40)},
+                json=mock.Mock(return_value=body),
+            )
+
+        converter.client.session.get = get
+        output = io.BytesIO()
+        with _detect("application/pdf", "pdf"), mock.patch(
+            "docs_to_md.core.pipe.iter_pdf_chunks_in_memory", return_value=iter([(0, b"0"), (2, b"1")])
+        ), mock.patch("docs_to_md.core.pipe.MAX_WAIT_SECONDS", 5):
+            converter.convert(io.BytesIO(b"%PDF-1.4 doc"), output)
+        converter.close()
+
+        self.assertEqual(output.getvalue(), texts["0"].encode() + b"\n\n" + texts["1"].encode())
+        self.assertEqual(converter.budget.in_use, 0)
+
+    def test_stdin_input_validates(self):
+        Config(api_key="key", input_path="-").validate()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import determine_output_paths
+from docs_to_md.core.processor import MarkerProcessor
+
+
+class TestDuplicateCollapsing(unittest.TestCase):
+    def test_identical_files_are_converted_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            files = {
+                "a.pdf": b"%PDF-1.4 same",
+                "b.pdf": b"%PDF-1.4 same",
+                "c.pdf": b"%PDF-1.4 diff",  # Same size, different content
+                "d.pdf": b"%PDF-1.4 other size",
+            }
+            for name, data in files.items():
+                (tmp_path / name).write_bytes(data)
+
+            config = Config(
+                api_key="key",
+                input_path=str(tmp_path),
+                cache_dir=tmp_path / "cache",
+                use_result_store=False,
+            )
+            with mock.patch("docs_to_md.core.processor.MarkerClient"):
+                processor = MarkerProcessor(config)
+            jobs = [
+                (tmp_path / name, determine_output_paths(tmp_path / name, tmp_path / "out", "markdown"))
+                for name in sorted(files)
+            ]
+            kept = processor._collapse_duplicates(jobs)
+            processor.cache.close()
+
+            self.assertEqual([p.name for p, _ in kept], ["a.pdf", "c.pdf", "d.pdf"])
+            duplicates = processor._duplicates[tmp_path / "a.pdf"]
+            self.assertEqual([d.source_file.name for d in duplicates], ["b.pdf"])
+            self.assertEqual(duplicates[0].target_file, jobs[1][1].markdown_path)
+
+
+class TestStoredResultBundling(unittest.TestCase):
+    def test_bundling_failure_on_store_hit_keeps_loose_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "a.pdf"
+            source.write_bytes(b"%PDF-1.4 a")
+            stored = tmp_path / "stored.md"
+            stored.write_text("# Stored\n")
+
+            config = Config(
+                api_key="key",
+                input_path=str(source),
+                cache_dir=tmp_path / "cache",
+                result_store_dir=tmp_path / "results",
+                use_result_store=True,
+                bundle="zip",
+            )
+            with mock.patch("docs_to_md.core.processor.MarkerClient"):
+                processor = MarkerProcessor(config)
+            key = "ab" * 32
+            processor.result_store.put(key, stored)
+            output_paths = determine_output_paths(source, tmp_path / "out", "markdown")
+            try:
+                with mock.patch("docs_to_md.core.bundle.BundleWriter.close", side_effect=OSError("disk full")):
+                    self.assertTrue(processor._restore_stored_result(source, output_paths, key))
+            finally:
+                processor.cache.close()
+
+            self.assertEqual(output_paths.markdown_path.read_text(), "# Stored\n")
+            self.assertFalse(output_paths.markdown_path.with_suffix(".zip").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
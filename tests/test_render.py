@@ -0,0 +1,93 @@
+import base64
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from docs_to_md.core.render import (
+    html_to_markdown,
+    new_render_pool,
+    render_file,
+    rendered_path,
+    submit_renders,
+    wait_for_renders,
+)
+
+DOCUMENT = {
+    "children": [
+        {
+            "id": "/page/0/Page/0",
+            "block_type": "Page",
+            "html": "<content-ref src='/page/0/PageHeader/0'></content-ref>"
+                    "<content-ref src='/page/0/SectionHeader/1'></content-ref>"
+                    "<content-ref src='/page/0/Text/2'></content-ref>",
+            "children": [
+                {"id": "/page/0/PageHeader/0", "block_type": "PageHeader", "html": "<p>Running head</p>"},
+                {"id": "/page/0/SectionHeader/1", "block_type": "SectionHeader", "html": "<h1>Intro</h1>"},
+                {"id": "/page/0/Text/2", "block_type": "Text", "html": "<p>Some <b>bold</b> text.</p>"},
+            ],
+        },
+        {
+            "id": "/page/1/Page/0",
+            "block_type": "Page",
+            "html": "",
+            "children": [
+                {"id": "/page/1/Picture/1", "block_type": "Picture", "html": "",
+                 "images": {"/page/1/Picture/1": base64.b64encode(b"\x89PNG data").decode()}},
+                {"id": "/page/1/ListGroup/2", "block_type": "ListGroup",
+                 "html": "<content-ref src='/page/1/ListItem/3'></content-ref>",
+                 "children": [{"id": "/page/1/ListItem/3", "block_type": "ListItem", "html": "<li>one</li>"}]},
+            ],
+        },
+    ],
+    "block_type": "Document",
+}
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.json_path = self.tmp_path / "doc_k.json"
+        self.json_path.write_text(json.dumps(DOCUMENT))
+        self.images_dir = self.tmp_path / "images_k"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_renders_markdown_and_html_page_by_page(self):
+        markdown = rendered_path(self.json_path, "markdown")
+        render_file(self.json_path, "markdown", markdown, self.images_dir)
+        self.assertEqual(
+            markdown.read_text(),
+            "# Intro\n\nSome **bold** text.\n\n![](images_k/page_1_picture_1.png)\n\n- one\n",
+        )
+        self.assertEqual((self.images_dir / "page_1_picture_1.png").read_bytes(), b"\x89PNG data")
+
+        html = rendered_path(self.json_path, "html")
+        render_file(self.json_path, "html", html, self.images_dir)
+        content = html.read_text()
+        self.assertIn("<div class='page' data-page-id='1'><img src='images_k/page_1_picture_1.png'/>", content)
+        self.assertIn("<p>Running head</p><h1>Intro</h1>", content)
+        self.assertNotIn("content-ref", content)
+
+    def test_formats_render_in_parallel_processes(self):
+        pool = new_render_pool(2)
+        try:
+            renders = submit_renders(pool, self.json_path, self.images_dir, ["markdown", "html"])
+            wait_for_renders(renders)
+        finally:
+            pool.shutdown()
+        self.assertEqual(sorted(p.name for p in self.tmp_path.iterdir()),
+                         ["doc_k.html", "doc_k.json", "doc_k.md", "images_k"])
+
+    def test_html_to_markdown(self):
+        self.assertEqual(
+            html_to_markdown("<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>x|y</td></tr></table>"),
+            "| a | b |\n|---|---|\n| 1 | x\\|y |",
+        )
+        self.assertEqual(html_to_markdown("<p><a href='u'>link</a> <math>x^2</math></p>"), "[link](u) $x^2$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import base64
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.processor import MarkerProcessor
+
+RESPONSE = json.dumps({
+    "status": "complete",
+    "success": True,
+    "markdown": "# Title\n\n![](fig.png)\n",
+    "images": {"fig.png": base64.b64encode(b"\x89PNG figure").decode()},
+    "page_count": 1,
+}).encode()
+
+
+class FakeResponse:
+    status_code = 200
+
+    def iter_content(self, block_size):
+        return iter([RESPONSE[i:i + 16] for i in range(0, len(RESPONSE), 16)])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestReplay(unittest.TestCase):
+    def _config(self, tmp_path, output_dir, **options):
+        return Config(
+            input_path=str(tmp_path / "docs"),
+            cache_dir=tmp_path / "cache",
+            root_tmp_dir=tmp_path / "tmp",
+            response_archive_dir=tmp_path / "responses",
+            output_dir=tmp_path / output_dir,
+            use_result_store=False,
+            **options,
+        )
+
+    def test_archived_responses_rebuild_outputs_without_the_api(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            (tmp_path / "docs").mkdir()
+            (tmp_path / "docs" / "a.docx").write_bytes(b"PK\x03\x04 a.docx")
+
+            processor = MarkerProcessor(self._config(tmp_path, "live", api_key="key", archive_responses=True))
+            processor.client.submit_file = lambda path, **kwargs: "req-1"
+            processor.client.session.get = lambda *args, **kwargs: FakeResponse()
+            processor.process()
+            self.assertEqual(len(list((tmp_path / "responses" / "documents").rglob("*.json"))), 1)
+
+            with mock.patch("docs_to_md.core.processor.MarkerClient", side_effect=AssertionError("API used")):
+                MarkerProcessor(self._config(tmp_path, "replayed", api_key="", replay=True)).process()
+
+            for output_dir in ("live", "replayed"):
+                [output] = (tmp_path / output_dir).glob("a_*.md")
+                [image] = (tmp_path / output_dir).glob("images_*/*")
+                self.assertEqual(image.read_bytes(), b"\x89PNG figure")
+                self.assertEqual(output.read_text(), f"# Title\n\n![]({image.parent.name}/{image.name})\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
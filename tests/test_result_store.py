@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md.api.models import ApiParams
+from docs_to_md.core.result_handler import ResultSaver
+from docs_to_md.storage.result_store import ResultStore
+from docs_to_md.utils.file_utils import compute_file_hash
+
+
+class TestResultStore(unittest.TestCase):
+    def _make_output(self, base: Path, name: str, images_dir_name: str) -> Path:
+        output = base / f"{name}.md"
+        output.write_text(f"# {name}\n\n![]({images_dir_name}/page_1_figure_1.jpg)")
+        images = base / images_dir_name
+        images.mkdir()
+        (images / "page_1_figure_1.jpg").write_bytes(b"img")
+        return output
+
+    def test_key_depends_on_content_and_options(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            a = tmp_path / "a.pdf"
+            b = tmp_path / "b.pdf"
+            a.write_bytes(b"same")
+            b.write_bytes(b"same")
+            params = ApiParams()
+            key_a = ResultStore.make_key(compute_file_hash(a), params, 25)
+            key_b = ResultStore.make_key(compute_file_hash(b), params, 25)
+            self.assertEqual(key_a, key_b)
+            self.assertNotEqual(
+                key_a, ResultStore.make_key(compute_file_hash(a), ApiParams(use_llm=True), 25)
+            )
+
+    def test_put_and_replicate_rewrites_image_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            store = ResultStore(tmp_path / "store", max_bytes=1024 * 1024)
+            output = self._make_output(tmp_path, "doc_old", "images_old")
+            entry = store.put("k" * 64, output, tmp_path / "images_old")
+            self.assertIsNotNone(entry)
+
+            hit = store.get("k" * 64)
+            target = tmp_path / "out" / "doc_new.md"
+            ResultSaver().replicate_output(
+                store.output_path(hit),
+                store.images_path(hit),
+                hit.images_dir_name,
+                target,
+                tmp_path / "out" / "images_new",
+                link_images=False,
+            )
+            self.assertIn("](images_new/page_1_figure_1.jpg)", target.read_text())
+            image = tmp_path / "out" / "images_new" / "page_1_figure_1.jpg"
+            self.assertTrue(image.exists())
+
+            # Neither the original nor the replicated images share files with the store
+            (tmp_path / "images_old" / "page_1_figure_1.jpg").write_bytes(b"edited")
+            image.write_bytes(b"edited")
+            self.assertEqual((store.images_path(hit) / "page_1_figure_1.jpg").read_bytes(), b"img")
+
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            first = tmp_path / "first.md"
+            first.write_text("x" * 60)
+            second = tmp_path / "second.md"
+            second.write_text("y" * 60)
+            store = ResultStore(tmp_path / "store", max_bytes=100)
+
+            store.put("a" * 64, first)
+            store.put("b" * 64, second)
+
+            self.assertIsNone(store.get("a" * 64))
+            self.assertIsNotNone(store.get("b" * 64))
+
+    def test_store_is_scanned_only_to_evict(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            output = tmp_path / "doc.md"
+            output.write_text("x" * 10)
+            store = ResultStore(tmp_path / "store", max_bytes=100)
+
+            with mock.patch.object(store, "_all_entries", wraps=store._all_entries) as scans:
+                for i in range(9):
+                    store.put(f"{i}" * 64, output)
+                self.assertEqual(scans.call_count, 1)  # Counted once on the first put
+
+                store.put("9" * 64, output)
+                store.put("a" * 64, output)  # Over the limit: evicts down to 90 bytes
+                self.assertEqual(scans.call_count, 2)
+            self.assertIsNone(store.get("0" * 64))
+            self.assertIsNone(store.get("1" * 64))
+            self.assertIsNotNone(store.get("2" * 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
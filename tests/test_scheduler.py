@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from docs_to_md.core.scheduler import INTERACTIVE, FairScheduler, order_jobs
+
+
+class TestFairScheduler(unittest.TestCase):
+    def test_small_tenant_is_not_starved_by_backlog(self):
+        scheduler = FairScheduler()
+        for i in range(1000):
+            scheduler.push(f"bulk-{i}", tenant="backfill", cost=10)
+        scheduler.push("report", tenant="team-b", cost=10)
+
+        order = scheduler.pop_many(3)
+        self.assertIn("report", order)
+
+    def test_weights_share_capacity(self):
+        scheduler = FairScheduler(weights={"a": 3})
+        for i in range(40):
+            scheduler.push(("a", i), tenant="a", cost=1)
+            scheduler.push(("b", i), tenant="b", cost=1)
+
+        first = scheduler.pop_many(20)
+        served_a = sum(1 for tenant, _ in first if tenant == "a")
+        self.assertEqual(served_a, 15)
+
+    def test_interactive_lane_goes_first(self):
+        scheduler = FairScheduler()
+        scheduler.push("bulk", tenant="a")
+        scheduler.push("click", tenant="b", priority=INTERACTIVE)
+        self.assertEqual(scheduler.pop_many(5), ["click", "bulk"])
+        self.assertIsNone(scheduler.pop())
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            FairScheduler(weights={"a": 0})
+        with self.assertRaises(ValueError):
+            FairScheduler().push("x", priority="urgent")
+
+
+class TestOrderJobs(unittest.TestCase):
+    def test_policies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            page_counts = {}
+            for name, pages in (("big", 30), ("small", 2), ("mid", 10)):
+                path = tmp_path / f"{name}.pdf"
+                path.write_bytes(b"%PDF-1.4")
+                page_counts[path] = pages
+            big, small, mid = page_counts
+            os.utime(big, (1000, 1000))
+            os.utime(small, (3000, 3000))
+            os.utime(mid, (2000, 2000))
+            jobs = [(big, "b"), (small, "s"), (mid, "m")]
+
+            def names(*args, **kwargs):
+                return [payload for _, payload in order_jobs(jobs, *args, **kwargs)]
+
+            with mock.patch(
+                "docs_to_md.core.scheduler.count_pdf_pages", side_effect=page_counts.get
+            ):
+                self.assertEqual(names("input"), ["b", "s", "m"])
+                self.assertEqual(names("smallest"), ["s", "m", "b"])
+                self.assertEqual(names("largest"), ["b", "m", "s"])
+                # max_pages caps the estimate; ties keep discovery order
+                self.assertEqual(names("smallest", max_pages=5), ["s", "b", "m"])
+            self.assertEqual(names("deadline"), ["b", "m", "s"])
+            self.assertEqual(names("deadline", deadlines={small: 0}), ["s", "b", "m"])
+            with self.assertRaises(ValueError):
+                order_jobs(jobs, "random")
+
+
+if __name__ == "__main__":
+    unittest.main()
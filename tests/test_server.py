@@ -0,0 +1,153 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import determine_output_paths
+from docs_to_md.core.processor import JobResult
+from docs_to_md.core.server import JobManager, create_server
+from docs_to_md.utils.exceptions import ConfigurationError
+
+
+class FakeProcessor:
+    """Converts each file on its first poll, except files held back by the test."""
+
+    def __init__(self):
+        self.calls = []
+        self.held = set()  # Input names still processing on the API
+        self.closed = False
+
+    def jobs_for_files(self, files, config):
+        return [(f, determine_output_paths(f, config.output_dir, config.output_format)) for f in files]
+
+    def start_jobs(self, jobs, config):
+        self.calls.append(([file_path for file_path, _ in jobs], config))
+        return [], {f"req-{file_path.name}": [(file_path, paths)] for file_path, paths in jobs}
+
+    def poll_requests(self, requests, config, status_checks=None):
+        for request_id, jobs in requests.items():
+            for file_path, paths in jobs:
+                if file_path.name in self.held:
+                    continue
+                paths.markdown_path.write_text(f"# {file_path.name}")
+                yield JobResult(file_path, paths, True, request_id=request_id)
+
+    def close(self):
+        self.closed = True
+
+
+class TestJobServer(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        config = Config(
+            api_key="key",
+            input_path="",
+            command="serve",
+            root_tmp_dir=self.tmp_path / "tmp",
+        )
+        self.processor = FakeProcessor()
+        self.manager = JobManager(config, self.processor, poll_interval=0.01)
+        self.server = create_server(self.manager, "127.0.0.1", 0)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.manager.start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.stop()
+        self._tmp.cleanup()
+
+    def _request(self, path, data=None, content_type=None):
+        request = urllib.request.Request(self.base_url + path, data=data)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read()
+
+    def _wait_done(self, job_id):
+        for _ in range(100):
+            _, body = self._request(f"/jobs/{job_id}")
+            job = json.loads(body)
+            if job["status"] in ("complete", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_path_job_round_trip(self):
+        source = self.tmp_path / "doc.pdf"
+        source.write_bytes(b"%PDF-1.4")
+        payload = json.dumps({"path": str(source), "options": {"use_llm": True}}).encode()
+        status, body = self._request("/jobs", payload, "application/json")
+        self.assertEqual(status, 202)
+
+        job = self._wait_done(json.loads(body)["job_id"])
+        self.assertEqual(job["status"], "complete")
+        self.assertTrue(self.processor.calls[0][1].use_llm)
+
+        status, output = self._request(f"/jobs/{job['job_id']}/output")
+        self.assertEqual(output.decode(), "# doc.pdf")
+
+    def test_upload_job(self):
+        status, body = self._request(
+            "/jobs?filename=up.pdf&paginate=true", b"%PDF-1.4", "application/pdf"
+        )
+        job = self._wait_done(json.loads(body)["job_id"])
+        self.assertEqual(job["status"], "complete")
+        self.assertTrue(self.processor.calls[0][1].paginate)
+        self.assertTrue(Path(job["input"]).is_relative_to(self.tmp_path / "tmp" / "uploads"))
+        self.assertFalse(Path(job["input"]).exists())  # The upload is deleted once the job is done
+        self.assertTrue(Path(job["output_file"]).exists())
+
+        status, output = self._request(f"/jobs/{job['job_id']}/output")
+        self.assertEqual(output.decode(), "# up.pdf")
+        self.assertFalse(Path(job["output_file"]).parent.exists())  # Deleted once fetched
+
+    def test_unfetched_upload_outputs_expire(self):
+        self.manager.upload_retention = 0
+        first = self.manager.submit_upload("first.pdf", b"%PDF-1.4", {})
+        job = self._wait_done(first.job_id)
+        upload_dir = Path(job["output_file"]).parent
+        self.assertTrue(upload_dir.exists())
+
+        time.sleep(0.01)
+        self.manager.submit_upload("second.pdf", b"%PDF-1.4", {})
+        self.assertFalse(upload_dir.exists())
+
+    def test_jobs_finish_while_an_earlier_job_is_still_processing(self):
+        slow, fast = self.tmp_path / "slow.pdf", self.tmp_path / "fast.pdf"
+        slow.write_bytes(b"%PDF-1.4")
+        fast.write_bytes(b"%PDF-1.4")
+        self.processor.held.add("slow.pdf")
+        slow_job = self.manager.submit(slow, {})
+        fast_job = self.manager.submit(fast, {"paginate": True}, priority="interactive")
+
+        job = self._wait_done(fast_job.job_id)
+        self.assertEqual(job["status"], "complete")
+        self.assertEqual(self.manager.get(slow_job.job_id).status, "processing")  # Not failed
+
+        self.processor.held.clear()
+        self.assertEqual(self._wait_done(slow_job.job_id)["status"], "complete")
+
+    def test_invalid_requests_are_rejected(self):
+        source = self.tmp_path / "doc.pdf"
+        source.write_bytes(b"%PDF-1.4")
+        with self.assertRaises(ConfigurationError):
+            self.manager.submit(source, {"api_key": "other"})
+        payload = json.dumps({"path": str(self.tmp_path / "missing.pdf")}).encode()
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._request("/jobs", payload, "application/json")
+        self.assertEqual(ctx.exception.code, 400)
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._request("/jobs/abc123")
+        self.assertEqual(ctx.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,18 @@ class TestSettings(unittest.TestCase):
             )
             cfg.validate()
 
+    def test_render_formats_need_json_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            test_file = Path(tmp) / "input.pdf"
+            test_file.write_text("data")
+            for output_format, formats in (("markdown", ["html"]), ("json", ["docx"])):
+                cfg = Config(api_key="key", input_path=str(test_file),
+                             output_format=output_format, render_formats=formats)
+                with self.assertRaises(ConfigurationError):
+                    cfg.validate()
+            Config(api_key="key", input_path=str(test_file),
+                   output_format="json", render_formats=["markdown", "html"]).validate()
+
     def test_config_missing_api_key(self):
         with tempfile.TemporaryDirectory() as tmp:
             tmp_path = Path(tmp)
@@ -0,0 +1,103 @@
+import base64
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from docs_to_md.api.models import StatusEnum
+from docs_to_md.api.stream import StatusSink, parse_status_stream
+from docs_to_md.config.settings import Config
+from docs_to_md.core.result_handler import ResultHandler
+from docs_to_md.storage.models import ConversionRequest
+
+
+def _blocks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+class TestParseStatusStream(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.sink = StatusSink(self.tmp_path / "content", lambda name: self.tmp_path / f"img_{name}")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_streams_content_and_images_to_files(self):
+        markdown = 'Caf\u00e9 "quoted" \\ back\nslash \U0001F600 ![](_page_1_Figure_0.png)\t</end>'
+        image = bytes(range(256)) * 3
+        response = json.dumps({
+            "status": "complete",
+            "markdown": markdown,
+            "images": {"_page_1_Figure_0.png": base64.b64encode(image).decode(), "broken.png": "abc"},
+            "meta": {"pages": [1, {"x": "}]"}]},
+            "success": True,
+            "page_count": 7,
+            "json": None,
+        }).replace("/", "\\/").encode()  # The API may escape slashes
+
+        for block_size in (1, 3, 4096):
+            status = parse_status_stream(_blocks(response, block_size), self.sink)
+            self.assertEqual(status.status, StatusEnum.COMPLETE)
+            self.assertEqual((status.page_count, status.success, status.markdown), (7, True, None))
+            self.assertEqual(status.meta, {"pages": [1, {"x": "}]"}]})
+            self.assertEqual(self.sink.content_key, "markdown")
+            self.assertEqual((self.tmp_path / "content").read_text(encoding="utf-8"), markdown)
+            self.assertEqual(self.sink.images["_page_1_Figure_0.png"].read_bytes(), image)
+            self.assertIn("broken.png", self.sink.image_errors)
+            self.assertFalse((self.tmp_path / "img_broken.png").exists())
+            self.sink.discard()
+
+    def test_json_content_is_copied_verbatim(self):
+        tree = {"children": [{"id": "/page/0", "html": "<p>a \"b\" \\u00e9</p>", "n": -1.5e3}], "x": None}
+        response = b'{"status": "complete", "json": ' + json.dumps(tree).encode() + b"}"
+        parse_status_stream(_blocks(response, 5), self.sink)
+        self.assertEqual(self.sink.content_key, "json")
+        self.assertEqual(json.loads((self.tmp_path / "content").read_text()), tree)
+
+    def test_truncated_response_raises(self):
+        response = json.dumps({"status": "complete", "markdown": "abc" * 100}).encode()
+        with self.assertRaises(ValueError):
+            parse_status_stream(_blocks(response[:-20], 16), self.sink)
+
+
+class TestStreamedChunkResult(unittest.TestCase):
+    def test_streamed_result_is_saved_with_rewritten_refs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            request = ConversionRequest(
+                request_id="streamed",
+                original_file=tmp_path / "input.pdf",
+                target_file=tmp_path / "output.md",
+                chunk_size=10,
+                tmp_dir=tmp_path / "temp",
+                images_dir=tmp_path / "images_k",
+            )
+            request.tmp_dir.mkdir()
+            chunk = request.add_chunk(tmp_path / "input_1.pdf", 1, start_page=10)
+            handler = ResultHandler(Mock(), Mock(), Config(api_key="key", input_path=""))
+            sink = handler._chunk_sink(chunk, request)
+            response = json.dumps({
+                "status": "complete",
+                "markdown": "line 1\n![](_page_2_Figure_0.png)\n",
+                "images": {"_page_2_Figure_0.png": base64.b64encode(b"png").decode()},
+                "page_count": 10,
+            }).encode()
+
+            status = parse_status_stream(_blocks(response, 7), sink)
+            handler._save_streamed_chunk_result(chunk, status, sink, request)
+            handler._wait_for_images(request.request_id)  # Decoded on the image pool
+
+            self.assertEqual(
+                chunk.get_result_path(request.tmp_dir).read_text(),
+                "line 1\n![](images_k/page_12_figure_0.png)\n",
+            )
+            self.assertEqual((request.tmp_dir / "images" / "page_12_figure_0.png").read_bytes(), b"png")
+            self.assertEqual(chunk.page_count, 10)
+            self.assertFalse(sink.content_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
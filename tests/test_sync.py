@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from docs_to_md.core.sync import DirectorySync
+from docs_to_md.storage.manifest import SyncManifest
+
+
+class TestDirectorySync(unittest.TestCase):
+    def _sync(self, tmp_path: Path, input_dir: Path) -> DirectorySync:
+        manifest = SyncManifest(tmp_path / "manifests", input_dir, None, "markdown")
+        return DirectorySync(manifest, None, "markdown")
+
+    def _convert(self, sync: DirectorySync, plan) -> None:
+        for source, output_paths in plan.jobs:
+            output_paths.markdown_path.write_text("converted")
+            sync.record_converted(source)
+        sync.save()
+
+    def test_only_new_or_changed_files_are_planned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "in"
+            input_dir.mkdir()
+            (input_dir / "a.pdf").write_bytes(b"%PDF-1.4 a")
+            (input_dir / "b.pdf").write_bytes(b"%PDF-1.4 b")
+
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self.assertEqual(len(plan.jobs), 2)
+            self._convert(sync, plan)
+            outputs = {source.name: paths.markdown_path for source, paths in plan.jobs}
+
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self.assertEqual(plan.jobs, [])
+            self.assertEqual(plan.unchanged, 2)
+
+            (input_dir / "b.pdf").write_bytes(b"%PDF-1.4 b changed")
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self.assertEqual([source.name for source, _ in plan.jobs], ["b.pdf"])
+            # Changed files keep their output path
+            self.assertEqual(plan.jobs[0][1].markdown_path, outputs["b.pdf"])
+
+    def test_changed_file_keeps_old_outputs_until_reconverted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "in"
+            input_dir.mkdir()
+            (input_dir / "a.pdf").write_bytes(b"%PDF-1.4 a")
+
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self._convert(sync, plan)
+            output_paths = plan.jobs[0][1]
+            output_paths.images_dir.mkdir()
+            (output_paths.images_dir / "page_0.png").write_bytes(b"old 0")
+            (output_paths.images_dir / "page_1.png").write_bytes(b"old 1")
+
+            (input_dir / "a.pdf").write_bytes(b"%PDF-1.4 a changed")
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            sync.save()  # A run that fails to convert the file
+            self.assertEqual(output_paths.markdown_path.read_text(), "converted")
+            self.assertEqual(len(list(output_paths.images_dir.iterdir())), 2)
+
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self.assertEqual(len(plan.jobs), 1)  # Still recorded as changed
+            new_image = tmp_path / "page_0.png"
+            new_image.write_bytes(b"new 0")
+            os.replace(new_image, output_paths.images_dir / "page_0.png")
+            self._convert(sync, plan)
+
+            self.assertEqual([p.name for p in output_paths.images_dir.iterdir()], ["page_0.png"])
+            self.assertEqual((output_paths.images_dir / "page_0.png").read_bytes(), b"new 0")
+            self.assertEqual(output_paths.markdown_path.read_text(), "converted")
+
+    def test_outputs_of_deleted_sources_are_removed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "in"
+            input_dir.mkdir()
+            (input_dir / "a.pdf").write_bytes(b"%PDF-1.4 a")
+
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self._convert(sync, plan)
+            output_file = plan.jobs[0][1].markdown_path
+            self.assertTrue(output_file.exists())
+
+            (input_dir / "a.pdf").unlink()
+            sync = self._sync(tmp_path, input_dir)
+            plan = sync.plan(input_dir)
+            self.assertEqual(plan.removed, 1)
+            self.assertFalse(output_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,26 @@
+import base64
+import errno
+import json
+import os
+import shutil
+from contextlib import ExitStack
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
-from docs_to_md.utils.file_utils import get_unique_filename
-from docs_to_md.core.result_handler import ResultSaver
+from docs_to_md.api.models import MarkerStatus, StatusEnum
+from docs_to_md.config.settings import Config
+from docs_to_md.utils.file_utils import append_file, decode_base64_to_file, get_unique_filename
+from docs_to_md.utils.image_dedup import ImageDeduplicator
+from docs_to_md.utils.memory import MemoryBudget
+from docs_to_md.core.result_handler import (
+    ResultHandler,
+    ResultSaver,
+    _replace_in_file,
+    rewrite_image_refs,
+    rewrite_image_refs_in_file,
+)
 from docs_to_md.storage.models import ConversionRequest, Status
 
 
@@ -20,6 +36,35 @@ class TestFileUtils(unittest.TestCase):
             self.assertTrue(new_path.stem.startswith("file_"))
             self.assertEqual(new_path.suffix, ".txt")
 
+    def test_append_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            src = tmp_path / "chunk.out"
+            src.write_bytes("héllo ".encode("utf-8") * 50000)
+            no_kernel_copy = OSError(errno.EXDEV, "cross-device")
+            for kernel_copy in (True, False):
+                dst = tmp_path / "out.md"
+                with open(dst, "wb", buffering=0) as out, ExitStack() as stack:
+                    if not kernel_copy:
+                        for name in ("copy_file_range", "sendfile"):
+                            stack.enter_context(patch.object(os, name, Mock(side_effect=no_kernel_copy)))
+                    out.write(b"head")
+                    copied = append_file(src, out.fileno())
+                    out.write(b"tail")
+                self.assertEqual(copied, src.stat().st_size)
+                self.assertEqual(dst.read_bytes(), b"head" + src.read_bytes() + b"tail")
+
+    def test_decode_base64_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "image.png"
+            data = bytes(range(256)) * 40
+            encoded = base64.encodebytes(data).decode()  # Wrapped at 76 characters
+            self.assertEqual(decode_base64_to_file(encoded, path, block_size=100), len(data))
+            self.assertEqual(path.read_bytes(), data)
+            with self.assertRaises(ValueError):
+                decode_base64_to_file("abcde", path, block_size=4)
+            self.assertFalse(path.exists())
+
 
 class TestImageDirectoryCreation(unittest.TestCase):
     def setUp(self):
@@ -114,5 +159,258 @@ class TestImageDirectoryCreation(unittest.TestCase):
                           f"Images directory {images_dir} should be created when images exist")
 
 
+class TestStreamingAssembly(unittest.TestCase):
+    def test_chunks_are_appended_in_order_as_they_complete(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            tmp_dir = tmp_path / "temp"
+            tmp_dir.mkdir()
+            request = ConversionRequest(
+                request_id="streamed",
+                original_file=tmp_path / "input.pdf",
+                target_file=tmp_path / "output.md",
+                chunk_size=1,
+                tmp_dir=tmp_dir,
+            )
+            chunks = [request.add_chunk(tmp_path / f"input_{i}.pdf", i) for i in range(3)]
+            saver = ResultSaver()
+
+            def finish(i):
+                chunks[i].get_result_path(tmp_dir).write_text(f"chunk {i}")
+                chunks[i].mark_complete()
+                return saver.append_ready_chunks(request)
+
+            partial = tmp_path / "output.md.partial"
+            self.assertEqual(finish(1), 0)  # Waits for chunk 0
+            self.assertFalse(partial.exists())
+            self.assertEqual(finish(0), 2)
+            self.assertEqual(partial.read_text(), "chunk 0\n\nchunk 1")
+            self.assertFalse(request.target_file.exists())  # Only complete documents appear there
+            self.assertEqual(list(tmp_dir.iterdir()), [])
+
+            with open(partial, "ab") as f:
+                f.write(b"half-written")  # Interrupted append from an earlier run
+            chunks[2].get_result_path(tmp_dir).write_text("chunk 2")
+            chunks[2].mark_complete()
+            result_file, size = saver.combine_results(request)
+
+            self.assertEqual(result_file.read_text(), "chunk 0\n\nchunk 1\n\nchunk 2")
+            self.assertEqual(size, result_file.stat().st_size)
+            self.assertFalse(partial.exists())
+
+    def test_json_chunks_merge_into_one_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            tmp_dir = tmp_path / "temp"
+            tmp_dir.mkdir()
+            request = ConversionRequest(
+                request_id="json",
+                original_file=tmp_path / "input.pdf",
+                target_file=tmp_path / "output.json",
+                output_format="json",
+                chunk_size=2,
+                tmp_dir=tmp_dir,
+            )
+            chunks = [request.add_chunk(tmp_path / f"input_{i}.pdf", i, start_page=2 * i) for i in range(3)]
+            trees = [
+                {
+                    "block_type": "Document",
+                    "children": [
+                        {"id": f"/page/{p}/Page/0", "html": f"<content-ref src='/page/{p}/Text/1'>"}
+                        for p in range(2)
+                    ],
+                    "metadata": {"page_stats": [{"page_id": 0}, {"page_id": 1}]},
+                },
+                {"block_type": "Document", "children": [], "metadata": {"page_stats": []}},
+                {"block_type": "Document", "children": [{"id": "/page/0/Page/0"}],
+                 "metadata": {"page_stats": [{"page_id": 0}]}},
+            ]
+            budget = MemoryBudget(1024 * 1024)
+            saver = ResultSaver(budget)
+            for chunk, tree in zip(chunks, trees):
+                chunk.get_result_path(tmp_dir).write_text(json.dumps(tree, indent=2))
+                chunk.mark_complete()
+                saver.append_ready_chunks(request)
+
+            result_file, size = saver.combine_results(request)
+
+            merged = json.loads(result_file.read_text())
+            self.assertEqual(
+                [child["id"] for child in merged["children"]],
+                ["/page/0/Page/0", "/page/1/Page/0", "/page/4/Page/0"],
+            )
+            self.assertEqual(merged["children"][1]["html"], "<content-ref src='/page/1/Text/1'>")
+            self.assertEqual([s["page_id"] for s in merged["metadata"]["page_stats"]], [0, 1, 4])
+            self.assertEqual(merged["block_type"], "Document")
+            self.assertGreater(budget.peak, 0)  # Each chunk's tree is held while it is merged
+            self.assertEqual(budget.in_use, 0)
+            self.assertNotIn(b"\n", result_file.read_bytes())  # Compact
+            self.assertEqual(size, result_file.stat().st_size)
+            self.assertEqual(list(tmp_dir.iterdir()), [])
+
+    def test_images_are_renamed_into_place(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "temp" / "images"
+            source.mkdir(parents=True)
+            (source / "page_1_figure_1.png").write_bytes(b"png")
+            inode = (source / "page_1_figure_1.png").stat().st_ino
+            target = tmp_path / "out" / "images_k"
+            target.mkdir(parents=True)  # combine_results creates it empty
+
+            ResultSaver().move_images(source, target)
+
+            self.assertEqual((target / "page_1_figure_1.png").stat().st_ino, inode)
+            self.assertFalse(source.exists())
+
+            # Across devices the images are copied instead
+            source.mkdir()
+            (source / "page_2_figure_1.png").write_bytes(b"png2")
+            with patch("docs_to_md.utils.file_utils.os.replace", side_effect=OSError(errno.EXDEV, "cross-device")):
+                ResultSaver().move_images(source, target)
+            self.assertEqual(sorted(p.name for p in target.iterdir()), ["page_1_figure_1.png", "page_2_figure_1.png"])
+
+
+class TestChunkImages(unittest.TestCase):
+    def test_images_are_written_in_the_background(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            request = ConversionRequest(
+                request_id="with-images",
+                original_file=tmp_path / "input.pdf",
+                target_file=tmp_path / "output.md",
+                chunk_size=10,
+                tmp_dir=tmp_path / "temp",
+                images_dir=tmp_path / "images_k",
+            )
+            chunk = request.add_chunk(tmp_path / "input_0.pdf", 0, start_page=0)
+            status = MarkerStatus(
+                status=StatusEnum.COMPLETE,
+                markdown="![](_page_1_Figure_0.png) ![](_page_2_Figure_0.png)",
+                images={
+                    "_page_1_Figure_0.png": base64.b64encode(b"png data").decode(),
+                    "_page_2_Figure_0.png": "not base64!",
+                },
+            )
+            handler = ResultHandler(Mock(), Mock(), Config(api_key="key", input_path=""))
+
+            with self.assertLogs("docs_to_md.core.result_handler", "ERROR") as logs:
+                handler._save_chunk_result(chunk, status, request)
+                handler._wait_for_images(request.request_id)
+
+            images = tmp_path / "temp" / "images"
+            self.assertEqual((images / "page_1_figure_0.png").read_bytes(), b"png data")
+            self.assertFalse((images / "page_2_figure_0.png").exists())
+            self.assertIn("_page_2_Figure_0.png", logs.output[0])
+            self.assertEqual(
+                chunk.get_result_path(request.tmp_dir).read_text(),
+                "![](images_k/page_1_figure_0.png) ![](images_k/page_2_figure_0.png)",
+            )
+            handler._close_image_pool()
+
+
+class TestRewriteImageRefs(unittest.TestCase):
+    def test_rewrites_markdown_html_and_json_refs(self):
+        image_map = {
+            "_page_1_Figure_0.jpeg": "images_k/page_1_figure_0.jpeg",
+            "_page_1_Figure_1.png": "images_k/page_1_figure_1.png",
+        }
+        content = (
+            '![](_page_1_Figure_0.jpeg) and ![x](_page_1_Figure_1.png "title")\n'
+            '<img src="_page_1_Figure_1.png"/> <img src=\'_page_1_Figure_0.jpeg\'>\n'
+            '{"html": "<img src=\\"_page_1_Figure_0.jpeg\\"/>", "images": {"_page_1_Figure_1.png": "iVBOR+/="}}\n'
+            '![](_page_1_Figure_0.jpeg.bak) "unrelated" ](other.png)'
+        )
+        self.assertEqual(
+            rewrite_image_refs(content, image_map),
+            '![](images_k/page_1_figure_0.jpeg) and ![x](images_k/page_1_figure_1.png "title")\n'
+            '<img src="images_k/page_1_figure_1.png"/> <img src=\'images_k/page_1_figure_0.jpeg\'>\n'
+            '{"html": "<img src=\\"images_k/page_1_figure_0.jpeg\\"/>", "images": {"images_k/page_1_figure_1.png": "iVBOR+/="}}\n'
+            '![](_page_1_Figure_0.jpeg.bak) "unrelated" ](other.png)',
+        )
+        self.assertEqual(rewrite_image_refs(content, {}), content)
+
+    def test_rewrites_names_the_pattern_cannot_capture(self):
+        image_map = {"fig (1).png": "images_k/fig_1.png", "_page_1_Figure_0.png": "images_k/page_1_figure_0.png"}
+        content = '![](fig (1).png) <img src="fig (1).png"> ![](_page_1_Figure_0.png)'
+        self.assertEqual(
+            rewrite_image_refs(content, image_map),
+            '![](images_k/fig_1.png) <img src="images_k/fig_1.png"> ![](images_k/page_1_figure_0.png)',
+        )
+
+    def test_file_rewrite_handles_refs_cut_by_block_boundaries(self):
+        image_map = {"_page_1_Figure_0.png": "images_k/page_1_figure_0.png", "fig (1).png": "images_k/fig_1.png"}
+        content = '{"children":[' + ",".join(
+            f'{{"html":"<img src=\\"_page_1_Figure_0.png\\"/> ![](fig (1).png)","id":{i}}}' for i in range(20)
+        ) + "]}"
+        with tempfile.TemporaryDirectory() as tmp:
+            for block_size in (1, 7, 50, 4096):
+                source, target = Path(tmp) / "source", Path(tmp) / "target"
+                source.write_text(content)
+                rewrite_image_refs_in_file(source, target, image_map, block_size=block_size)
+                self.assertEqual(target.read_text(), rewrite_image_refs(content, image_map))
+                self.assertFalse(source.exists())
+
+    def test_replace_in_file_handles_matches_cut_by_block_boundaries(self):
+        content = "![](images_a/x.png) images_a images_a/y.png\n" * 20
+        with tempfile.TemporaryDirectory() as tmp:
+            source, target = Path(tmp) / "source", Path(tmp) / "target"
+            source.write_text(content)
+            for block_size in (1, 5, 9, 4096):
+                _replace_in_file(source, target, "images_a/", "images_bb/", block_size=block_size)
+                self.assertEqual(target.read_text(), content.replace("images_a/", "images_bb/"))
+
+
+class TestImageDeduplicator(unittest.TestCase):
+    def test_repeated_images_are_hardlinked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            first, second = tmp_path / "images_a", tmp_path / "images_b"
+            for directory in (first, second):
+                directory.mkdir()
+            (first / "page_1_figure_0.png").write_bytes(b"logo" * 100)
+            (first / "page_2_figure_0.png").write_bytes(b"logo" * 100)
+            (first / "page_2_figure_1.png").write_bytes(b"LOGO" * 100)  # Same size, other content
+            (second / "page_1_figure_0.png").write_bytes(b"logo" * 100)
+
+            dedup = ImageDeduplicator()
+            self.assertEqual(dedup.dedupe_dir(first), (1, 400))
+            self.assertEqual(dedup.dedupe_dir(second), (1, 400))
+            self.assertEqual(dedup.dedupe_dir(first), (0, 0))  # Already linked
+
+            inode = (first / "page_1_figure_0.png").stat().st_ino
+            self.assertEqual((first / "page_2_figure_0.png").stat().st_ino, inode)
+            self.assertEqual((second / "page_1_figure_0.png").stat().st_ino, inode)
+            self.assertNotEqual((first / "page_2_figure_1.png").stat().st_ino, inode)
+            self.assertEqual((second / "page_1_figure_0.png").read_bytes(), b"logo" * 100)
+            self.assertEqual((dedup.files_linked, dedup.bytes_saved), (2, 800))
+            self.assertEqual(sorted(p.name for p in second.iterdir()), ["page_1_figure_0.png"])
+
+    def test_deleted_or_replaced_canonical_copies_are_forgotten(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            old, replaced, new = tmp_path / "images_old", tmp_path / "images_replaced", tmp_path / "images_new"
+            for directory in (old, replaced, new):
+                directory.mkdir()
+            (old / "logo.png").write_bytes(b"logo" * 100)
+            (replaced / "chart.png").write_bytes(b"plot" * 50)
+            dedup = ImageDeduplicator()
+            dedup.dedupe_dir(old)
+            dedup.dedupe_dir(replaced)
+
+            shutil.rmtree(old)  # E.g. a server output that was fetched and removed
+            (replaced / "chart.new").write_bytes(b"PLOT" * 50)  # Same size, other content
+            os.replace(replaced / "chart.new", replaced / "chart.png")
+            (new / "a.png").write_bytes(b"logo" * 100)
+            (new / "b.png").write_bytes(b"logo" * 100)
+            (new / "c.png").write_bytes(b"plot" * 50)
+            with self.assertNoLogs("docs_to_md.utils.image_dedup", level="WARNING"):
+                self.assertEqual(dedup.dedupe_dir(new), (1, 400))
+
+            self.assertEqual((new / "a.png").stat().st_ino, (new / "b.png").stat().st_ino)
+            self.assertNotEqual((new / "c.png").stat().st_ino, (replaced / "chart.png").stat().st_ino)
+            self.assertEqual((new / "c.png").read_bytes(), b"plot" * 50)
+
+
 if __name__ == "__main__":
     unittest.main()
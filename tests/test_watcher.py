@@ -0,0 +1,116 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from docs_to_md.config.settings import Config
+from docs_to_md.core.paths import determine_output_paths
+from docs_to_md.core.processor import JobResult
+from docs_to_md.core.watcher import SettleTracker, WatchService
+from docs_to_md.utils.dir_watch import InotifyWatcher, PollingWatcher
+
+
+class TestSettleTracker(unittest.TestCase):
+    def test_file_ready_only_after_unchanged_for_settle_time(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "doc.pdf"
+            path.write_bytes(b"%PDF-1.4 partial")
+            tracker = SettleTracker(settle_seconds=2.0)
+            tracker.touch(path, now=0.0)
+
+            self.assertEqual(tracker.pop_ready(now=0.0), [])  # First stat starts the clock
+            self.assertEqual(tracker.pop_ready(now=1.0), [])
+
+            with open(path, "ab") as f:
+                f.write(b" more")
+            self.assertEqual(tracker.pop_ready(now=2.5), [])  # Grew, clock restarts
+            self.assertEqual(tracker.pop_ready(now=3.0), [])
+            self.assertEqual(tracker.pop_ready(now=4.5), [path])
+            self.assertEqual(len(tracker), 0)
+
+    def test_deleted_file_is_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = SettleTracker(settle_seconds=0)
+            tracker.touch(Path(tmp) / "gone.pdf", now=0.0)
+            self.assertEqual(tracker.pop_ready(now=1.0), [])
+            self.assertEqual(len(tracker), 0)
+
+
+class FakeProcessor:
+    """Finishes each request on its first poll, except files held back by the test."""
+
+    def __init__(self):
+        self.held = set()  # Input names still processing on the API
+        self.submitted = []
+
+    def jobs_for_files(self, files):
+        return [(f, determine_output_paths(f, None, "markdown")) for f in files]
+
+    def start_jobs(self, jobs):
+        self.submitted += [file_path.name for file_path, _ in jobs]
+        return [], {f"req-{file_path.name}": [(file_path, paths)] for file_path, paths in jobs}
+
+    def poll_requests(self, requests, status_checks=None):
+        for request_id, jobs in requests.items():
+            for file_path, paths in jobs:
+                if file_path.name not in self.held:
+                    yield JobResult(file_path, paths, True, request_id=request_id)
+
+    def close(self):
+        pass
+
+
+class TestWatchService(unittest.TestCase):
+    def test_file_still_processing_is_polled_on_later_iterations(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            config = Config(api_key="key", input_path=tmp, command="watch", watch_settle_seconds=0)
+            processor = FakeProcessor()
+            service = WatchService(config, processor, poll_interval=0)
+            try:
+                for name in ("slow.pdf", "fast.pdf"):
+                    (root / name).write_bytes(b"%PDF-1.4")
+                    service.tracker.touch(root / name, now=0.0)
+                processor.held.add("slow.pdf")
+
+                service.run_once(0)  # First stat starts the settle clock
+                self.assertEqual(service.run_once(0), [root / "fast.pdf"])
+                self.assertEqual(service.run_once(0), [])  # slow.pdf is still in flight
+
+                processor.held.clear()
+                self.assertEqual(service.run_once(0), [root / "slow.pdf"])
+                self.assertEqual(processor.submitted, ["slow.pdf", "fast.pdf"])  # Submitted once
+            finally:
+                service.watcher.close()
+
+
+class TestWatchers(unittest.TestCase):
+    def _check_reports_new_files(self, make_watcher):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "images_abc").mkdir()
+            watcher = make_watcher(root)
+            watcher.ignored_dirs.add(str((root / "images_abc").resolve()))
+            try:
+                (root / "sub").mkdir()
+                (root / "sub" / "new.pdf").write_bytes(b"%PDF")
+                (root / "notes.xyz").write_bytes(b"x")
+                (root / "images_abc" / "page_1.jpg").write_bytes(b"x")
+
+                changed = set()
+                for _ in range(5):
+                    changed |= watcher.poll(0.2)
+                self.assertEqual(changed, {(root / "sub" / "new.pdf").resolve()})
+            finally:
+                watcher.close()
+
+    def test_polling_watcher(self):
+        self._check_reports_new_files(lambda root: PollingWatcher(root, {"pdf", "jpg"}, interval=0.1))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        self._check_reports_new_files(lambda root: InotifyWatcher(root, {"pdf", "jpg"}))
+
+
+if __name__ == "__main__":
+    unittest.main()